@@ -1,103 +1,86 @@
 import os
+import threading
 from pathlib import Path
 import streamlit as st
 from dotenv import load_dotenv
-import re
 
-from src.parsing import extract_text_from_upload
-from src.skills import extract_skills_with_evidence, normalize_role_name
-from src.rag import get_or_build_vectordb, rag_retrieve
-from src.roadmap import build_roadmap
+# Only light modules at the top: parsers, langchain, the groq SDK and the embedding model
+# are imported by the warm-up thread or on the first click (see benchmarks/bench_startup.py)
+from src.roles import load_role_scope, normalize_role_name
+from src.tracing import span, start_metrics_server
 from src.utils import now_ts
-from src.llm_groq import generate_gap_report
 
 load_dotenv()
 
+# Per-stage timings under the results (stage spans are always recorded; see src/tracing.py)
+DEBUG_PANEL = os.getenv("DEBUG_PANEL", "0").strip() == "1"
+
+
+@st.cache_resource(show_spinner=False)
+def start_background_warm_up() -> threading.Thread:
+    # Once per server process, off the script thread, so the upload form renders immediately
+    def _warm_up():
+        import src.cv_cache  # noqa: F401  (pdfplumber, python-docx)
+        import src.jd  # noqa: F401  (numpy)
+        import src.llm_groq  # noqa: F401  (groq SDK)
+        from src.prompt_budget import token_counter
+
+        token_counter()  # tokenizer files load once, off the first request
+        from src.rag import warm_up
+        from src.semantic_skills import get_skill_matrix, semantic_enabled
+
+        warm_up(background=False)
+        if semantic_enabled():
+            get_skill_matrix()
+
+    thread = threading.Thread(target=_warm_up, name="app-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+# Start loading the embedding model / vector store in the background so the first click is fast
+if os.getenv("RAG_WARMUP", "1").strip() == "1":
+    start_background_warm_up()
+
+# Prometheus text on :METRICS_PORT/metrics when set (idempotent across reruns)
+start_metrics_server()
+
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "data"
 ROLES_DIR = DATA_DIR / "roles"
 CHROMA_DIR = BASE_DIR / "chroma"  # ok; real path used depends on src/rag.py
 
-ROLE_FILE_MAP = {
-    "Data/BI Analyst": "data_bi_analyst.md",
-    "Data Scientist": "data_scientist.md",
-    "Data Engineer": "data_engineer.md",
-    "ML Engineer": "ml_engineer.md",
-    "AI Engineer": "ai_engineer.md",
-    "GenAI/NLP Engineer": "genai_nlp_engineer.md",
-    "Software Engineer ML AI": "software_engineer_ml_ai.md",
-}
-
-def _parse_list(text: str, key: str) -> set:
-    lines = text.splitlines()
-    key_re = re.compile(rf"^\s*{re.escape(key)}\s*:\s*(.*)\s*$", re.IGNORECASE)
-
-    items = []
-    capture = False
-
-    for line in lines:
-        m = key_re.match(line)
-        if m:
-            capture = True
-            inline = m.group(1).strip()
-            if inline:
-                items.append(inline)
-            continue
-
-        if capture:
-            s = line.strip()
-            if not s:
-                break
-            if s.endswith(":"):  # next section header
-                break
-            items.append(s)
-
-    joined = ", ".join(items)
-    return {x.strip() for x in joined.split(",") if x.strip()}
-
-
-def load_role_scope(role_name: str) -> dict:
-    file_name = ROLE_FILE_MAP.get(role_name)
-    if not file_name:
-        return {"core": set(), "optional": set(), "exclude": set(), "source": None}
-
-    role_path = ROLES_DIR / file_name
-    if not role_path.exists():
-        return {"core": set(), "optional": set(), "exclude": set(), "source": None}
-
-    text = role_path.read_text(encoding="utf-8", errors="ignore")
-    core = _parse_list(text, "CORE_SKILLS")
-    optional = _parse_list(text, "OPTIONAL_SKILLS")
-    exclude = _parse_list(text, "EXCLUDE_SKILLS")
-
-    return {"core": core, "optional": optional, "exclude": exclude, "source": role_path.name}
-
-def filter_by_role_scope(required: set, scope: dict) -> set:
-    allowed = (scope["core"] | scope["optional"]) if (scope["core"] or scope["optional"]) else required
-    return (required & allowed) - scope["exclude"]
-
-def build_llm_instructions(output_style: str, use_sources_only: bool, custom_instructions: str) -> str:
-    base = (
-        "You are a career skill-gap advisor. "
-        "Use the provided CV skill evidence and retrieved documents to generate role-specific recommendations."
-    )
-
-    style_map = {
-        "Professional (default)": "Write in a professional, structured tone.",
-        "Concise": "Be concise. Use short paragraphs and bullet points only.",
-        "Detailed": "Be detailed but avoid repeating information.",
-        "Recruiter-friendly": "Write in recruiter-friendly language with clear impact statements.",
-    }
-
-    grounding = ""
-    if use_sources_only:
-        grounding = (
-            "Important: Use only the retrieved sources as facts. "
-            "If a claim is not supported by the sources, say 'Not found in provided sources'."
-        )
-
-    extra = custom_instructions.strip()
-    return "\n".join([base, style_map.get(output_style, ""), grounding, extra]).strip()
+def with_llm_fallback(chunks):
+    # Same fallback text as before, shown even if the stream fails part-way
+    got_output = False
+    try:
+        for chunk in chunks:
+            got_output = True
+            yield chunk
+    except Exception as e:
+        prefix = "\n\n" if got_output else ""
+        yield prefix + "LLM insights are temporarily unavailable.\n\nReason: " + str(e)
+
+def show_debug_panel(trace) -> None:
+    if DEBUG_PANEL:
+        with st.expander("Debug: stage timings"):
+            st.table([
+                {k: v for k, v in rec.items() if k not in ("trace_id", "span_id", "parent_id", "start")}
+                for rec in sorted(trace.collected, key=lambda r: r["start"])
+            ])
+
+def load_cv_or_stop(cv_file):
+    from src.cv_cache import get_cv_profile
+    from src.parsing import UnreadableDocument, UploadTooLarge
+
+    try:
+        return get_cv_profile(cv_file)
+    except UploadTooLarge as e:
+        st.error(f"{e} Please upload a smaller file.")
+        st.stop()
+    except UnreadableDocument as e:
+        st.error(str(e))
+        st.stop()
 
 def resolve_target_role(selected: str, custom: str) -> str:
     if custom.strip():
@@ -155,6 +138,8 @@ st.markdown(
 output_style = "Professional (default)"
 use_sources_only = True
 custom_instructions = ""
+use_llm_cache = True
+rank_llm_top_n = 1
 
 with st.expander("LLM settings (optional)"):
     output_style = st.selectbox(
@@ -167,11 +152,14 @@ with st.expander("LLM settings (optional)"):
         placeholder="e.g., Focus only on core skills for the selected role. Avoid DevOps topics for analysts.",
         height=120,
     )
+    use_llm_cache = st.checkbox("Reuse cached answers for identical requests", value=True)
+    rank_llm_top_n = int(st.number_input("Explain the top N roles when ranking all roles", min_value=0, max_value=3, value=1))
 
 target_role = resolve_target_role(selected_role, custom_role)
 st.caption(f"Analyzing for role: **{target_role if target_role else '—'}**")
 
 analyze_clicked = st.button("Analyze Skill Gap", type="primary", use_container_width=True)
+rank_clicked = st.button("Rank All Roles for this CV", use_container_width=True)
 
 if analyze_clicked:
     if not cv_file:
@@ -189,84 +177,133 @@ if analyze_clicked:
     role_key = normalize_role_name(target_role)
     role_scope = load_role_scope(role_key)
 
-    instructions = build_llm_instructions(output_style, use_sources_only, custom_instructions)
+    with span("analysis", role=role_key, llm=use_llm) as trace:
+        with st.spinner("Processing your CV and analyzing skill gaps..."):
+            # already imported by the warm-up thread unless the click beat it
+            from src.analysis import build_llm_instructions, gap_analysis
+            from src.jd import get_jd_requirements
+            from src.llm_groq import stream_gap_report
+            from src.rag import get_or_build_vectordb
+            from src.roadmap import roadmap_markdown
 
-    with st.spinner("Processing your CV and analyzing skill gaps..."):
-        cv_text = extract_text_from_upload(cv_file)
-        vectordb = get_or_build_vectordb()
+            instructions = build_llm_instructions(output_style, use_sources_only, custom_instructions)
 
-        cv_profile = extract_skills_with_evidence(cv_text)
-        cv_skills = set(cv_profile["skills"].keys())
+            # cached by file content, so re-running with another role or LLM setting skips parsing
+            cv_entry = load_cv_or_stop(cv_file)
+            cv_text = cv_entry["text"]
+            cv_profile = cv_entry["profile"]
+            vectordb = get_or_build_vectordb()
 
-        if role_scope["core"] or role_scope["optional"]:
-            required_skills = role_scope["core"] | role_scope["optional"]
-        else:
-            docs = rag_retrieve(
-                vectordb,
-                f"{role_key} required skills tools stack",
-                filters={"type": "role"},
+            cv_skills = set(cv_profile["skills"].keys())
+            # cached by posting text, so screening several CVs against one JD extracts it once
+            jd = get_jd_requirements(job_description) if use_jd else None
+
+            # stages run as their outputs are read below; roadmap docs only for the LLM report
+            run = gap_analysis(vectordb, role_key, role_scope, cv_skills, jd)
+            context = run["gap"]
+            matched, missing = context["matched"], context["missing"]
+            roadmap = run["roadmap"]
+
+        st.success("Analysis complete 😊")
+
+        st.subheader("LLM Insights:")
+        if use_llm:
+            llm_stream = stream_gap_report(
+                target_role=target_role,
+                matched=matched,
+                missing=missing,
+                cv_skill_evidence=cv_profile["skills"],
+                role_scope=role_scope,
+                playbook_snippets=run["playbooks"],
+                roadmap_snippets=run["roadmap_docs"],
+                instructions=instructions,
+                use_cache=use_llm_cache,
             )
-            required_skills = {
-                s.strip()
-                for d in docs
-                for s in d.metadata.get("skills", "").split("|")
-                if s.strip()
-            }
-
-        required_skills = filter_by_role_scope(required_skills, role_scope)
-        matched = sorted(required_skills & cv_skills)
-        missing = sorted(required_skills - cv_skills)
-
-        playbooks = []
-        if missing:
-            playbooks = rag_retrieve(
-                vectordb,
-                "Learning guidance for: " + ", ".join(missing),
-                filters={"type": "playbook"},
+            st.write_stream(with_llm_fallback(llm_stream))
+        else:
+            st.write("LLM insights were skipped.")
+
+        #with st.expander("Role scope used"):
+            #st.write("Role file:", role_scope["source"])
+            #st.write("Core:", sorted(role_scope["core"]))
+            #st.write("Optional:", sorted(role_scope["optional"]))
+            #st.write("Excluded:", sorted(role_scope["exclude"]))
+
+        st.subheader("Missing Skills")
+        if context["required_from"] == "job_description":
+            st.caption(
+                f"Required skills taken from the job description, most important first. "
+                f"Weighted coverage: {context['coverage']:.0%}"
             )
+        elif use_jd:
+            st.caption("No known skills found in the job description; using the role profile instead.")
+        st.write(", ".join(missing) if missing else "No missing core skills detected.")
 
-        roadmaps = rag_retrieve(
-            vectordb,
-            f"{role_key} roadmap responsibilities skills learning path",
-            filters={"type": "roadmap"},
-        )
+        if roadmap:
+            st.subheader("Learning Roadmap")
+            st.markdown(roadmap_markdown(roadmap))
 
-        build_roadmap(missing, playbooks)
+        st.caption(f"Generated at {now_ts()}")
 
-        playbook_snippets = "\n\n".join([p.page_content[:700] for p in playbooks[:4]]) if playbooks else ""
-        roadmap_snippets = "\n\n".join([r.page_content[:700] for r in roadmaps[:4]]) if roadmaps else ""
+    show_debug_panel(trace)
 
-        llm_report = ""
-        if use_llm:
-            try:
-                llm_report = generate_gap_report(
-                    target_role=target_role,
-                    matched=matched,
-                    missing=missing,
+if rank_clicked:
+    if not cv_file:
+        st.error("Please upload your CV.")
+        st.stop()
+
+    with span("analysis", mode="rank_roles", llm=use_llm) as trace:
+        with st.spinner("Scoring your CV against every role..."):
+            from src.role_fit import rank_roles
+
+            # one parse and one roles x skills product instead of a full run per role
+            cv_profile = load_cv_or_stop(cv_file)["profile"]
+            ranking = rank_roles(cv_profile["skills"].keys())
+
+        st.subheader("Role Fit")
+        st.dataframe(
+            [
+                {
+                    "Role": r["role"],
+                    "Fit": f"{r['fit']:.0%}",
+                    "Core skills covered": f"{r['core_coverage']:.0%}",
+                    "Matched": ", ".join(r["matched"]),
+                    "Missing": ", ".join(r["missing"]),
+                }
+                for r in ranking
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+        if use_jd:
+            st.caption("Ranking uses the role profiles; the job description applies to single-role analysis.")
+
+        if use_llm and rank_llm_top_n:
+            from src.analysis import build_llm_instructions, retrieve_gap_context
+            from src.llm_groq import stream_gap_report
+            from src.rag import get_or_build_vectordb
+
+            instructions = build_llm_instructions(output_style, use_sources_only, custom_instructions)
+            vectordb = get_or_build_vectordb()
+            for r in ranking[:rank_llm_top_n]:
+                role_scope = load_role_scope(r["role"])
+                context = retrieve_gap_context(vectordb, r["role"], role_scope, set(cv_profile["skills"]))
+                st.subheader(f"LLM Insights: {r['role']} ({r['fit']:.0%} fit)")
+                st.write_stream(with_llm_fallback(stream_gap_report(
+                    target_role=r["role"],
+                    matched=context["matched"],
+                    missing=context["missing"],
                     cv_skill_evidence=cv_profile["skills"],
                     role_scope=role_scope,
-                    playbook_snippets=playbook_snippets,
-                    roadmap_snippets=roadmap_snippets,
+                    playbook_snippets=context["playbooks"],
+                    roadmap_snippets=context["roadmaps"],
                     instructions=instructions,
-                )
-            except Exception as e:
-                llm_report = "LLM insights are temporarily unavailable.\n\nReason: " + str(e)
-
-    st.success("Analysis complete 😊")
-
-    st.subheader("LLM Insights:")
-    st.write(llm_report if llm_report else "LLM insights were skipped.")
-
-    #with st.expander("Role scope used"):
-        #st.write("Role file:", role_scope["source"])
-        #st.write("Core:", sorted(role_scope["core"]))
-        #st.write("Optional:", sorted(role_scope["optional"]))
-        #st.write("Excluded:", sorted(role_scope["exclude"]))
+                    use_cache=use_llm_cache,
+                )))
 
-    st.subheader("Missing Skills")
-    st.write(", ".join(missing) if missing else "No missing core skills detected.")
+        st.caption(f"Generated at {now_ts()}")
 
-    st.caption(f"Generated at {now_ts()}")
+    show_debug_panel(trace)
 
 st.divider()
 st.markdown(
@@ -0,0 +1,57 @@
+import argparse
+import time
+from io import BytesIO
+
+import pdfplumber
+
+from src.parsing import iter_pdf_pages
+from benchmarks.synthetic import synthetic_cv_pdf
+
+
+def legacy_extract_text_from_pdf(file_bytes: bytes) -> str:
+    # Previous whole-document path, kept as the baseline
+    text_parts = []
+    with pdfplumber.open(BytesIO(file_bytes)) as pdf:
+        for page in pdf.pages:
+            t = page.extract_text() or ""
+            if t.strip():
+                text_parts.append(t)
+    return "\n".join(text_parts)
+
+
+def _time_streaming(file_bytes: bytes, workers: int):
+    start = time.perf_counter()
+    first = None
+    parts = []
+    for t in iter_pdf_pages(file_bytes, max_pages=0, max_chars=0, page_timeout=0, workers=workers):
+        if first is None:
+            first = time.perf_counter() - start
+        if t.strip():
+            parts.append(t)
+    return time.perf_counter() - start, first or 0.0, "\n".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF text extraction.")
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 20, 50])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'mode':>12} {'total ms':>10} {'first page ms':>14}")
+    for pages in args.pages:
+        pdf = synthetic_cv_pdf(pages, seed=pages)
+
+        start = time.perf_counter()
+        baseline = legacy_extract_text_from_pdf(pdf)
+        total = time.perf_counter() - start
+        print(f"{pages:>6} {'legacy':>12} {total * 1000:>10.1f} {total * 1000:>14.1f}")
+
+        for workers in args.workers:
+            total, first, text = _time_streaming(pdf, workers)
+            if text != baseline:
+                raise SystemExit(f"Text mismatch at {pages} pages, {workers} workers")
+            print(f"{pages:>6} {f'stream x{workers}':>12} {total * 1000:>10.1f} {first * 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from benchmarks.stub_embeddings import install_stub_embeddings
+from benchmarks.stub_groq import stub_groq_server
+from benchmarks.synthetic import synthetic_cv_docx, synthetic_cv_pdf
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = BASE_DIR / "benchmarks" / "results"
+ROLE = "GenAI/NLP Engineer"
+
+
+class _Upload(io.BytesIO):
+    # what Streamlit's UploadedFile looks like to src.cv_cache / src.parsing
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+
+
+def summarize(samples: List[float]) -> Dict:
+    arr = np.asarray(samples) * 1000
+    return {
+        "n": len(samples),
+        "p50_ms": round(float(np.percentile(arr, 50)), 3),
+        "p95_ms": round(float(np.percentile(arr, 95)), 3),
+        "mean_ms": round(float(arr.mean()), 3),
+        "throughput_per_s": round(len(samples) / (arr.sum() / 1000), 2) if arr.sum() else None,
+    }
+
+
+def _time_each(fn: Callable, items: list) -> List[float]:
+    samples = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_size(pages: int, docs: int, skill_density: float, index_dir: Path, backend: str) -> Dict[str, Dict]:
+    from src import rag
+    from src.analysis import build_llm_instructions, retrieve_gap_context
+    from src.cv_cache import get_cv_profile
+    from src.llm_groq import build_gap_report_messages, generate_gap_report
+    from src.parsing import extract_text_from_bytes
+    from src.roadmap import build_roadmap
+    from src.roles import load_role_scope
+    from src.skills import extract_skills_with_evidence
+    from src.tracing import span
+
+    # distinct seeds, so no stage is answered from a content-addressed cache
+    seeds = [pages * 1000 + i for i in range(docs)]
+    pdfs = [synthetic_cv_pdf(pages, skill_density=skill_density, seed=s) for s in seeds]
+    docx_files = [synthetic_cv_docx(pages, skill_density=skill_density, seed=s) for s in seeds]
+    vectordb = rag.get_or_build_vectordb(index_dir, backend=backend)
+    scope = load_role_scope(ROLE)
+    instructions = build_llm_instructions("Professional (default)", True, "")
+
+    stages: Dict[str, List[float]] = {}
+    stages["parse_pdf"] = _time_each(lambda b: extract_text_from_bytes(b, "cv.pdf"), pdfs)
+    stages["parse_docx"] = _time_each(lambda b: extract_text_from_bytes(b, "cv.docx"), docx_files)
+
+    texts = [extract_text_from_bytes(b, "cv.pdf") for b in pdfs]
+    stages["extract_skills"] = _time_each(extract_skills_with_evidence, texts)
+    profiles = [extract_skills_with_evidence(t) for t in texts]
+
+    def _retrieve(profile):
+        rag._RETRIEVAL_CACHE.clear()  # measure the search, not the result cache
+        return retrieve_gap_context(vectordb, ROLE, scope, set(profile["skills"]))
+
+    stages["retrieval"] = _time_each(_retrieve, profiles)
+    contexts = [_retrieve(p) for p in profiles]
+
+    def _prompt(i):
+        ctx = contexts[i]
+        return build_gap_report_messages(
+            ROLE, ctx["matched"], ctx["missing"], profiles[i]["skills"], scope,
+            ctx["playbooks"], ctx["roadmaps"], instructions,
+        )
+
+    stages["prompt_assembly"] = _time_each(_prompt, list(range(docs)))
+
+    def _llm(i):
+        ctx = contexts[i]
+        return generate_gap_report(
+            ROLE, ctx["matched"], ctx["missing"], profiles[i]["skills"], scope,
+            ctx["playbooks"], ctx["roadmaps"], instructions, use_cache=False,
+        )
+
+    _llm(0)  # client construction and connection set-up are not per-request costs
+    stages["llm_stub"] = _time_each(_llm, list(range(docs)))
+
+    # Full pipeline as app.py runs it; the spans give the per-stage split inside it
+    traced: Dict[str, List[float]] = {}
+
+    def _pipeline(i):
+        rag._RETRIEVAL_CACHE.clear()
+        with span("analysis") as trace:
+            profile = get_cv_profile(_Upload(pdfs[i], f"cv-{pages}-{i}.pdf"))["profile"]
+            db = rag.get_or_build_vectordb(index_dir, backend=backend)
+            ctx = retrieve_gap_context(db, ROLE, scope, set(profile["skills"]))
+            build_roadmap(ctx["missing"], ctx["playbooks"])
+            generate_gap_report(
+                ROLE, ctx["matched"], ctx["missing"], profile["skills"], scope,
+                ctx["playbooks"], ctx["roadmaps"], instructions, use_cache=False,
+            )
+        for rec in trace.collected:
+            if rec["parent_id"] is not None:
+                traced.setdefault("pipeline." + rec["span"], []).append(rec["duration_ms"] / 1000)
+
+    stages["pipeline"] = _time_each(_pipeline, list(range(docs)))
+    stages.update(traced)
+    return {name: summarize(samples) for name, samples in stages.items()}
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def compare(current: Dict, baseline: Dict) -> None:
+    base = {(r["pages"], r["stage"]): r for r in baseline["results"]}
+    print(f"\nvs {baseline['meta'].get('commit', '?')}:")
+    print(f"{'pages':>6} {'stage':<28} {'p50 ms':>9} {'base':>9} {'change':>8}")
+    for r in current["results"]:
+        b = base.get((r["pages"], r["stage"]))
+        if not b or not b["p50_ms"]:
+            continue
+        change = (r["p50_ms"] - b["p50_ms"]) / b["p50_ms"] * 100
+        print(f"{r['pages']:>6} {r['stage']:<28} {r['p50_ms']:>9.2f} {b['p50_ms']:>9.2f} {change:>+7.1f}%")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark: synthetic CVs, stub embeddings, stub Groq.")
+    parser.add_argument("--pages", type=int, nargs="+", default=[2, 10])
+    parser.add_argument("--docs", type=int, default=20, help="CVs per size (each stage runs once per CV)")
+    parser.add_argument("--skill-density", type=float, default=0.08)
+    parser.add_argument("--backend", choices=["numpy", "chroma"], default=None, help="Defaults to VECTOR_BACKEND")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Stub Groq response delay (seconds)")
+    parser.add_argument("--output", default=None, help="Defaults to benchmarks/results/<commit>-<time>.json")
+    parser.add_argument("--compare", default=None, help="Earlier results JSON to diff p50s against")
+    args = parser.parse_args()
+
+    install_stub_embeddings()
+    from src import rag
+
+    backend = args.backend or rag.vector_backend_name()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench_index_") as index_dir, \
+            stub_groq_server(latency=args.llm_latency) as (url, _):
+        os.environ["GROQ_BASE_URL"] = url
+        os.environ.setdefault("GROQ_API_KEY", "stub")
+        rag.get_or_build_vectordb(Path(index_dir), backend=backend)  # index build is not a per-request cost
+
+        print(f"{'pages':>6} {'stage':<28} {'p50 ms':>9} {'p95 ms':>9} {'per s':>9}")
+        for pages in args.pages:
+            for stage, stats in run_size(pages, args.docs, args.skill_density, Path(index_dir), backend).items():
+                results.append({"pages": pages, "stage": stage, **stats})
+                print(f"{pages:>6} {stage:<28} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+                      f"{stats['throughput_per_s'] or 0:>9.1f}")
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "params": {"pages": args.pages, "docs": args.docs, "skill_density": args.skill_density,
+                   "backend": backend, "llm_latency": args.llm_latency},
+        "results": results,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{report['meta']['commit']}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nWrote {output}")
+
+    if args.compare:
+        compare(report, json.loads(Path(args.compare).read_text(encoding="utf-8")))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_cv_text
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Per-CV latency of the semantic skill matcher against its budget.")
+    parser.add_argument("--pages", type=int, nargs="+", default=[2, 10, 50])
+    parser.add_argument("--docs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=None, help="Defaults to SEMANTIC_BUDGET_MS")
+    parser.add_argument("--real-model", action="store_true", help="Use EMBEDDING_MODEL instead of the hash stub")
+    args = parser.parse_args()
+
+    if not args.real_model:
+        from benchmarks.stub_embeddings import install_stub_embeddings
+
+        install_stub_embeddings()
+    from src import semantic_skills
+
+    budget_ms = args.budget_ms if args.budget_ms is not None else semantic_skills.SEMANTIC_BUDGET_MS
+    start = time.perf_counter()
+    semantic_skills.get_skill_matrix()
+    print(f"skill matrix (cold): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    failed = False
+    print(f"{'pages':>6} {'sentences':>10} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'skills':>7}")
+    for pages in args.pages:
+        samples, found = [], []
+        for i in range(args.docs):
+            text = synthetic_cv_text(pages, seed=pages * 100 + i)
+            start = time.perf_counter()
+            matches = semantic_skills.semantic_skill_matches(text, budget_ms=budget_ms)
+            samples.append((time.perf_counter() - start) * 1000)
+            found.append(len(matches))
+        arr = np.asarray(samples)
+        n_sent = len(semantic_skills.cv_sentences(synthetic_cv_text(pages, seed=pages * 100)))
+        print(f"{pages:>6} {n_sent:>10} {np.percentile(arr, 50):>9.1f} {np.percentile(arr, 95):>9.1f} "
+              f"{arr.max():>9.1f} {np.mean(found):>7.1f}")
+        if np.percentile(arr, 95) > budget_ms:
+            failed = True
+
+    if failed:
+        print(f"p95 over the {budget_ms:.0f} ms per-CV budget")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
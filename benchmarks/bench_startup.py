@@ -0,0 +1,85 @@
+import argparse
+import ast
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+APP_PATH = BASE_DIR / "app.py"
+
+# Must not be imported before the first analysis: they are what made cold start slow
+HEAVY_MODULES = (
+    "torch",
+    "sentence_transformers",
+    "transformers",
+    "chromadb",
+    "langchain_community",
+    "langchain_text_splitters",
+    "langchain_core",
+    "groq",
+    "pdfplumber",
+    "docx",
+    "numpy",
+)
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def app_startup_imports(path: Path = APP_PATH, skip=("streamlit",)) -> str:
+    # The module-level import statements of app.py, i.e. what runs before the first render
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    lines = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [a for a in node.names if a.name.split(".")[0] not in skip]
+            if names:
+                lines.append(ast.unparse(ast.Import(names=names)))
+        elif isinstance(node, ast.ImportFrom) and (node.module or "").split(".")[0] not in skip:
+            lines.append(ast.unparse(node))
+    return "\n".join(lines)
+
+
+def profile_imports(code: str):
+    # (top-level imports as (module, cumulative us), modules loaded) using `python -X importtime`
+    probe = code + "\nimport sys\nprint('\\n'.join(sorted(sys.modules)))"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=BASE_DIR, capture_output=True, text=True, check=True,
+    )
+    top = []
+    for line in proc.stderr.splitlines():
+        m = IMPORTTIME_RE.match(line)
+        if m and len(m.group(3)) == 1:  # no extra indent: imported directly by the probe
+            top.append((m.group(4), int(m.group(2))))
+    return top, set(proc.stdout.split())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Profile what app.py imports before the first render.")
+    parser.add_argument("--budget-ms", type=float, default=500.0, help="Fail above this cumulative import time")
+    parser.add_argument("--include-streamlit", action="store_true", help="Count streamlit itself")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    code = app_startup_imports(skip=() if args.include_streamlit else ("streamlit",))
+    top, loaded = profile_imports(code)
+    total_ms = sum(us for _, us in top) / 1000
+
+    print(f"{'module':<40} {'cumulative ms':>14}")
+    for module, us in sorted(top, key=lambda x: -x[1])[: args.top]:
+        print(f"{module:<40} {us / 1000:>14.1f}")
+    print(f"{'total':<40} {total_ms:>14.1f}   (budget {args.budget_ms:.0f} ms)")
+
+    heavy = sorted({m.split(".")[0] for m in loaded} & set(HEAVY_MODULES))
+    failed = False
+    if heavy:
+        print("Heavy modules imported at startup: " + ", ".join(heavy))
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"Startup imports over budget: {total_ms:.0f} ms > {args.budget_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+import argparse
+import multiprocessing as mp
+import os
+import struct
+import tempfile
+import time
+import zlib
+from io import BytesIO
+from typing import Dict
+
+from benchmarks.synthetic import synthetic_cv_text
+
+# Peak RSS while parsing one CV, previous python-docx path vs the streaming one. Each
+# measurement runs in a fresh process so earlier allocations don't hide the peak.
+
+
+def _png(n_bytes: int) -> bytes:
+    # Incompressible RGB image of about n_bytes (stored, not deflated), like a scanned certificate
+    width = 1024
+    height = max(1, n_bytes // (width * 3))
+    raw = b"".join(b"\x00" + os.urandom(width * 3) for _ in range(height))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, 0)) + chunk(b"IEND", b"")
+
+
+def synthetic_large_docx(pages: int, image_mb: float, seed: int = 0) -> bytes:
+    """CV text as paragraphs plus a skills table and a header, padded with an embedded image."""
+    from docx import Document
+    from docx.shared import Inches
+
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Jane Doe | jane@example.com"
+    for line in synthetic_cv_text(pages, seed=seed).splitlines():
+        doc.add_paragraph(line)
+    table = doc.add_table(rows=3, cols=2)
+    for row, (k, v) in zip(table.rows, [("Languages", "Python, SQL"), ("ML", "PyTorch, Scikit-learn"), ("Ops", "Docker, Airflow")]):
+        row.cells[0].text, row.cells[1].text = k, v
+    if image_mb > 0:
+        doc.add_picture(BytesIO(_png(int(image_mb * 1024 * 1024))), width=Inches(2))
+    buf = BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def _legacy(file_bytes: bytes) -> Dict:
+    from docx import Document
+
+    from src.skills import extract_skills_with_evidence
+
+    doc = Document(BytesIO(file_bytes))
+    text = "\n".join([p.text for p in doc.paragraphs if p.text])
+    return extract_skills_with_evidence(text)
+
+
+def _streaming(file_bytes: bytes) -> Dict:
+    from src.cv_cache import parse_cv_bytes
+
+    return parse_cv_bytes(file_bytes, "cv.docx")[1]
+
+
+def _measure(mode: str, path: str, queue) -> None:
+    from src.tracing import span, track_peak_rss
+
+    fn = _legacy if mode == "legacy" else _streaming
+    # module imports are not part of the per-upload cost
+    import docx  # noqa: F401
+    import lxml.etree  # noqa: F401
+    import src.cv_cache  # noqa: F401
+
+    with open(path, "rb") as f:
+        file_bytes = f.read()
+    start = time.perf_counter()
+    with span("parse_cv") as s, track_peak_rss(s):
+        profile = fn(file_bytes)
+    queue.put((s.attrs.get("rss_growth_mb"), time.perf_counter() - start, len(profile["skills"])))
+
+
+def run(mode: str, path: str):
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_measure, args=(mode, path, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory per DOCX upload, python-docx vs streaming.")
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 50])
+    parser.add_argument("--image-mb", type=float, nargs="+", default=[0, 19])
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'file MB':>8} {'mode':>10} {'peak +MB':>9} {'ms':>8} {'skills':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            for image_mb in args.image_mb:
+                path = os.path.join(tmp, f"cv-{pages}-{image_mb:g}.docx")
+                with open(path, "wb") as f:
+                    f.write(synthetic_large_docx(pages, image_mb, seed=pages))
+                size_mb = os.path.getsize(path) / 1024 / 1024
+                for mode in ("legacy", "streaming"):
+                    growth, seconds, skills = run(mode, path)
+                    print(f"{pages:>6} {size_mb:>8.1f} {mode:>10} {growth if growth is not None else float('nan'):>9.1f} "
+                          f"{seconds * 1000:>8.1f} {skills:>7}")
+
+
+if __name__ == "__main__":
+    main()
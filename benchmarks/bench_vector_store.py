@@ -0,0 +1,119 @@
+import argparse
+import json
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+DIM = 384
+ROLES = ["data_engineer", "ml_engineer", "ai_engineer", "data_scientist"]
+
+
+def _rss_mb() -> float:
+    # peak RSS of this process (Linux reports KiB)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _corpus(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, DIM)).astype(np.float32)
+    ids = [f"c{i}" for i in range(n)]
+    texts = [f"chunk {i}" for i in range(n)]
+    metas = [{"type": "playbook" if i % 3 else "role", "source": f"{ROLES[i % len(ROLES)]}.md"} for i in range(n)]
+    queries = rng.standard_normal((64, DIM)).astype(np.float32)
+    return ids, vectors, texts, metas, queries
+
+
+def _open(backend: str, path: str):
+    if backend == "numpy":
+        from src.vector_backends import NumpyVectorStore
+
+        return NumpyVectorStore(persist_directory=path)
+    import chromadb
+
+    client = chromadb.PersistentClient(path=path)
+    return client.get_or_create_collection("bench")
+
+
+def _add(backend: str, store, ids, vectors, texts, metas, batch: int = 5000):
+    if backend == "numpy":
+        store.add_vectors(ids, vectors, texts, metas)
+        return
+    for i in range(0, len(ids), batch):
+        store.add(ids=ids[i:i + batch], embeddings=vectors[i:i + batch].tolist(),
+                  documents=texts[i:i + batch], metadatas=metas[i:i + batch])
+
+
+def _query(backend: str, store, vector, k: int, where):
+    if backend == "numpy":
+        return store.search_by_vectors([vector], k=k, filter=where)[0]
+    return store.query(query_embeddings=[vector.tolist()], n_results=k, where=where)
+
+
+def run_case(backend: str, n: int, k: int) -> dict:
+    ids, vectors, texts, metas, queries = _corpus(n)
+    base_rss = _rss_mb()
+    path = tempfile.mkdtemp(prefix=f"bench_{backend}_")
+    try:
+        start = time.perf_counter()
+        store = _open(backend, path)
+        _add(backend, store, ids, vectors, texts, metas)
+        build = time.perf_counter() - start
+
+        where = {"type": "playbook"}
+        _query(backend, store, queries[0], k, where)  # warm caches
+        latencies = []
+        for q in queries:
+            t = time.perf_counter()
+            _query(backend, store, q, k, where)
+            latencies.append(time.perf_counter() - t)
+
+        start = time.perf_counter()
+        reopened = _open(backend, path)
+        _query(backend, reopened, queries[0], k, where)
+        reopen = time.perf_counter() - start
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+    return {
+        "backend": backend,
+        "n": n,
+        "build_s": build,
+        "reopen_ms": reopen * 1000,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "rss_mb": _rss_mb() - base_rss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vector store backends (numpy vs Chroma).")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--backends", nargs="+", choices=["numpy", "chroma"], default=["numpy", "chroma"])
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--case", nargs=2, metavar=("BACKEND", "N"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(args.case[0], int(args.case[1]), args.k)))
+        return
+
+    print(f"{'chunks':>8} {'backend':>8} {'build s':>9} {'reopen ms':>10} {'p50 ms':>8} {'p95 ms':>8} {'+RSS MB':>8}")
+    for n in args.sizes:
+        for backend in args.backends:
+            # one process per case so peak RSS is not shared between backends
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_vector_store", "--case", backend, str(n), "--k", str(args.k)],
+                capture_output=True, text=True, check=True,
+            )
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{n:>8} {backend:>8} {r['build_s']:>9.2f} {r['reopen_ms']:>10.1f} "
+                  f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['rss_mb']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import hashlib
+import math
+import re
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+STUB_MODEL_NAME = "benchmark-stub-hash-384"
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic feature-hashing embeddings: no model download, no torch.
+
+    Texts sharing words get similar vectors, which is enough to exercise the
+    vector store and retrieval code paths offline.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def _embed(self, text: str) -> List[float]:
+        v = [0.0] * self.dim
+        for word in re.findall(r"[a-z0-9+#]+", text.lower()):
+            h = int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+            v[h % self.dim] += 1.0 if (h >> 63) else -1.0
+        norm = math.sqrt(sum(x * x for x in v)) or 1.0
+        return [x / norm for x in v]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def install_stub_embeddings(dim: int = 384) -> str:
+    # Register the stub under its own model name so a real index is never reused or overwritten
+    import os
+
+    from src import rag
+
+    os.environ["EMBEDDING_MODEL"] = STUB_MODEL_NAME
+    rag._EMBEDDINGS[STUB_MODEL_NAME] = HashEmbeddings(dim)
+    return STUB_MODEL_NAME
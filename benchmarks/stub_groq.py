@@ -0,0 +1,143 @@
+import argparse
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, Optional
+
+# Stand-in for the Groq chat completions endpoint (OpenAI-compatible JSON).
+# Point the app at it with GROQ_BASE_URL=http://127.0.0.1:<port> and any GROQ_API_KEY.
+
+DEFAULT_REPLY = (
+    "## Gap explanation\nStub report.\n\n## 4-month roadmap\n- Month 1: foundations\n- Month 2: projects\n"
+    "- Month 3: deployment\n- Month 4: portfolio\n\n## Projects\n- Project A\n\n## Conclusion\nStart today."
+)
+
+
+class StubState:
+    def __init__(self, latency: float = 0.0, fail_first: int = 0, fail_status: int = 429,
+                 retry_after: Optional[float] = 0.0, reply: str = DEFAULT_REPLY, token_delay: float = 0.0):
+        self.latency = latency
+        self.token_delay = token_delay
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.retry_after = retry_after
+        self.reply = reply
+        self.requests = 0
+        self.lock = threading.Lock()
+
+
+def _make_handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+        disable_nagle_algorithm = True  # headers and body are separate writes; avoid the 40 ms delayed-ACK stall
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_stream(self, n: int, model: str) -> None:
+            # Server-sent events, one small delta per word, terminated by [DONE]
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            words = state.reply.split(" ")
+            for i, word in enumerate(words):
+                delta = word if i == 0 else " " + word
+                event = {
+                    "id": f"stub-{n}",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}],
+                }
+                self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                if state.token_delay:
+                    time.sleep(state.token_delay)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+            self.close_connection = True
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0) or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not self.path.endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+
+            with state.lock:
+                state.requests += 1
+                n = state.requests
+            if n <= state.fail_first:
+                headers = {"retry-after": str(state.retry_after)} if state.retry_after is not None else {}
+                self._send_json(state.fail_status, {"error": {"message": "stub failure", "type": "stub"}}, headers)
+                return
+
+            if state.latency:
+                time.sleep(state.latency)
+            if request.get("stream"):
+                self._send_stream(n, request.get("model", "stub"))
+                return
+            self._send_json(200, {
+                "id": f"stub-{n}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": state.reply},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+
+    return Handler
+
+
+@contextmanager
+def stub_groq_server(host: str = "127.0.0.1", port: int = 0, **kwargs) -> Iterator[tuple]:
+    """Run the stub in a background thread; yields (base_url, state)."""
+    state = StubState(**kwargs)
+    server = ThreadingHTTPServer((host, port), _make_handler(state))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{host}:{server.server_address[1]}", state
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stub of the Groq chat completions API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before answering")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Seconds between streamed tokens")
+    parser.add_argument("--fail-first", type=int, default=0, help="Answer the first N requests with --fail-status")
+    parser.add_argument("--fail-status", type=int, default=429)
+    args = parser.parse_args()
+
+    state = StubState(latency=args.latency, token_delay=args.token_delay, fail_first=args.fail_first, fail_status=args.fail_status)
+    server = ThreadingHTTPServer((args.host, args.port), _make_handler(state))
+    print(f"Stub Groq API on http://{args.host}:{args.port} (set GROQ_BASE_URL to this)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
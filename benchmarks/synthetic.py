@@ -0,0 +1,115 @@
+import random
+from typing import List, Optional
+
+# Phrases that exercise the skill taxonomy (case and spacing variants on purpose)
+SKILL_PHRASES: List[str] = [
+    "Python", "PySpark", "Spark", "SQL", "PostgreSQL", "T-SQL", "MySQL", "Excel", "Power BI", "PowerBI",
+    "Tableau", "data visualization", "dashboards", "statistical modelling", "regression", "hypothesis testing",
+    "stakeholder requirements", "Pandas", "NumPy", "Airflow", "dbt", "Kafka", "Git", "GitHub Actions",
+    "GitLab CI", "Docker", "Linux", "bash", "scikit-learn", "sklearn", "PyTorch", "TensorFlow",
+    "Hugging Face transformers", "RAG", "retrieval-augmented generation", "embeddings", "FAISS", "Chroma",
+    "Qdrant", "large language model", "LLM", "prompt engineering", "LangChain", "LlamaIndex", "FastAPI",
+    "Streamlit", "CI/CD", "Jenkins", "MLflow", "Kubeflow", "AWS", "Azure", "GCP", "Google Cloud",
+    "BigQuery", "Looker Studio", "GA4", "Google Analytics 4",
+]
+
+FILLER_WORDS: List[str] = (
+    "designed implemented delivered improved led analysed collaborated reduced latency throughput "
+    "pipeline research publication conference journal grant teaching supervision thesis chapter "
+    "experiment results baseline dataset cohort survey methodology appendix reviewer workshop"
+).split()
+
+CHARS_PER_PAGE = 3000
+
+
+def synthetic_cv_text(pages: int, skill_density: float = 0.08, seed: Optional[int] = 0) -> str:
+    """Generate a plain-text CV of roughly `pages` pages.
+
+    `skill_density` is the probability that a word slot holds a skill phrase.
+    """
+    rng = random.Random(seed)
+    target = pages * CHARS_PER_PAGE
+    lines: List[str] = []
+    size = 0
+    while size < target:
+        n_words = rng.randint(4, 18)
+        words = []
+        for _ in range(n_words):
+            if rng.random() < skill_density:
+                words.append(rng.choice(SKILL_PHRASES))
+            else:
+                words.append(rng.choice(FILLER_WORDS))
+        line = " ".join(words)
+        if rng.random() < 0.15:
+            line = "- " + line.capitalize()
+        if rng.random() < 0.05:
+            line = ""
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def synthetic_cv_pdf(pages: int, skill_density: float = 0.08, seed: Optional[int] = 0,
+                     lines_per_page: int = 60) -> bytes:
+    """Build a text PDF (Helvetica, one content stream per page) without third-party libraries."""
+    rng = random.Random(seed)
+    text_lines = synthetic_cv_text(pages, skill_density=skill_density, seed=seed).splitlines()
+    page_lines = [text_lines[i:i + lines_per_page] for i in range(0, len(text_lines), lines_per_page)][:pages]
+    while len(page_lines) < pages:
+        page_lines.append([rng.choice(FILLER_WORDS)])
+
+    objects: List[bytes] = []
+
+    def add(obj: bytes) -> int:
+        objects.append(obj)
+        return len(objects)
+
+    catalog_id = add(b"")  # filled in once the page tree exists
+    pages_id = add(b"")
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    page_ids = []
+    for lines in page_lines:
+        ops = ["BT", "/F1 9 Tf", "11 TL", "40 800 Td"]
+        for ln in lines:
+            ops.append(f"({_pdf_escape(ln.encode('ascii', 'replace').decode('ascii'))}) '")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+            % (pages_id, font_id, content_id)
+        ))
+    objects[catalog_id - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids).encode("ascii")
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog_id, xref)
+    return bytes(out)
+
+
+def synthetic_cv_docx(pages: int, skill_density: float = 0.08, seed: Optional[int] = 0) -> bytes:
+    """Build a .docx with the same text as synthetic_cv_text, one paragraph per line."""
+    from io import BytesIO
+
+    from docx import Document
+
+    doc = Document()
+    doc.add_heading("Curriculum Vitae", level=1)
+    for line in synthetic_cv_text(pages, skill_density=skill_density, seed=seed).splitlines():
+        doc.add_paragraph(line)
+    buf = BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
@@ -0,0 +1,174 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.jd import diff_against_jd
+from src.pipeline import Pipeline, PipelineRun
+from src.rag import RetrievalRequest, has_doc_type, rag_retrieve_many
+from src.roadmap import build_roadmap
+from src.taxonomy import get_taxonomy
+
+PLAYBOOK_K = 4
+
+
+def filter_by_role_scope(required: set, scope: dict) -> set:
+    # On canonical skill IDs: "Vector Databases" in one place and "Vector Database" in another are one skill
+    taxonomy = get_taxonomy()
+    required_ids = taxonomy.ids(required)
+    allowed = taxonomy.ids(scope["core"] | scope["optional"]) if (scope["core"] or scope["optional"]) else required_ids
+    return {taxonomy.name(i) for i in (required_ids & allowed) - taxonomy.ids(scope["exclude"])}
+
+
+def role_skills_request(role_key: str) -> RetrievalRequest:
+    return (f"{role_key} required skills tools stack", 4, {"type": "role"})
+
+
+def playbook_request(missing: List[str]) -> RetrievalRequest:
+    return ("Learning guidance for: " + ", ".join(missing), 4, {"type": "playbook"})
+
+
+def roadmap_request(role_key: str) -> RetrievalRequest:
+    return (f"{role_key} roadmap responsibilities skills learning path", 4, {"type": "roadmap"})
+
+
+def _skills_from_role_docs(docs: list) -> Set[str]:
+    taxonomy = get_taxonomy()
+    return {
+        taxonomy.canonical(s)
+        for d in docs
+        for s in d.metadata.get("skills", "").split("|")
+        if s.strip()
+    }
+
+
+def resolve_required_skills(role_key: str, role_scope: dict, vectordb=None) -> Set[str]:
+    # Role file first; fall back to skills tagged on retrieved role documents
+    if role_scope["core"] or role_scope["optional"]:
+        required_skills = role_scope["core"] | role_scope["optional"]
+    elif vectordb is not None:
+        docs = rag_retrieve_many(vectordb, [role_skills_request(role_key)])[0]
+        required_skills = _skills_from_role_docs(docs)
+    else:
+        required_skills = set()
+
+    return filter_by_role_scope(required_skills, role_scope)
+
+
+def compute_gap(cv_skills: Set[str], required_skills: Set[str]) -> Tuple[List[str], List[str]]:
+    taxonomy = get_taxonomy()
+    have = taxonomy.ids(cv_skills)
+    required = taxonomy.ids(required_skills)
+    return taxonomy.names_of(required & have), taxonomy.names_of(required - have)
+
+
+def lookup_playbooks(vectordb, missing: List[str]) -> Tuple[Dict[str, list], List[str]]:
+    # Direct skill -> playbook hits from the index; the rest need a semantic search
+    index = getattr(vectordb, "skill_index", None)
+    if index is None:
+        return {}, list(missing)
+    return index.lookup(missing)
+
+
+def rank_playbooks(direct: Dict[str, list], searched: Optional[Dict[str, list]] = None, k: int = PLAYBOOK_K) -> list:
+    # Chunks covering more of the missing skills first. Index hits outrank semantic
+    # matches, so noisy fallback results cannot push out a playbook that lists the skill.
+    entries: Dict[Tuple[str, str], list] = {}
+    for slot, per_skill in ((1, direct), (2, searched or {})):
+        for skill, docs in per_skill.items():
+            for pos, d in enumerate(docs):
+                e = entries.setdefault((d.metadata.get("source", ""), d.page_content), [d, set(), set(), pos, len(entries)])
+                e[slot].add(skill)
+                e[3] = min(e[3], pos)
+    ranked = sorted(entries.values(), key=lambda e: (-len(e[1]), -len(e[1] | e[2]), e[3], e[4]))
+    return [e[0] for e in ranked[:k]]
+
+
+def retrieve_playbooks(vectordb, missing: List[str], k: int = PLAYBOOK_K) -> list:
+    if not missing:
+        return []
+    direct, unresolved = lookup_playbooks(vectordb, missing)
+    searched = {}
+    if unresolved:
+        searched = dict(zip(unresolved, rag_retrieve_many(vectordb, [playbook_request([s]) for s in unresolved])))
+    return rank_playbooks(direct, searched, k)
+
+
+GAP_PIPELINE = Pipeline()
+
+
+@GAP_PIPELINE.stage("gap", inputs=("vectordb", "role_key", "role_scope", "cv_skills", "jd"))
+def gap_stage(vectordb, role_key: str, role_scope: dict, cv_skills: Set[str], jd: Optional[Dict]) -> Dict:
+    # Required skills come from the job description when one is given (see src/jd.py),
+    # then the role file, then skills tagged on retrieved role documents
+    jd_gap = diff_against_jd(jd, [cv_skills], role_scope["exclude"])[0] if jd and jd.get("skills") else None
+    if jd_gap and jd_gap["required"]:
+        return {
+            "required": set(jd_gap["required"]),
+            "required_from": "job_description",
+            "matched": jd_gap["matched"],
+            "missing": jd_gap["missing"],
+            "weights": jd_gap["weights"],
+            "coverage": jd_gap["coverage"],
+        }
+
+    source = "role_file" if (role_scope["core"] or role_scope["optional"]) else "retrieval"
+    required_skills = resolve_required_skills(role_key, role_scope, vectordb)
+    matched, missing = compute_gap(cv_skills, required_skills)
+    return {"required": required_skills, "required_from": source, "matched": matched, "missing": missing,
+            "weights": None, "coverage": None}
+
+
+@GAP_PIPELINE.stage("playbooks", inputs=("vectordb", "gap"))
+def playbooks_stage(vectordb, gap: Dict) -> list:
+    return retrieve_playbooks(vectordb, gap["missing"])
+
+
+@GAP_PIPELINE.stage("roadmap_docs", inputs=("vectordb", "role_key"))
+def roadmap_docs_stage(vectordb, role_key: str) -> list:
+    # Only data/roadmaps/ is indexed as "roadmap"; without it the search could only come back empty
+    if not has_doc_type(vectordb, "roadmap"):
+        return []
+    return rag_retrieve_many(vectordb, [roadmap_request(role_key)])[0]
+
+
+@GAP_PIPELINE.stage("roadmap", inputs=("gap", "playbooks"))
+def roadmap_stage(gap: Dict, playbooks: list) -> List[dict]:
+    return build_roadmap(gap["missing"], playbooks)
+
+
+def gap_analysis(vectordb, role_key: str, role_scope: dict, cv_skills: Set[str], jd: Optional[Dict] = None) -> PipelineRun:
+    """Lazy gap analysis: run["gap"], run["playbooks"], run["roadmap_docs"], run["roadmap"].
+
+    Each stage runs the first time its output is read, so a caller without an LLM report
+    never searches for roadmap documents. Missing skills listed on a playbook's "Skills:"
+    line are resolved from the skill index; only the others cost a semantic search.
+    """
+    return GAP_PIPELINE.run(vectordb=vectordb, role_key=role_key, role_scope=role_scope, cv_skills=cv_skills, jd=jd)
+
+
+def retrieve_gap_context(vectordb, role_key: str, role_scope: dict, cv_skills: Set[str], jd: Optional[Dict] = None) -> Dict:
+    # Everything an LLM report needs, computed up front
+    run = gap_analysis(vectordb, role_key, role_scope, cv_skills, jd)
+    return {**run["gap"], "playbooks": run["playbooks"], "roadmaps": run["roadmap_docs"]}
+
+
+def build_llm_instructions(output_style: str, use_sources_only: bool, custom_instructions: str) -> str:
+    base = (
+        "You are a career skill-gap advisor. "
+        "Use the provided CV skill evidence and retrieved documents to generate role-specific recommendations."
+    )
+
+    style_map = {
+        "Professional (default)": "Write in a professional, structured tone.",
+        "Concise": "Be concise. Use short paragraphs and bullet points only.",
+        "Detailed": "Be detailed but avoid repeating information.",
+        "Recruiter-friendly": "Write in recruiter-friendly language with clear impact statements.",
+    }
+
+    grounding = ""
+    if use_sources_only:
+        grounding = (
+            "Important: Use only the retrieved sources as facts. "
+            "If a claim is not supported by the sources, say 'Not found in provided sources'."
+        )
+
+    extra = custom_instructions.strip()
+    return "\n".join([base, style_map.get(output_style, ""), grounding, extra]).strip()
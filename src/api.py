@@ -0,0 +1,325 @@
+import os
+import asyncio
+import functools
+import contextvars
+import multiprocessing as mp
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi.responses import PlainTextResponse
+
+from src.analysis import build_llm_instructions, gap_analysis, retrieve_gap_context
+from src.cv_cache import get_cv_profile_from_bytes
+from src.jd import get_jd_requirements
+from src.llm_groq import agenerate_gap_report
+from src.parsing import MAX_UPLOAD_MB
+from src.rag import get_or_build_vectordb
+from src.role_fit import rank_roles
+from src.roles import load_role_scope, normalize_role_name
+from src.semantic_skills import get_skill_matrix, semantic_enabled
+from src.tracing import render_prometheus, span
+
+# Headless analysis service:  uvicorn src.api:app --host 0.0.0.0 --port 8000 --workers 4
+# Each uvicorn worker is its own process with one embedding model / vector store.
+
+API_CPU_POOL = os.getenv("API_CPU_POOL", "thread").strip().lower()  # "thread" or "process"
+API_CPU_WORKERS = int(os.getenv("API_CPU_WORKERS", "").strip() or (os.cpu_count() or 1))
+API_MAX_INFLIGHT = int(os.getenv("API_MAX_INFLIGHT", "8"))
+API_QUEUE_SIZE = int(os.getenv("API_QUEUE_SIZE", "32"))
+API_REQUEST_TIMEOUT = float(os.getenv("API_REQUEST_TIMEOUT", "120"))
+API_MAX_UPLOAD_MB = float(os.getenv("API_MAX_UPLOAD_MB", "").strip() or MAX_UPLOAD_MB)
+API_MAX_BATCH = int(os.getenv("API_MAX_BATCH", "20"))
+API_MAX_RANK_LLM = int(os.getenv("API_MAX_RANK_LLM", "3"))
+SUPPORTED_SUFFIXES = (".pdf", ".docx")
+
+
+class Overloaded(Exception):
+    pass
+
+
+class AdmissionQueue:
+    """At most `max_active` analyses run at once and up to `max_waiting` more wait for a slot.
+
+    Anything beyond that is rejected straight away (HTTP 503) instead of piling up
+    behind requests that will time out anyway.
+    """
+
+    def __init__(self, max_active: int, max_waiting: int):
+        self.max_active = max(1, max_active)
+        self.max_waiting = max(0, max_waiting)
+        self.active = 0
+        self.waiting = 0
+        self._sem = asyncio.Semaphore(self.max_active)
+
+    @asynccontextmanager
+    async def slot(self):
+        if self.active >= self.max_active and self.waiting >= self.max_waiting:
+            raise Overloaded()
+        self.waiting += 1
+        try:
+            await self._sem.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._sem.release()
+
+    def stats(self) -> Dict:
+        return {"active": self.active, "waiting": self.waiting, "max_active": self.max_active, "max_waiting": self.max_waiting}
+
+
+_STATE: Dict = {}
+
+
+def _make_cpu_pool() -> Executor:
+    if API_CPU_POOL == "process":
+        # parsing + skill matching are pure Python; processes sidestep the GIL
+        return ProcessPoolExecutor(max_workers=API_CPU_WORKERS, mp_context=mp.get_context("spawn"))
+    return ThreadPoolExecutor(max_workers=API_CPU_WORKERS, thread_name_prefix="api-cpu")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    load_dotenv()
+    _STATE["cpu_pool"] = _make_cpu_pool()
+    _STATE["queue"] = AdmissionQueue(API_MAX_INFLIGHT, API_QUEUE_SIZE)
+    if os.getenv("API_WARMUP", "1").strip() == "1":
+        # not ready until the embedding model and index are loaded
+        await asyncio.to_thread(get_or_build_vectordb)
+        if semantic_enabled():
+            await asyncio.to_thread(get_skill_matrix)
+    try:
+        yield
+    finally:
+        _STATE.pop("cpu_pool").shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(title="Skill Gap Analyzer API", lifespan=lifespan)
+
+
+async def _run_cpu(fn, *args):
+    loop = asyncio.get_running_loop()
+    pool = _STATE["cpu_pool"]
+    if isinstance(pool, ProcessPoolExecutor):
+        return await loop.run_in_executor(pool, functools.partial(fn, *args))
+    # threads keep the caller's context, so spans nest under the request's trace
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(pool, functools.partial(ctx.run, fn, *args))
+
+
+async def _read_upload(upload: UploadFile) -> bytes:
+    name = (upload.filename or "").lower()
+    if not name.endswith(SUPPORTED_SUFFIXES):
+        raise HTTPException(415, f"Unsupported file type for '{upload.filename}'. Please upload .pdf or .docx.")
+    limit = int(API_MAX_UPLOAD_MB * 1024 * 1024)
+    if upload.size is not None and upload.size > limit:
+        raise HTTPException(413, f"'{upload.filename}' is larger than {API_MAX_UPLOAD_MB:g} MB.")
+    data = await upload.read(limit + 1)
+    if len(data) > limit:
+        raise HTTPException(413, f"'{upload.filename}' is larger than {API_MAX_UPLOAD_MB:g} MB.")
+    return data
+
+
+def _check_job_description(job_description: str) -> None:
+    # same rule as the Streamlit form
+    if job_description and len(job_description.strip()) < 60:
+        raise HTTPException(422, "Please send the full job description (at least 60 characters).")
+
+
+async def analyze_bytes(file_bytes: bytes, filename: str, target_role: str, job_description: str = "",
+                        llm: bool = True, use_cache: bool = True, output_style: str = "Professional (default)") -> Dict:
+    """The Streamlit pipeline without the UI: parse, extract, retrieve, roadmap, optional LLM report.
+
+    With a job description, its skills (weighted) replace the role profile as the required set.
+    """
+    role_key = normalize_role_name(target_role)
+    role_scope = load_role_scope(role_key)
+
+    with span("analysis", via="api", role=role_key, llm=llm) as trace:
+        # before the first await: in a batch the first CV extracts the JD and the rest hit the cache
+        jd = get_jd_requirements(job_description) if job_description.strip() else None
+        entry = await _run_cpu(get_cv_profile_from_bytes, file_bytes, filename)
+        cv_skills = entry["profile"]["skills"]
+
+        vectordb = await asyncio.to_thread(get_or_build_vectordb)
+        run = gap_analysis(vectordb, role_key, role_scope, set(cv_skills), jd)
+        context = await asyncio.to_thread(run.get, "gap")
+        matched, missing = context["matched"], context["missing"]
+        roadmap = await asyncio.to_thread(run.get, "roadmap")
+
+        result = {
+            "file": filename,
+            "role": target_role,
+            "role_key": role_key,
+            "role_file": role_scope["source"],
+            "cv_sha256": entry["sha256"],
+            "cv_cache": entry["cache"],
+            "chars": len(entry["text"]),
+            "required_from": context["required_from"],
+            "matched": matched,
+            "missing": missing,
+            "cv_skills": cv_skills,
+            "playbooks": sorted({d.metadata.get("source", "") for d in run["playbooks"]} - {""}),
+            "roadmap": roadmap,
+        }
+        if jd is not None:
+            result["jd"] = {"sha256": jd["sha256"], "cache": jd["cache"],
+                            "skills": {s: info["weight"] for s, info in jd["skills"].items()}}
+            result["jd_coverage"] = context["coverage"]
+
+        if llm:
+            try:
+                result["llm_report"] = await agenerate_gap_report(
+                    target_role=target_role,
+                    matched=matched,
+                    missing=missing,
+                    cv_skill_evidence=cv_skills,
+                    role_scope=role_scope,
+                    playbook_snippets=run["playbooks"],
+                    roadmap_snippets=await asyncio.to_thread(run.get, "roadmap_docs"),
+                    instructions=build_llm_instructions(output_style, True, ""),
+                    use_cache=use_cache,
+                )
+            except Exception as e:
+                result["llm_error"] = str(e)
+
+    result["timings_ms"] = {rec["span"]: rec["duration_ms"] for rec in trace.collected}
+    return result
+
+
+async def rank_bytes(file_bytes: bytes, filename: str, llm_top: int = 0, use_cache: bool = True,
+                     output_style: str = "Professional (default)") -> Dict:
+    """Parse once, score every role, and write LLM reports for the best `llm_top` roles only."""
+    with span("analysis", via="api", mode="rank_roles", llm=llm_top > 0) as trace:
+        entry = await _run_cpu(get_cv_profile_from_bytes, file_bytes, filename)
+        cv_skills = entry["profile"]["skills"]
+        ranking = rank_roles(cv_skills.keys())
+
+        async def _report(fit: Dict) -> None:
+            role_scope = load_role_scope(fit["role"])
+            context = await asyncio.to_thread(retrieve_gap_context, vectordb, fit["role"], role_scope, set(cv_skills))
+            try:
+                fit["llm_report"] = await agenerate_gap_report(
+                    target_role=fit["role"],
+                    matched=context["matched"],
+                    missing=context["missing"],
+                    cv_skill_evidence=cv_skills,
+                    role_scope=role_scope,
+                    playbook_snippets=context["playbooks"],
+                    roadmap_snippets=context["roadmaps"],
+                    instructions=build_llm_instructions(output_style, True, ""),
+                    use_cache=use_cache,
+                )
+            except Exception as e:
+                fit["llm_error"] = str(e)
+
+        if llm_top > 0:
+            vectordb = await asyncio.to_thread(get_or_build_vectordb)
+            await asyncio.gather(*(_report(fit) for fit in ranking[:llm_top]))
+
+    return {
+        "file": filename,
+        "cv_sha256": entry["sha256"],
+        "cv_cache": entry["cache"],
+        "cv_skills": sorted(cv_skills),
+        "roles": ranking,
+        "timings_ms": {rec["span"]: rec["duration_ms"] for rec in trace.collected},
+    }
+
+
+async def _admitted(make_coro, timeout: Optional[float]):
+    # Request-level deadline covering time in the queue as well as the work itself.
+    # Work already handed to a pool thread/process finishes in the background.
+    limit = API_REQUEST_TIMEOUT if not timeout or timeout <= 0 else min(timeout, API_REQUEST_TIMEOUT)
+    queue: AdmissionQueue = _STATE["queue"]
+
+    async def _run():
+        async with queue.slot():
+            return await make_coro()
+
+    try:
+        return await asyncio.wait_for(_run(), timeout=limit)
+    except Overloaded:
+        raise HTTPException(503, "Server busy, retry shortly.", headers={"Retry-After": "1"})
+    except asyncio.TimeoutError:
+        raise HTTPException(504, f"Analysis did not finish within {limit:g} s.")
+
+
+@app.post("/analyze")
+async def analyze(
+    file: UploadFile = File(...),
+    role: str = Form(...),
+    job_description: str = Form(""),
+    llm: bool = Form(True),
+    use_cache: bool = Form(True),
+    timeout: Optional[float] = Form(None),
+):
+    _check_job_description(job_description)
+    data = await _read_upload(file)
+    try:
+        return await _admitted(
+            lambda: analyze_bytes(data, file.filename, role, job_description, llm, use_cache), timeout
+        )
+    except ValueError as e:
+        raise HTTPException(422, str(e))
+
+
+@app.post("/analyze/batch")
+async def analyze_batch(
+    files: List[UploadFile] = File(...),
+    role: str = Form(...),
+    job_description: str = Form(""),
+    llm: bool = Form(False),
+    use_cache: bool = Form(True),
+    timeout: Optional[float] = Form(None),
+):
+    if len(files) > API_MAX_BATCH:
+        raise HTTPException(413, f"At most {API_MAX_BATCH} files per batch.")
+    _check_job_description(job_description)
+    uploads = [(f.filename, await _read_upload(f)) for f in files]
+
+    async def _one(name: str, data: bytes) -> Dict:
+        try:
+            return await analyze_bytes(data, name, role, job_description, llm, use_cache)
+        except Exception as e:
+            return {"file": name, "error": f"{type(e).__name__}: {e}"}
+
+    async def _all() -> List[Dict]:
+        # one admission slot for the whole batch; the CPU pool bounds the parallel parsing
+        return list(await asyncio.gather(*(_one(name, data) for name, data in uploads)))
+
+    results = await _admitted(_all, timeout)
+    return {"role": role, "count": len(results), "results": results}
+
+
+@app.post("/analyze/roles")
+async def analyze_roles(
+    file: UploadFile = File(...),
+    llm_top: int = Form(1),
+    use_cache: bool = Form(True),
+    timeout: Optional[float] = Form(None),
+):
+    if not 0 <= llm_top <= API_MAX_RANK_LLM:
+        raise HTTPException(422, f"llm_top must be between 0 and {API_MAX_RANK_LLM}.")
+    data = await _read_upload(file)
+    try:
+        return await _admitted(lambda: rank_bytes(data, file.filename, llm_top, use_cache), timeout)
+    except ValueError as e:
+        raise HTTPException(422, str(e))
+
+
+@app.get("/healthz")
+async def healthz():
+    queue: Optional[AdmissionQueue] = _STATE.get("queue")
+    return {"status": "ok", "queue": queue.stats() if queue else None, "cpu_pool": API_CPU_POOL}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return render_prometheus()
@@ -0,0 +1,273 @@
+import argparse
+import asyncio
+import csv
+import glob
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from src.analysis import build_llm_instructions, compute_gap, resolve_required_skills, retrieve_playbooks
+from src.cv_cache import parse_cv_bytes
+from src.jd import diff_against_jd, extract_jd_requirements, required_skill_weights
+from src.parsing import read_upload_bytes
+from src.roles import load_role_scope, normalize_role_name
+from src.tracing import span, track_peak_rss
+
+SUPPORTED_SUFFIXES = (".pdf", ".docx")
+CSV_FIELDS = ["file", "role", "chars", "rss_peak_mb", "matched_count", "missing_count", "jd_coverage", "matched", "missing", "playbooks",
+              "error", "llm_report"]
+
+# Per-process state set up by the pool initializer (one embedding model / vector store per worker)
+_WORKER_STATE: Dict = {}
+
+
+def collect_files(inputs: List[str]) -> List[str]:
+    files = []
+    for item in inputs:
+        p = Path(item)
+        if p.is_dir():
+            candidates = [str(x) for x in sorted(p.rglob("*"))]
+        else:
+            candidates = sorted(glob.glob(item, recursive=True))
+        files.extend(c for c in candidates if c.lower().endswith(SUPPORTED_SUFFIXES) and Path(c).is_file())
+
+    seen = set()
+    unique = []
+    for f in files:
+        key = str(Path(f).resolve())
+        if key not in seen:
+            seen.add(key)
+            unique.append(key)
+    return unique
+
+
+def _init_worker(use_retrieval: bool) -> None:
+    load_dotenv()
+    if use_retrieval:
+        from src.rag import get_or_build_vectordb
+
+        _WORKER_STATE["vectordb"] = get_or_build_vectordb()
+
+
+def analyze_file(path: str, target_role: str, required_skills: List[str], jd: Optional[Dict] = None) -> Dict:
+    record: Dict = {"file": path, "role": target_role}
+    try:
+        with open(path, "rb") as f:
+            file_bytes = read_upload_bytes(f)  # MAX_UPLOAD_MB applies here too
+        with span("parse_cv", bytes=len(file_bytes)) as s, track_peak_rss(s):
+            cv_text, cv_profile = parse_cv_bytes(file_bytes, path)
+        del file_bytes
+        record["rss_peak_mb"] = s.attrs.get("rss_peak_mb")
+        if jd is not None:
+            # jd arrives already extracted and filtered to required_skills, so workers never re-parse it
+            gap = diff_against_jd(jd, [cv_profile["skills"].keys()])[0]
+            matched, missing = gap["matched"], gap["missing"]
+            record["jd_coverage"] = gap["coverage"]
+        else:
+            matched, missing = compute_gap(set(cv_profile["skills"].keys()), set(required_skills))
+
+        vectordb = _WORKER_STATE.get("vectordb")
+        playbooks = retrieve_playbooks(vectordb, missing) if vectordb is not None else []
+
+        record.update({
+            "chars": len(cv_text),
+            "matched": matched,
+            "missing": missing,
+            "cv_skills": cv_profile["skills"],
+            "playbooks": sorted({p.metadata.get("source", "") for p in playbooks} - {""}),
+            "playbook_snippets": [p.page_content for p in playbooks],  # packed into the prompt by token budget
+        })
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    return record
+
+
+def checkpoint_key(role_key: str, required_skills: List[str], jd: Optional[Dict] = None, use_retrieval: bool = True) -> str:
+    # What a record's matched/missing lists, playbooks and report depend on besides the CV itself
+    payload = json.dumps({"required": sorted(required_skills), "jd": jd["skills"] if jd else None,
+                          "retrieval": use_retrieval}, sort_keys=True)
+    return f"{role_key}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]}"
+
+
+def load_checkpoint(path: Path, key: Optional[str] = None) -> Dict[str, Dict]:
+    # Later lines win, so a record re-written after the LLM stage replaces the extraction-only one.
+    # Records written for another role / job description (a different key) are ignored.
+    records: Dict[str, Dict] = {}
+    if not path.exists():
+        return records
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue  # partial line from an interrupted run
+            if rec.get("file") and (key is None or rec.get("checkpoint_key") == key):
+                records[rec["file"]] = rec
+    return records
+
+
+def _append_checkpoint(handle, record: Dict) -> None:
+    handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+    handle.flush()
+
+
+def run_extraction(files: List[str], target_role: str, required_skills: List[str], workers: int,
+                   use_retrieval: bool, checkpoint, records: Dict[str, Dict], jd: Optional[Dict] = None,
+                   key: Optional[str] = None) -> None:
+    ctx = mp.get_context("spawn")  # torch and forked workers do not mix
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                             initargs=(use_retrieval,)) as pool:
+        futures = {pool.submit(analyze_file, f, target_role, required_skills, jd): f for f in files}
+        for i, fut in enumerate(as_completed(futures), start=1):
+            rec = fut.result()
+            rec["checkpoint_key"] = key
+            records[rec["file"]] = rec
+            _append_checkpoint(checkpoint, rec)
+            status = "error" if rec.get("error") else f"{len(rec['matched'])} matched, {len(rec['missing'])} missing"
+            print(f"[{i}/{len(files)}] {rec['file']}: {status}", file=sys.stderr)
+
+
+def run_llm_stage(pending: List[Dict], target_role: str, role_scope: dict, instructions: str,
+                  concurrency: int, checkpoint) -> None:
+    from src.llm_groq import agenerate_gap_report
+
+    async def _report(rec: Dict, sem: asyncio.Semaphore) -> Dict:
+        async with sem:
+            try:
+                rec["llm_report"] = await agenerate_gap_report(
+                    target_role=target_role,
+                    matched=rec["matched"],
+                    missing=rec["missing"],
+                    cv_skill_evidence=rec["cv_skills"],
+                    role_scope=role_scope,
+                    playbook_snippets=rec.get("playbook_snippets", ""),
+                    instructions=instructions,
+                )
+            except Exception as e:
+                rec["llm_error"] = str(e)
+        return rec
+
+    async def _run() -> None:
+        # Bounded concurrency keeps us under the provider's rate limits; one pooled client serves all calls
+        sem = asyncio.Semaphore(max(1, concurrency))
+        for fut in asyncio.as_completed([_report(rec, sem) for rec in pending]):
+            _append_checkpoint(checkpoint, await fut)
+
+    asyncio.run(_run())
+
+
+def write_output(records: List[Dict], output: Path, fmt: str) -> None:
+    output.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "jsonl":
+        with output.open("w", encoding="utf-8") as f:
+            for rec in records:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        return
+
+    with output.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for rec in records:
+            writer.writerow({
+                "file": rec["file"],
+                "role": rec.get("role", ""),
+                "chars": rec.get("chars", ""),
+                "rss_peak_mb": rec.get("rss_peak_mb") or "",
+                "matched_count": len(rec.get("matched", [])),
+                "missing_count": len(rec.get("missing", [])),
+                "jd_coverage": rec.get("jd_coverage", ""),
+                "matched": "; ".join(rec.get("matched", [])),
+                "missing": "; ".join(rec.get("missing", [])),
+                "playbooks": "; ".join(rec.get("playbooks", [])),
+                "error": rec.get("error", "") or rec.get("llm_error", ""),
+                "llm_report": rec.get("llm_report", ""),
+            })
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.batch", description="Batch CV skill gap analysis.")
+    parser.add_argument("inputs", nargs="+", help="CV files, directories or glob patterns (.pdf / .docx)")
+    parser.add_argument("--role", required=True, help="Target role, e.g. 'Data Engineer'")
+    parser.add_argument("--output", "-o", default="batch_results.jsonl")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default=None, help="Defaults to the output file suffix")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--job-description", default=None,
+                        help="Text file with the job posting; its skills replace the role profile as the required set")
+    parser.add_argument("--no-retrieval", action="store_true", help="Skip playbook retrieval (no embedding model)")
+    parser.add_argument("--llm", action="store_true", help="Also generate an LLM report per CV")
+    parser.add_argument("--llm-concurrency", type=int, default=4)
+    parser.add_argument("--checkpoint", default=None, help="Defaults to <output>.checkpoint.jsonl")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore an existing checkpoint")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    output = Path(args.output)
+    fmt = args.format or ("csv" if output.suffix.lower() == ".csv" else "jsonl")
+    checkpoint_path = Path(args.checkpoint) if args.checkpoint else output.with_name(output.name + ".checkpoint.jsonl")
+
+    files = collect_files(args.inputs)
+    if not files:
+        print("No .pdf or .docx files found.", file=sys.stderr)
+        return 1
+
+    role_key = normalize_role_name(args.role)
+    role_scope = load_role_scope(role_key)
+    use_retrieval = not args.no_retrieval
+
+    vectordb = None
+    if use_retrieval:
+        from src.rag import get_or_build_vectordb
+
+        # Build/sync the index once here so workers only open it
+        vectordb = get_or_build_vectordb()
+    jd = None
+    if args.job_description:
+        # extracted once here and shipped to every worker
+        jd_text = Path(args.job_description).read_text(encoding="utf-8")
+        jd_skills = required_skill_weights(extract_jd_requirements(jd_text), role_scope["exclude"])
+        if jd_skills:
+            jd = {"skills": {s: {"weight": w} for s, w in jd_skills.items()}}
+        else:
+            print("No known skills found in the job description; using the role profile.", file=sys.stderr)
+
+    required_skills = list(jd["skills"]) if jd else sorted(resolve_required_skills(role_key, role_scope, vectordb))
+    if not required_skills:
+        print(f"No required skills found for role '{args.role}'.", file=sys.stderr)
+        return 1
+
+    if args.no_resume and checkpoint_path.exists():
+        checkpoint_path.unlink()
+    key = checkpoint_key(role_key, required_skills, jd, use_retrieval)
+    records = load_checkpoint(checkpoint_path, key)
+    todo = [f for f in files if f not in records or records[f].get("error")]
+    print(f"{len(files)} CVs, {len(files) - len(todo)} already done, {len(todo)} to process", file=sys.stderr)
+
+    checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+    with checkpoint_path.open("a", encoding="utf-8") as checkpoint:
+        if todo:
+            run_extraction(todo, args.role, required_skills, max(1, args.workers), use_retrieval, checkpoint, records, jd,
+                           key)
+
+        if args.llm:
+            pending = [records[f] for f in files if f in records and not records[f].get("error") and not records[f].get("llm_report")]
+            if pending:
+                instructions = build_llm_instructions("Professional (default)", use_retrieval, "")
+                run_llm_stage(pending, args.role, role_scope, instructions, args.llm_concurrency, checkpoint)
+
+    write_output([records[f] for f in files if f in records], output, fmt)
+    print(f"Wrote {output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
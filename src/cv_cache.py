@@ -0,0 +1,182 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from src.parsing import iter_text_chunks, read_upload_bytes
+from src.semantic_skills import add_semantic_matches, semantic_enabled, semantic_signature
+from src.tracing import annotate, span, track_peak_rss
+from src.skills import extract_skills_from_chunks
+from src.taxonomy import get_taxonomy
+
+# Bump when parsing output changes; the skill taxonomy version is folded in automatically
+PARSER_VERSION = "3"  # 3: DOCX tables, headers, footers and text boxes
+
+
+def extractor_version() -> str:
+    # Resolved when a key is built, so importing this module does not load the taxonomy
+    return f"{PARSER_VERSION}-{get_taxonomy().version}"
+
+
+class CVProfileCache:
+    """Content-addressed cache: SHA-256 of the CV bytes -> extracted text and skill profile.
+
+    An in-memory LRU bounded by entry count and total characters, with an optional
+    on-disk tier (one JSON file per CV) bounded by file count.
+    """
+
+    def __init__(self, max_entries: int = 64, max_chars: int = 20_000_000,
+                 disk_dir: Optional[Path] = None, max_disk_entries: int = 1000):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.json"
+
+    def get(self, key: str) -> Tuple[Optional[Dict], str]:
+        # Returns (entry, tier) where tier is "memory", "disk" or "miss"
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry, "memory"
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                entry = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                entry = None
+            if entry is not None:
+                path.touch()  # mtime doubles as the disk tier's LRU clock
+                self._remember(key, entry)
+                with self._lock:
+                    self.disk_hits += 1
+                return entry, "disk"
+
+        with self._lock:
+            self.misses += 1
+        return None, "miss"
+
+    def put(self, key: str, entry: Dict) -> None:
+        self._remember(key, entry)
+        if self.disk_dir:
+            path = self._disk_path(key)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(path)
+            self._evict_disk()
+
+    def _remember(self, key: str, entry: Dict) -> None:
+        size = len(entry.get("text", ""))
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._chars -= len(old.get("text", ""))
+            self._entries[key] = entry
+            self._chars += size
+            while self._entries and (len(self._entries) > self.max_entries or self._chars > self.max_chars):
+                _, evicted = self._entries.popitem(last=False)
+                self._chars -= len(evicted.get("text", ""))
+
+    def _evict_disk(self) -> None:
+        files = sorted(self.disk_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for p in files[: max(0, len(files) - self.max_disk_entries)]:
+            try:
+                p.unlink()
+            except OSError:
+                pass
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "chars": self._chars,
+            }
+
+
+_CACHE: Optional[CVProfileCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_cv_cache() -> CVProfileCache:
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                disk_dir = os.getenv("CV_CACHE_DIR", "").strip()
+                _CACHE = CVProfileCache(
+                    max_entries=int(os.getenv("CV_CACHE_MAX_ENTRIES", "").strip() or 64),
+                    disk_dir=Path(disk_dir) if disk_dir else None,
+                )
+    return _CACHE
+
+
+def content_key(file_bytes: bytes, name: str) -> str:
+    # The extension picks the parser, so it is part of the key along with the extractor version
+    suffix = Path((name or "").lower()).suffix
+    h = hashlib.sha256(file_bytes)
+    h.update(f"|{suffix}|{extractor_version()}|{semantic_signature()}".encode("utf-8"))
+    return h.hexdigest()
+
+
+def get_cv_profile(uploaded_file) -> Dict:
+    """Parse the CV and extract skills, reusing earlier results for identical bytes.
+
+    Returns {"text", "profile", "sha256", "cache"} where cache is "memory", "disk" or "miss".
+    """
+    return get_cv_profile_from_bytes(read_upload_bytes(uploaded_file), uploaded_file.name)
+
+
+def parse_cv_bytes(file_bytes: bytes, name: str) -> Tuple[str, Dict]:
+    # Skill extraction runs on each PDF page / DOCX block while later ones are still being
+    # parsed; the full text is joined once, at the end
+    chunks = []
+
+    def _chunks():
+        for t in iter_text_chunks(file_bytes, name):
+            if t.strip():
+                chunks.append(t)
+                yield t
+
+    profile = extract_skills_from_chunks(_chunks())
+    text = "\n".join(chunks)
+    if (name or "").lower().endswith(".pdf"):
+        annotate(pages=len(chunks))
+    if semantic_enabled():
+        profile = add_semantic_matches(text, profile)
+    return text, profile
+
+
+def get_cv_profile_from_bytes(file_bytes: bytes, name: str) -> Dict:
+    # Module-level and picklable, so it can also run in a process pool (src/api.py)
+    with span("parse_cv", bytes=len(file_bytes)) as s, track_peak_rss(s):
+        key = content_key(file_bytes, name)
+        cache = get_cv_cache()
+
+        entry, tier = cache.get(key)
+        if entry is not None:
+            s.set(cache=tier, chars=len(entry["text"]))
+            return {"text": entry["text"], "profile": entry["profile"], "sha256": key, "cache": tier}
+
+        text, profile = parse_cv_bytes(file_bytes, name)
+        cache.put(key, {"text": text, "profile": profile})
+        s.set(cache="miss", chars=len(text), skills=len(profile["skills"]))
+    return {"text": text, "profile": profile, "sha256": key, "cache": "miss"}
@@ -0,0 +1,212 @@
+import os
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.skills import extract_skills_with_evidence
+from src.taxonomy import get_taxonomy
+from src.tracing import span
+
+# Job description -> required skills with weights, extracted by the same matcher as CVs.
+# A skill's weight comes from the section it appears in, plus a little for repeated mentions.
+SECTION_WEIGHTS = {"required": 1.0, "general": 0.8, "preferred": 0.5}
+MENTION_BONUS = 0.1  # per mention score above 1, capped at 1.0
+
+# Bump when the sectioning / weighting changes; the skill taxonomy version is folded in automatically
+JD_PARSER_VERSION = "2"
+
+
+def jd_extractor_version() -> str:
+    # Resolved when a key is built, so importing this module does not load the taxonomy
+    return f"{JD_PARSER_VERSION}-{get_taxonomy().version}"
+
+
+_PREFERRED_RE = re.compile(r"nice[- ]to[- ]have|preferred|bonus|desirable|good to have|\ba plus\b|advantageous", re.IGNORECASE)
+_REQUIRED_RE = re.compile(
+    r"requirements?|required|qualifications|must[- ]haves?|\bmust\b|essential|what you(?:'ll)? (?:need|bring)|you have",
+    re.IGNORECASE,
+)
+_OTHER_HEADING_RE = re.compile(
+    r"responsibilities|about (?:us|the role|you)|what you(?:'ll)? do|benefits|we offer|overview|the role", re.IGNORECASE
+)
+_BULLET_RE = re.compile(r"^\s*(?:[-*•▪●]|\d+[.)])\s+")
+
+
+def _cue_section(text: str) -> Optional[str]:
+    if _PREFERRED_RE.search(text):
+        return "preferred"
+    if _REQUIRED_RE.search(text):
+        return "required"
+    if _OTHER_HEADING_RE.search(text):
+        return "general"
+    return None
+
+
+def _split_cue(line: str) -> Optional[Tuple[str, str]]:
+    # "Nice to have: Docker" -> ("preferred", "Docker"); None unless the text before the first colon is a cue
+    head, sep, rest = _BULLET_RE.sub("", line, count=1).partition(":")
+    head = head.strip().strip("#*_ ")
+    if not sep or not head or len(head.split()) > 5:
+        return None
+    section = _cue_section(head)
+    return (section, rest.strip()) if section else None
+
+
+def _is_heading(line: str) -> bool:
+    stripped = line.strip().strip("#*_ ")
+    words = len(stripped.split())
+    if not stripped or words > 8 or _BULLET_RE.match(line):
+        return False
+    if stripped.endswith(":") or line.lstrip().startswith("#"):
+        return True
+    # bare "Requirements" / "Nice to have" lines
+    return words <= 4 and _cue_section(stripped) is not None
+
+
+def _line_section(line: str, current: str) -> str:
+    # a cue on the line itself ("... is a plus") wins over the heading it sits under
+    if _PREFERRED_RE.search(line):
+        return "preferred"
+    if current == "general" and _REQUIRED_RE.search(line):
+        return "required"
+    return current
+
+
+def split_sections(text: str) -> Dict[str, str]:
+    # Lines grouped by the heading they sit under; cue words themselves are structure,
+    # never content ("Requirements:" is not a mention of Business Analysis)
+    lines: Dict[str, List[str]] = {name: [] for name in SECTION_WEIGHTS}
+    current = "general"
+    for line in (text or "").splitlines():
+        cue = _split_cue(line)
+        if cue:
+            section, rest = cue
+            if not _BULLET_RE.match(line):
+                current = section  # "Must have: Docker" opens a section; "- Must have: Docker" is one item
+            if rest:
+                lines[_line_section(rest, section)].append(rest)
+            continue
+        if _is_heading(line):
+            current = _cue_section(line) or "general"
+            if current != "general" or _OTHER_HEADING_RE.search(line):
+                continue
+        lines[_line_section(line, current)].append(line)
+    return {name: "\n".join(ls) for name, ls in lines.items() if ls}
+
+
+def extract_jd_requirements(text: str) -> Dict:
+    """Required skills of a job posting: {"skills": {skill: {"weight", "section", "mentions", "evidence"}}}."""
+    skills: Dict[str, Dict] = {}
+    for section, section_text in split_sections(text).items():
+        for skill, info in extract_skills_with_evidence(section_text)["skills"].items():
+            acc = skills.setdefault(skill, {"weight": 0.0, "section": section, "mentions": 0, "evidence": []})
+            if SECTION_WEIGHTS[section] > SECTION_WEIGHTS[acc["section"]]:
+                acc["section"] = section
+            acc["mentions"] += info["mentions"]
+            acc["evidence"].extend(info["evidence"][: 5 - len(acc["evidence"])])
+
+    for info in skills.values():
+        score = 1 + (info["mentions"] >= 2) + (info["mentions"] >= 4)  # same steps as the CV mention score
+        info["weight"] = round(min(1.0, SECTION_WEIGHTS[info["section"]] + MENTION_BONUS * (score - 1)), 2)
+    return {"skills": dict(sorted(skills.items(), key=lambda kv: (-kv[1]["weight"], kv[0])))}
+
+
+def jd_key(text: str) -> str:
+    # Whitespace-insensitive, so re-pasting the same posting is still a hit
+    normalized = "\n".join(" ".join(ln.split()) for ln in (text or "").strip().splitlines() if ln.strip())
+    return hashlib.sha256(f"{normalized}|{jd_extractor_version()}".encode("utf-8")).hexdigest()
+
+
+class JDRequirementsCache:
+    """In-memory LRU: JD hash -> extracted requirements. Screening many CVs against one posting parses it once."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_extract(self, text: str) -> Tuple[Dict, str, str]:
+        key = jd_key(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry, key, "hit"
+            self.misses += 1
+
+        entry = extract_jd_requirements(text)
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry, key, "miss"
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+_CACHE: Optional[JDRequirementsCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_jd_cache() -> JDRequirementsCache:
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = JDRequirementsCache(max_entries=int(os.getenv("JD_CACHE_MAX_ENTRIES", "").strip() or 256))
+    return _CACHE
+
+
+def get_jd_requirements(text: str) -> Dict:
+    """Cached extract_jd_requirements. Returns {"skills", "sha256", "cache"} where cache is "hit" or "miss"."""
+    with span("parse_jd", chars=len(text or "")) as s:
+        entry, key, tier = get_jd_cache().get_or_extract(text)
+        s.set(cache=tier, skills=len(entry["skills"]))
+    return {"skills": entry["skills"], "sha256": key, "cache": tier}
+
+
+def required_skill_weights(jd: Dict, exclude: Iterable[str] = ()) -> Dict[str, float]:
+    # JD skill -> weight, most important first, without the skills the role excludes
+    taxonomy = get_taxonomy()
+    excluded = taxonomy.ids(exclude)
+    return {s: info["weight"] for s, info in jd["skills"].items() if taxonomy.skill_id(s) not in excluded}
+
+
+def diff_against_jd(jd: Dict, cv_skill_sets: Sequence[Iterable[str]], exclude: Iterable[str] = ()) -> List[Dict]:
+    """Matched/missing JD skills and weighted coverage for each CV, as one boolean-matrix pass.
+
+    Skills are kept in JD weight order (most important first), so "missing" doubles as a priority list.
+    """
+    taxonomy = get_taxonomy()
+    required = required_skill_weights(jd, exclude)
+    skills = list(required)
+    col = {taxonomy.skill_id(s): j for j, s in enumerate(skills)}
+    weights = np.array(list(required.values()), dtype=np.float64)
+
+    has = np.zeros((len(cv_skill_sets), len(skills)), dtype=bool)
+    for row, cv_skills in enumerate(cv_skill_sets):
+        cols = [col[i] for i in taxonomy.ids(cv_skills) if i in col]
+        has[row, cols] = True
+    total = weights.sum()
+    coverage = has @ weights / total if total else np.zeros(len(cv_skill_sets))
+
+    names = np.array(skills, dtype=object)
+    return [
+        {
+            "required": skills,
+            "matched": names[has[row]].tolist(),
+            "missing": names[~has[row]].tolist(),
+            "weights": dict(required),
+            "coverage": round(float(coverage[row]), 3),
+        }
+        for row in range(len(cv_skill_sets))
+    ]
@@ -1,7 +1,32 @@
 import os
 import json
-from typing import Dict, List, Any
-from groq import Groq
+import time
+import random
+import asyncio
+import threading
+import weakref
+from typing import TYPE_CHECKING, Dict, List, Any, Iterator, Optional, Sequence, Tuple, Union
+from src.llm_cache import cache_key, get_llm_cache
+from src.prompt_budget import INSTRUCTIONS_MAX_TOKENS, count_tokens, model_budget, pack_context, truncate_to_tokens
+from src.tracing import annotate, span, start_span
+
+# the groq SDK (httpx, pydantic models) is imported on first request, not at app start
+if TYPE_CHECKING:
+    from groq import AsyncGroq, Groq
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+TEMPERATURE = 0.2
+MESSAGE_OVERHEAD_TOKENS = 8  # role markers / separators per chat message
+
+# Retrieved context: a joined string or the chunks themselves (Documents or str), best first
+Snippets = Union[str, Sequence[Any]]
+RETRY_STATUSES = {408, 409, 429}
+
+# Long-lived clients (one HTTP connection pool each), shared across calls and threads
+_CLIENT_LOCK = threading.Lock()
+_SYNC_CLIENTS: Dict[Tuple[str, str, float], "Groq"] = {}
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict]" = weakref.WeakKeyDictionary()
+_SYNC_SEMAPHORE: Optional[threading.BoundedSemaphore] = None
 
 def _safe_join(items) -> str:
     if not items:
@@ -10,32 +35,226 @@ def _safe_join(items) -> str:
         items = list(items)
     return ", ".join([str(x) for x in items if str(x).strip()])
 
-def _truncate(text: str, max_chars: int) -> str:
-    if not text:
-        return ""
-    text = text.strip()
-    return text[:max_chars]
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, "").strip() or default)
+    except ValueError:
+        return default
 
-def generate_gap_report(
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, "").strip() or default)
+    except ValueError:
+        return default
+
+
+def _client_settings() -> Tuple[str, str, float]:
+    api_key = os.getenv("GROQ_API_KEY", "").strip()
+    if not api_key:
+        raise RuntimeError("Missing GROQ_API_KEY. Add it to .env (local) or Streamlit Secrets (cloud).")
+    base_url = os.getenv("GROQ_BASE_URL", "").strip()  # e.g. a local stub server
+    timeout = _env_float("GROQ_TIMEOUT", 60.0)
+    return api_key, base_url, timeout
+
+
+def get_client() -> "Groq":
+    key = _client_settings()
+    client = _SYNC_CLIENTS.get(key)
+    if client is None:
+        with _CLIENT_LOCK:
+            client = _SYNC_CLIENTS.get(key)
+            if client is None:
+                from groq import Groq
+
+                api_key, base_url, timeout = key
+                # retries are handled by _with_retries so backoff is rate-limit aware
+                client = Groq(api_key=api_key, base_url=base_url or None, timeout=timeout, max_retries=0)
+                _SYNC_CLIENTS[key] = client
+    return client
+
+
+def get_async_client() -> "AsyncGroq":
+    # httpx async pools are bound to their event loop, so keep one client per loop
+    key = _client_settings()
+    loop = asyncio.get_running_loop()
+    per_loop = _ASYNC_CLIENTS.setdefault(loop, {})
+    client = per_loop.get(key)
+    if client is None:
+        from groq import AsyncGroq
+
+        api_key, base_url, timeout = key
+        client = AsyncGroq(api_key=api_key, base_url=base_url or None, timeout=timeout, max_retries=0)
+        per_loop[key] = client
+    return client
+
+
+def _sync_semaphore() -> threading.BoundedSemaphore:
+    global _SYNC_SEMAPHORE
+    if _SYNC_SEMAPHORE is None:
+        with _CLIENT_LOCK:
+            if _SYNC_SEMAPHORE is None:
+                _SYNC_SEMAPHORE = threading.BoundedSemaphore(max(1, _env_int("GROQ_MAX_CONCURRENCY", 8)))
+    return _SYNC_SEMAPHORE
+
+
+def _async_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    per_loop = _ASYNC_CLIENTS.setdefault(loop, {})
+    sem = per_loop.get("semaphore")
+    if sem is None:
+        sem = asyncio.Semaphore(max(1, _env_int("GROQ_MAX_CONCURRENCY", 8)))
+        per_loop["semaphore"] = sem
+    return sem
+
+
+def _retry_delay(err: Exception, attempt: int) -> Optional[float]:
+    # Seconds to wait before retrying, or None if the error is not retryable
+    import groq
+
+    if isinstance(err, (groq.APITimeoutError, groq.APIConnectionError)):
+        retry_after = None
+    elif isinstance(err, groq.APIStatusError):
+        if err.status_code not in RETRY_STATUSES and err.status_code < 500:
+            return None
+        retry_after = None
+        headers = getattr(err.response, "headers", None) or {}
+        try:
+            retry_after = float(headers.get("retry-after", ""))
+        except (TypeError, ValueError):
+            pass
+    else:
+        return None
+
+    if retry_after is not None and retry_after >= 0:
+        return min(retry_after, _env_float("GROQ_MAX_BACKOFF", 30.0))
+    base = _env_float("GROQ_BACKOFF_BASE", 0.5)
+    delay = min(base * (2 ** attempt), _env_float("GROQ_MAX_BACKOFF", 30.0))
+    return delay * (0.5 + random.random() / 2)  # jitter so parallel callers do not retry in lockstep
+
+
+def _annotate_usage(resp) -> None:
+    usage = getattr(resp, "usage", None)
+    if usage is not None:
+        annotate(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
+
+
+def _prompt_size(messages: List[Dict[str, str]]) -> Dict[str, int]:
+    # local count until the API reports real usage
+    text = "".join(m["content"] for m in messages)
+    return {"chars": len(text), "prompt_tokens": count_tokens(text) + MESSAGE_OVERHEAD_TOKENS * len(messages)}
+
+
+def _complete(model: str, messages: List[Dict[str, str]]) -> str:
+    max_retries = max(0, _env_int("GROQ_MAX_RETRIES", 4))
+    client = get_client()
+    attempt = 0
+    while True:
+        try:
+            with _sync_semaphore():
+                resp = client.chat.completions.create(
+                    model=model,
+                    temperature=TEMPERATURE,
+                    max_tokens=model_budget(model).max_output,
+                    messages=messages,
+                )
+            _annotate_usage(resp)
+            return resp.choices[0].message.content.strip()
+        except Exception as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None or attempt >= max_retries:
+                raise
+        time.sleep(delay)
+        attempt += 1
+
+
+def _stream(model: str, messages: List[Dict[str, str]]) -> Iterator[str]:
+    # Retries only cover opening the stream; once tokens have been yielded, errors propagate
+    max_retries = max(0, _env_int("GROQ_MAX_RETRIES", 4))
+    client = get_client()
+    sem = _sync_semaphore()
+    attempt = 0
+    while True:
+        sem.acquire()
+        try:
+            stream = client.chat.completions.create(
+                model=model,
+                temperature=TEMPERATURE,
+                max_tokens=model_budget(model).max_output,
+                messages=messages,
+                stream=True,
+            )
+            break
+        except Exception as e:
+            sem.release()
+            delay = _retry_delay(e, attempt)
+            if delay is None or attempt >= max_retries:
+                raise
+        time.sleep(delay)
+        attempt += 1
+
+    try:
+        started = False
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta and not started:
+                delta = delta.lstrip()  # match the stripped non-streaming output
+            if delta:
+                started = True
+                yield delta
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+        sem.release()
+
+
+async def _acomplete(model: str, messages: List[Dict[str, str]]) -> str:
+    max_retries = max(0, _env_int("GROQ_MAX_RETRIES", 4))
+    client = get_async_client()
+    attempt = 0
+    while True:
+        try:
+            async with _async_semaphore():
+                resp = await client.chat.completions.create(
+                    model=model,
+                    temperature=TEMPERATURE,
+                    max_tokens=model_budget(model).max_output,
+                    messages=messages,
+                )
+            _annotate_usage(resp)
+            return resp.choices[0].message.content.strip()
+        except Exception as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None or attempt >= max_retries:
+                raise
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+def _cache_lookup_key(model: str, messages: List[Dict[str, str]], use_cache: bool):
+    cache = get_llm_cache() if use_cache else None
+    if cache is None:
+        return None, ""
+    return cache, cache_key(model, TEMPERATURE, model_budget(model).max_output, messages)
+
+
+def build_gap_report_messages(
     target_role: str,
     matched: List[str],
     missing: List[str],
     cv_skill_evidence: Dict[str, Dict[str, Any]],
     role_scope: Dict[str, Any],
-    playbook_snippets: str = "",
-    roadmap_snippets: str = "",
+    playbook_snippets: Snippets = "",
+    roadmap_snippets: Snippets = "",
     instructions: str = "",
-) -> str:
-    api_key = os.getenv("GROQ_API_KEY", "").strip()
-    if not api_key:
-        raise RuntimeError("Missing GROQ_API_KEY. Add it to .env (local) or Streamlit Secrets (cloud).")
-
+) -> Tuple[str, List[Dict[str, str]]]:
     #model = os.getenv("GROQ_MODEL", "llama-3.1-70b-versatile").strip()
     #model = os.getenv("GROQ_MODEL", "llama3-70b-8192").strip()
     #model = os.getenv("GROQ_MODEL", "qwen-qwq-32b").strip() #good
-    model = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile").strip() #finally supported in cloud
-
-    client = Groq(api_key=api_key)
+    model = os.getenv("GROQ_MODEL", DEFAULT_MODEL).strip() #finally supported in cloud
 
     core = sorted(list(role_scope.get("core", [])))
     optional = sorted(list(role_scope.get("optional", [])))
@@ -52,20 +271,20 @@ def generate_gap_report(
         ev = info.get("evidence", [])
         if isinstance(ev, list):
             ev = " | ".join(ev[:2])
-        evidence_lines.append(f"- {skill} (score={info.get('score')}, mentions={info.get('mentions')}): {ev}")
+        how = f", semantic match {info.get('similarity')}" if info.get("match") == "semantic" else ""
+        evidence_lines.append(f"- {skill} (score={info.get('score')}, mentions={info.get('mentions')}{how}): {ev}")
 
     cv_evidence_block = "\n".join(evidence_lines)
 
-    playbook_snippets = _truncate(playbook_snippets, 3000)
-    roadmap_snippets = _truncate(roadmap_snippets, 3000)
-    instructions = _truncate(instructions, 1200)
+    instructions = truncate_to_tokens(instructions, INSTRUCTIONS_MAX_TOKENS)
 
     system_msg = (
         "You are an expert career coach and hiring-aligned skill gap analyst. "
         "You must be role-specific and avoid recommending irrelevant skills."
     )
 
-    user_msg = f"""
+    def render(playbook_text: str, roadmap_text: str) -> str:
+        return f"""
 
 ROLE
 - Target role: {target_role}
@@ -84,10 +303,10 @@ CV EVIDENCE (top extracted)
 {cv_evidence_block}
 
 RETRIEVED PLAYBOOK CONTEXT
-{playbook_snippets}
+{playbook_text}
 
 RETRIEVED ROADMAP CONTEXT
-{roadmap_snippets}
+{roadmap_text}
 
 ADDITIONAL INSTRUCTIONS
 {instructions}
@@ -103,14 +322,122 @@ TASK
 6) Based on the CV, suggest which other job roles (2–4) the user is currently best suited for, and explain why.
 """.strip()
 
-    resp = client.chat.completions.create(
-        model=model,
-        temperature=0.2,
-        max_tokens=900,
-        messages=[
-            {"role": "system", "content": system_msg},
-            {"role": "user", "content": user_msg},
-        ],
+    # Whatever the fixed parts leave of the model's input budget goes to retrieved context
+    fixed = count_tokens(system_msg) + count_tokens(render("", "")) + 2 * MESSAGE_OVERHEAD_TOKENS
+    context_budget = max(0, model_budget(model).max_input - fixed)
+    playbook_text, roadmap_text = pack_context(playbook_snippets, roadmap_snippets, context_budget)
+    user_msg = render(playbook_text, roadmap_text)
+
+    messages = [
+        {"role": "system", "content": system_msg},
+        {"role": "user", "content": user_msg},
+    ]
+    return model, messages
+
+
+def generate_gap_report(
+    target_role: str,
+    matched: List[str],
+    missing: List[str],
+    cv_skill_evidence: Dict[str, Dict[str, Any]],
+    role_scope: Dict[str, Any],
+    playbook_snippets: Snippets = "",
+    roadmap_snippets: Snippets = "",
+    instructions: str = "",
+    use_cache: bool = True,
+) -> str:
+    model, messages = build_gap_report_messages(
+        target_role, matched, missing, cv_skill_evidence, role_scope,
+        playbook_snippets, roadmap_snippets, instructions,
+    )
+    with span("llm_report", model=model, **_prompt_size(messages)) as s:
+        cache, key = _cache_lookup_key(model, messages, use_cache)
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                s.set(cache="hit", output_chars=len(cached))
+                return cached
+        report = _complete(model, messages)
+        s.set(output_chars=len(report))
+        if cache is not None:
+            s.set(cache="miss")
+            cache.put(key, report, model)
+    return report
+
+
+async def agenerate_gap_report(
+    target_role: str,
+    matched: List[str],
+    missing: List[str],
+    cv_skill_evidence: Dict[str, Dict[str, Any]],
+    role_scope: Dict[str, Any],
+    playbook_snippets: Snippets = "",
+    roadmap_snippets: Snippets = "",
+    instructions: str = "",
+    use_cache: bool = True,
+) -> str:
+    model, messages = build_gap_report_messages(
+        target_role, matched, missing, cv_skill_evidence, role_scope,
+        playbook_snippets, roadmap_snippets, instructions,
+    )
+    with span("llm_report", model=model, **_prompt_size(messages)) as s:
+        cache, key = _cache_lookup_key(model, messages, use_cache)
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                s.set(cache="hit", output_chars=len(cached))
+                return cached
+        report = await _acomplete(model, messages)
+        s.set(output_chars=len(report))
+        if cache is not None:
+            s.set(cache="miss")
+            cache.put(key, report, model)
+    return report
+
+
+def stream_gap_report(
+    target_role: str,
+    matched: List[str],
+    missing: List[str],
+    cv_skill_evidence: Dict[str, Dict[str, Any]],
+    role_scope: Dict[str, Any],
+    playbook_snippets: Snippets = "",
+    roadmap_snippets: Snippets = "",
+    instructions: str = "",
+    use_cache: bool = True,
+) -> Iterator[str]:
+    model, messages = build_gap_report_messages(
+        target_role, matched, missing, cv_skill_evidence, role_scope,
+        playbook_snippets, roadmap_snippets, instructions,
     )
+    # not a `with` block: the span stays open across yields, without becoming the caller's current span
+    s = start_span("llm_report", model=model, stream=True, **_prompt_size(messages))
+    error = None
+    try:
+        cache, key = _cache_lookup_key(model, messages, use_cache)
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                s.set(cache="hit", output_chars=len(cached))
+                yield cached
+                return
 
-    return resp.choices[0].message.content.strip()
+        parts = []
+        for chunk in _stream(model, messages):
+            if not parts:
+                s.set(first_token_ms=round(s.elapsed_ms(), 1))
+            parts.append(chunk)
+            yield chunk
+        s.set(output_chars=sum(len(p) for p in parts))
+        # only complete streams are cached
+        if cache is not None:
+            s.set(cache="miss")
+            cache.put(key, "".join(parts).strip(), model)
+    except GeneratorExit:
+        s.set(cancelled=True)
+        raise
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        s.end(error=error)
@@ -1,25 +1,370 @@
+import os
+import re
+import time
+import zipfile
+import multiprocessing as mp
 from io import BytesIO
-from docx import Document
-import pdfplumber
+from typing import IO, Iterator, List, Optional
+
+from src.tracing import annotate, span, track_peak_rss
+
+# pdfplumber / lxml are imported on first use so the app can render before they load
+
+# Largest CV accepted by the app, the API and batch mode (0 = unlimited)
+MAX_UPLOAD_MB = float(os.getenv("MAX_UPLOAD_MB", "10"))
+
+# Early-stop limits for PDF extraction (env overrides, 0 = unlimited). Off by default:
+# a page or character cap drops the rest of the CV, so it is an explicit operator choice
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "0"))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "0"))
+PDF_PAGE_TIMEOUT = float(os.getenv("PDF_PAGE_TIMEOUT", "10"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "1"))
+
+# DOCX text is streamed out of the zip in blocks of whole lines
+DOCX_MAX_CHARS = int(os.getenv("DOCX_MAX_CHARS", "300000"))
+DOCX_BLOCK_CHARS = 8192
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_DOCX_CONTAINERS = (_W + "body", _W + "hdr", _W + "ftr")
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+class UnreadableDocument(ValueError):
+    pass
+
+class PageTimeout(Exception):
+    pass
+
+# Per-worker PDF handle, opened once by the pool initializer
+_WORKER_PDF = None
+
+def _init_pdf_worker(file_bytes: bytes) -> None:
+    global _WORKER_PDF
+    import pdfplumber
+
+    _WORKER_PDF = pdfplumber.open(BytesIO(file_bytes))
+
+def _extract_page_in_worker(index: int) -> str:
+    return _WORKER_PDF.pages[index].extract_text() or ""
+
+def _pdf_page_count(file_bytes: bytes) -> int:
+    import pdfplumber
+
+    with pdfplumber.open(BytesIO(file_bytes)) as pdf:
+        return len(pdf.pages)
+
+_DEADLINE_DEVICE = None
+
+def _deadline_device():
+    # pdfplumber's layout device, checking a deadline on every string, path and image it renders
+    global _DEADLINE_DEVICE
+    if _DEADLINE_DEVICE is None:
+        from pdfplumber.page import PDFPageAggregatorWithMarkedContent
+
+        class DeadlineDevice(PDFPageAggregatorWithMarkedContent):
+            deadline = float("inf")
+
+            def _check(self):
+                if time.perf_counter() > self.deadline:
+                    raise PageTimeout(f"page {self.pageno} took longer than the page timeout")
+
+            def render_string(self, *args, **kwargs):
+                self._check()
+                return super().render_string(*args, **kwargs)
+
+            def paint_path(self, *args, **kwargs):
+                self._check()
+                return super().paint_path(*args, **kwargs)
+
+            def render_image(self, *args, **kwargs):
+                self._check()
+                return super().render_image(*args, **kwargs)
+
+        _DEADLINE_DEVICE = DeadlineDevice
+    return _DEADLINE_DEVICE
+
+def _extract_page_text(page, timeout: float) -> str:
+    # Lays the page out with a deadline (raising PageTimeout mid-page), then extracts as usual
+    if timeout:
+        from pdfminer.pdfinterp import PDFPageInterpreter
+        from pdfplumber.utils.exceptions import PdfminerException
+
+        device = _deadline_device()(page.pdf.rsrcmgr, pageno=page.page_number, laparams=page.pdf.laparams)
+        device.deadline = time.perf_counter() + timeout
+        try:
+            PDFPageInterpreter(page.pdf.rsrcmgr, device).process_page(page.page_obj)
+        except PageTimeout:
+            raise
+        except Exception as e:
+            raise PdfminerException(e)  # what page.layout raises, so damaged files stay recognisable
+        page._layout = device.get_result()  # pdfplumber reads the layout from here
+    return page.extract_text() or ""
+
+def iter_pdf_pages(
+    file_bytes: bytes,
+    max_pages: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    page_timeout: Optional[float] = None,
+    workers: Optional[int] = None,
+) -> Iterator[str]:
+    """Yield the text of each PDF page in order, stopping early at the configured limits.
+
+    A page that takes longer than page_timeout to extract is skipped (yielded as "").
+    Sequentially, extraction is interrupted inside the page; with workers > 1 pages are
+    extracted in a process pool and a stuck worker is killed.
+    """
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    max_chars = PDF_MAX_CHARS if max_chars is None else max_chars
+    page_timeout = PDF_PAGE_TIMEOUT if page_timeout is None else page_timeout
+    workers = PDF_WORKERS if workers is None else workers
+
+    total = 0
+    for t in (_iter_pdf_pages_parallel if workers > 1 else _iter_pdf_pages_sequential)(
+        file_bytes, max_pages, page_timeout, workers
+    ):
+        if max_chars and total + len(t) > max_chars:
+            t = t[: max_chars - total]
+            if t:
+                yield t
+            return
+        total += len(t)
+        yield t
+
+def _iter_pdf_pages_sequential(file_bytes: bytes, max_pages: int, page_timeout: float, workers: int) -> Iterator[str]:
+    import pdfplumber
 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
-    text_parts = []
     with pdfplumber.open(BytesIO(file_bytes)) as pdf:
-        for page in pdf.pages:
-            t = page.extract_text() or ""
-            if t.strip():
-                text_parts.append(t)
-    return "\n".join(text_parts)
+        pages = pdf.pages[:max_pages] if max_pages else pdf.pages
+        for page in pages:
+            try:
+                text = _extract_page_text(page, page_timeout)
+            except PageTimeout:
+                text = ""
+            page.flush_cache()  # release parsed layout objects as we go
+            yield text
+
+def _iter_pdf_pages_parallel(file_bytes: bytes, max_pages: int, page_timeout: float, workers: int) -> Iterator[str]:
+    n_pages = _pdf_page_count(file_bytes)
+    if max_pages:
+        n_pages = min(n_pages, max_pages)
+
+    ctx = mp.get_context("spawn")  # safe even when torch is already loaded in the parent
+    pool = None
+    pending = {}
+    try:
+        # keep a small window of pages in flight so an early stop does not waste work
+        window = workers * 2
+        for index in range(n_pages):
+            if pool is None:
+                pool = ctx.Pool(workers, initializer=_init_pdf_worker, initargs=(file_bytes,))
+                pending = {}
+            for i in range(index, min(n_pages, index + window)):
+                if i not in pending:
+                    pending[i] = pool.apply_async(_extract_page_in_worker, (i,))
+            try:
+                text = pending.pop(index).get(timeout=page_timeout or None)
+            except mp.TimeoutError:
+                # a worker is stuck inside the page: kill the pool, the pages after it go to a fresh one
+                pool.terminate()
+                pool = None
+                text = ""
+            yield text
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+def extract_text_from_pdf(file_bytes: bytes) -> str:
+    pages = list(iter_pdf_pages(file_bytes))
+    annotate(pages=len(pages))
+    return "\n".join(t for t in pages if t.strip())
+
+def _docx_parts(zf: zipfile.ZipFile) -> List[str]:
+    # Headers first (name and contact details often live there), then the body, then footers
+    names = zf.namelist()
+    headers = sorted(n for n in names if re.fullmatch(r"word/header\d*\.xml", n))
+    footers = sorted(n for n in names if re.fullmatch(r"word/footer\d*\.xml", n))
+    return headers + ["word/document.xml"] + footers
+
+def _paragraph_text(p) -> str:
+    # Same as python-docx's Paragraph.text: runs (hyperlinks included), tabs and line breaks
+    parts = []
+    for r in p.iter(_W + "r"):
+        for node in r:
+            tag = node.tag
+            if tag == _W + "t":
+                parts.append(node.text or "")
+            elif tag in (_W + "tab", _W + "ptab"):
+                parts.append("\t")
+            elif tag == _W + "cr" or (tag == _W + "br" and node.get(_W + "type") in (None, "textWrapping")):
+                parts.append("\n")
+            elif tag == _W + "noBreakHyphen":
+                parts.append("-")
+    return "".join(parts)
+
+def _iter_docx_lines(stream: IO[bytes]) -> Iterator[str]:
+    """Paragraphs of one DOCX part as they are parsed, in document order.
+
+    A table row becomes one line ("cell | cell"), text boxes are read once (not again from
+    their mc:Fallback copy), and finished elements are freed, so memory stays flat however
+    long the part is.
+    """
+    from lxml import etree
+
+    fallback = 0
+    rows: List[List[str]] = []  # open table rows (tables can nest)
+    cells: List[List[str]] = []  # lines of open cells
+    for event, el in etree.iterparse(stream, events=("start", "end"), resolve_entities=False, no_network=True):
+        tag = el.tag
+        if event == "start":
+            if tag == _MC_FALLBACK:
+                fallback += 1
+            elif fallback:
+                pass  # the end branch skips these too, so the stacks stay balanced
+            elif tag == _W + "tr":
+                rows.append([])
+            elif tag == _W + "tc":
+                cells.append([])
+            continue
+
+        line = None
+        if tag == _MC_FALLBACK:
+            fallback -= 1
+            el.clear()
+        elif fallback:
+            continue
+        elif tag == _W + "p":
+            line = _paragraph_text(el)
+            el.clear()  # nested text box paragraphs are gone before the outer one ends
+        elif tag == _W + "tc":
+            cell = " ".join(cells.pop())
+            if rows:
+                rows[-1].append(cell)
+        elif tag == _W + "tr":
+            line = " | ".join(c for c in rows.pop() if c)
+            el.clear()
+
+        if line:
+            if cells:
+                cells[-1].append(line)
+            else:
+                yield line
+        parent = el.getparent()
+        if parent is not None and parent.tag in _DOCX_CONTAINERS:
+            # top-level block done: drop it and everything before it
+            el.clear()
+            while el.getprevious() is not None:
+                del parent[0]
+
+def iter_docx_text(file_bytes: bytes, max_chars: Optional[int] = None) -> Iterator[str]:
+    """Yield the text of a .docx in blocks of whole lines: headers, body (tables and text boxes
+    included), footers. Parts are decompressed and parsed as a stream; stops at max_chars."""
+    max_chars = DOCX_MAX_CHARS if max_chars is None else max_chars
+
+    total = 0
+    block: List[str] = []
+    size = 0
+    with zipfile.ZipFile(BytesIO(file_bytes)) as zf:
+        if "word/document.xml" not in zf.namelist():
+            raise zipfile.BadZipFile("no word/document.xml in the archive")
+        for part in _docx_parts(zf):
+            with zf.open(part) as stream:
+                for line in _iter_docx_lines(stream):
+                    if max_chars and total + len(line) > max_chars:
+                        line = line[: max_chars - total]
+                        if line:
+                            block.append(line)
+                        if block:
+                            yield "\n".join(block)
+                        return
+                    total += len(line)
+                    block.append(line)
+                    size += len(line) + 1
+                    if size >= DOCX_BLOCK_CHARS:
+                        yield "\n".join(block)
+                        block, size = [], 0
+    if block:
+        yield "\n".join(block)
 
 def extract_text_from_docx(file_bytes: bytes) -> str:
-    doc = Document(BytesIO(file_bytes))
-    return "\n".join([p.text for p in doc.paragraphs if p.text])
+    return "\n".join(iter_docx_text(file_bytes))
 
-def extract_text_from_upload(uploaded_file) -> str:
-    b = uploaded_file.read()
-    name = (uploaded_file.name or "").lower()
-    if name.endswith(".pdf"):
-        return extract_text_from_pdf(b)
-    if name.endswith(".docx"):
-        return extract_text_from_docx(b)
+def max_upload_bytes() -> int:
+    return int(MAX_UPLOAD_MB * 1024 * 1024)
+
+def upload_size(uploaded_file) -> Optional[int]:
+    # Without reading it: Streamlit uploads carry .size, real files have a descriptor
+    size = getattr(uploaded_file, "size", None)
+    if isinstance(size, int):
+        return size
+    try:
+        return os.fstat(uploaded_file.fileno()).st_size
+    except (AttributeError, OSError, ValueError):
+        return None
+
+def read_upload_bytes(uploaded_file, max_bytes: Optional[int] = None) -> bytes:
+    # Refuses files over the cap before reading them (and never reads more than cap + 1 bytes)
+    max_bytes = max_upload_bytes() if max_bytes is None else max_bytes
+    name = getattr(uploaded_file, "name", "upload")
+    size = upload_size(uploaded_file)
+    if max_bytes and size is not None and size > max_bytes:
+        raise UploadTooLarge(f"'{os.path.basename(name)}' is larger than {max_bytes / 1024 / 1024:g} MB.")
+    # getvalue() does not depend on the read position, so Streamlit reruns see the full file
+    if hasattr(uploaded_file, "getvalue"):
+        data = uploaded_file.getvalue()
+    else:
+        data = uploaded_file.read(max_bytes + 1) if max_bytes else uploaded_file.read()
+    if max_bytes and len(data) > max_bytes:
+        raise UploadTooLarge(f"'{os.path.basename(name)}' is larger than {max_bytes / 1024 / 1024:g} MB.")
+    return data
+
+def _is_parse_error(e: Exception) -> bool:
+    # What the parsers raise for damaged, truncated or mislabelled files (lxml's errors are SyntaxErrors)
+    from pdfminer.psparser import PSException
+    from pdfplumber.utils.exceptions import PdfminerException
+
+    return isinstance(e, (zipfile.BadZipFile, SyntaxError, PSException, PdfminerException))
+
+def _unreadable(name: str) -> UnreadableDocument:
+    return UnreadableDocument(f"Could not read '{os.path.basename(name or 'upload')}'; the file looks damaged or is not a real PDF/DOCX.")
+
+def _reraise_unreadable(chunks: Iterator[str], name: str) -> Iterator[str]:
+    try:
+        yield from chunks
+    except Exception as e:
+        if _is_parse_error(e):
+            raise _unreadable(name) from e
+        raise
+
+def iter_text_chunks(file_bytes: bytes, name: str) -> Iterator[str]:
+    # PDF pages or DOCX blocks, for callers that process text as it is parsed
+    lower = (name or "").lower()
+    if lower.endswith(".pdf"):
+        chunks = iter_pdf_pages(file_bytes)
+    elif lower.endswith(".docx"):
+        chunks = iter_docx_text(file_bytes)
+    else:
+        raise ValueError("Unsupported file type. Please upload .pdf or .docx.")
+    return _reraise_unreadable(chunks, name)
+
+def extract_text_from_bytes(file_bytes: bytes, name: str) -> str:
+    lower = (name or "").lower()
+    try:
+        if lower.endswith(".pdf"):
+            return extract_text_from_pdf(file_bytes)
+        if lower.endswith(".docx"):
+            return extract_text_from_docx(file_bytes)
+    except Exception as e:
+        if _is_parse_error(e):
+            raise _unreadable(name) from e
+        raise
     raise ValueError("Unsupported file type. Please upload .pdf or .docx.")
+
+def extract_text_from_upload(uploaded_file) -> str:
+    b = read_upload_bytes(uploaded_file)
+    with span("extract_text", bytes=len(b)) as s, track_peak_rss(s):
+        text = extract_text_from_bytes(b, uploaded_file.name)
+        s.set(chars=len(text))
+    return text
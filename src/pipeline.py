@@ -0,0 +1,51 @@
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+
+class Stage(NamedTuple):
+    fn: Callable
+    inputs: Tuple[str, ...]
+
+
+class Pipeline:
+    """Named stages that declare their inputs; nothing runs until an output is asked for.
+
+    `run(**inputs)` binds the inputs and returns a PipelineRun. Reading run["x"] computes
+    stage "x" and the stages it depends on, each at most once per run, so a consumer that
+    never reads an output never pays for it.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Stage] = {}
+
+    def stage(self, name: str, inputs: Tuple[str, ...] = ()):
+        def register(fn: Callable) -> Callable:
+            self.stages[name] = Stage(fn, tuple(inputs))
+            return fn
+        return register
+
+    def run(self, **inputs) -> "PipelineRun":
+        return PipelineRun(self, inputs)
+
+
+class PipelineRun:
+    def __init__(self, pipeline: Pipeline, inputs: Dict[str, Any]):
+        self.pipeline = pipeline
+        self._values: Dict[str, Any] = dict(inputs)
+        self.computed: List[str] = []  # stages in the order they ran
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._values
+
+    def __getitem__(self, name: str) -> Any:
+        if name in self._values:
+            return self._values[name]
+        stage = self.pipeline.stages.get(name)
+        if stage is None:
+            raise KeyError(f"no pipeline stage or input named {name!r}")
+        value = stage.fn(*(self[i] for i in stage.inputs))
+        self._values[name] = value
+        self.computed.append(name)
+        return value
+
+    def get(self, name: str) -> Any:
+        return self[name]
@@ -0,0 +1,171 @@
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from src.tracing import estimate_tokens
+
+# Token budgets for the gap-report prompt. Retrieved chunks are packed by relevance
+# into what is left of the input budget after the fixed parts of the prompt.
+
+
+@dataclass(frozen=True)
+class ModelBudget:
+    context: int  # model context window (tokens)
+    max_input: int  # prompt tokens we are willing to send
+    max_output: int  # max_tokens for the completion
+
+
+# Groq models; the report has six sections and is cut off well below ~1800 tokens
+MODEL_BUDGETS: Dict[str, ModelBudget] = {
+    "llama-3.3-70b-versatile": ModelBudget(context=131072, max_input=6000, max_output=2400),
+    "llama-3.1-70b-versatile": ModelBudget(context=131072, max_input=6000, max_output=2400),
+    "llama-3.1-8b-instant": ModelBudget(context=131072, max_input=6000, max_output=2400),
+    "llama3-70b-8192": ModelBudget(context=8192, max_input=4500, max_output=2400),
+    "llama3-8b-8192": ModelBudget(context=8192, max_input=4500, max_output=2400),
+    "gemma2-9b-it": ModelBudget(context=8192, max_input=4500, max_output=2400),
+    "mixtral-8x7b-32768": ModelBudget(context=32768, max_input=6000, max_output=2400),
+    "qwen-qwq-32b": ModelBudget(context=131072, max_input=6000, max_output=4000),  # thinks out loud first
+}
+DEFAULT_BUDGET = ModelBudget(context=8192, max_input=4500, max_output=2000)
+
+# Share of the context budget kept for roadmap chunks when both kinds are available
+ROADMAP_SHARE = 0.4
+INSTRUCTIONS_MAX_TOKENS = 300
+MIN_PARTIAL_TOKENS = 60  # don't bother packing a chunk tail shorter than this
+MIN_OVERLAP_CHARS = 30
+MAX_OVERLAP_CHARS = 300  # splitter overlap is 120; leave room for its separator snapping
+CHUNK_SEPARATOR = "\n\n"
+
+_COUNTER: Optional[Tuple[str, Callable[[str], int]]] = None
+_COUNTER_LOCK = threading.Lock()
+
+
+def model_budget(model: str) -> ModelBudget:
+    budget = MODEL_BUDGETS.get(model, DEFAULT_BUDGET)
+    max_input = int(os.getenv("LLM_MAX_INPUT_TOKENS", "").strip() or budget.max_input)
+    max_output = int(os.getenv("LLM_MAX_OUTPUT_TOKENS", "").strip() or budget.max_output)
+    # prompt + completion must fit the window
+    max_output = min(max_output, budget.context - min(max_input, budget.context // 2))
+    max_input = min(max_input, budget.context - max_output)
+    return ModelBudget(context=budget.context, max_input=max_input, max_output=max_output)
+
+
+def _load_counter() -> Tuple[str, Callable[[str], int]]:
+    # LLM_TOKENIZER_FILE: a local HF tokenizer.json (e.g. the model's own); else tiktoken's
+    # cl100k_base (Llama 3 uses a tiktoken-style BPE, counts are close); else ~4 chars/token.
+    path = os.getenv("LLM_TOKENIZER_FILE", "").strip()
+    if path:
+        try:
+            from tokenizers import Tokenizer
+
+            tok = Tokenizer.from_file(path)
+            return f"tokenizers:{os.path.basename(path)}", lambda t: len(tok.encode(t, add_special_tokens=False).ids)
+        except Exception:
+            pass
+    try:
+        import tiktoken
+
+        enc = tiktoken.get_encoding("cl100k_base")
+        return "tiktoken:cl100k_base", lambda t: len(enc.encode(t, disallowed_special=()))
+    except Exception:
+        return "estimate", estimate_tokens
+
+
+def token_counter() -> Tuple[str, Callable[[str], int]]:
+    global _COUNTER
+    if _COUNTER is None:
+        with _COUNTER_LOCK:
+            if _COUNTER is None:
+                _COUNTER = _load_counter()
+    return _COUNTER
+
+
+def count_tokens(text: str) -> int:
+    return token_counter()[1](text) if text else 0
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    # Longest prefix within budget, cut back to a line / sentence / word boundary when possible
+    text = (text or "").strip()
+    if max_tokens <= 0 or not text:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    lo, hi = 0, len(text)
+    while lo < hi:  # binary search on characters
+        mid = (lo + hi + 1) // 2
+        if count_tokens(text[:mid]) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    cut = text[:lo]
+    for sep in ("\n", ". ", " "):
+        i = cut.rfind(sep)
+        if i >= len(cut) * 0.6:
+            return cut[: i + (1 if sep == ". " else 0)].rstrip()
+    return cut.rstrip()
+
+
+def _chunk_text(chunk) -> str:
+    return (getattr(chunk, "page_content", chunk) or "").strip()
+
+
+def _strip_overlap(text: str, packed: List[str]) -> str:
+    # The splitter repeats up to CHUNK_OVERLAP chars between neighbouring chunks; drop a
+    # prefix that is the tail of something already packed (and whole repeats)
+    for prev in packed:
+        limit = min(len(prev), len(text), MAX_OVERLAP_CHARS)
+        for n in range(limit, MIN_OVERLAP_CHARS - 1, -1):
+            if prev.endswith(text[:n]):
+                text = text[n:].lstrip()
+                break
+    if any(text in prev for prev in packed):
+        return ""
+    return text
+
+
+def _pack(chunks: Union[str, Sequence], max_tokens: int, seen: Sequence[str] = ()) -> Tuple[List[str], int]:
+    if isinstance(chunks, str):
+        chunks = re.split(r"\n\s*\n", chunks)
+    sep_tokens = count_tokens(CHUNK_SEPARATOR)
+    packed: List[str] = []
+    used = 0
+    for chunk in chunks:
+        text = _strip_overlap(_chunk_text(chunk), list(seen) + packed)
+        if not text:
+            continue
+        cost = count_tokens(text) + (sep_tokens if packed else 0)
+        if used + cost <= max_tokens:
+            packed.append(text)
+            used += cost
+            continue
+        room = max_tokens - used - (sep_tokens if packed else 0)
+        if room >= MIN_PARTIAL_TOKENS:
+            part = truncate_to_tokens(text, room)
+            if part:
+                used += count_tokens(part) + (sep_tokens if packed else 0)
+                packed.append(part)
+        break
+    return packed, used
+
+
+def pack_chunks(chunks: Union[str, Sequence], max_tokens: int) -> Tuple[str, int]:
+    """Chunks (best first) joined until the budget is spent: (text, tokens used).
+
+    Overlap with already packed chunks is removed; the first chunk that doesn't fit
+    is cut at a boundary if a useful part of it fits.
+    """
+    packed, used = _pack(chunks, max_tokens)
+    return CHUNK_SEPARATOR.join(packed), used
+
+
+def pack_context(playbooks: Union[str, Sequence], roadmaps: Union[str, Sequence], max_tokens: int) -> Tuple[str, str]:
+    # Playbooks first; roadmaps keep ROADMAP_SHARE unless they need less, and get back what playbooks leave.
+    # A roadmap chunk repeating playbook text is dropped.
+    roadmap_need = _pack(roadmaps, max_tokens)[1]
+    reserve = min(roadmap_need, int(max_tokens * ROADMAP_SHARE))
+    playbook_chunks, used = _pack(playbooks, max(0, max_tokens - reserve))
+    roadmap_chunks, _ = _pack(roadmaps, max(0, max_tokens - used), seen=playbook_chunks)
+    return CHUNK_SEPARATOR.join(playbook_chunks), CHUNK_SEPARATOR.join(roadmap_chunks)
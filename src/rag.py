@@ -1,19 +1,54 @@
 import os
+import json
+import hashlib
+import shutil
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import TYPE_CHECKING, Optional, Dict, List, Tuple
 
 #from langchain.schema import Document
 from langchain_core.documents import Document
-from langchain_community.document_loaders import TextLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
+from src.taxonomy import get_taxonomy
+from src.tracing import annotate, span
+
+# langchain_community / text splitters / torch are imported on first use: importing this
+# module (e.g. from src.analysis) must not pull in the ML stack
+if TYPE_CHECKING:
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from src.vector_backends import VectorBackend
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = BASE_DIR / "data"
 CHROMA_DIR = BASE_DIR / ".chroma"
+NUMPY_DIR = BASE_DIR / ".vectors"
+BACKEND_DIRS = {"chroma": CHROMA_DIR, "numpy": NUMPY_DIR}
+MANIFEST_NAME = "index_manifest.json"
+MANIFEST_VERSION = 1
+SKILL_INDEX_NAME = "skill_index.json"
+CHUNK_SIZE = 900
+CHUNK_OVERLAP = 120
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Process-wide registry: the embedding model and vector store are loaded once per
+# process and shared by every Streamlit session / worker thread.
+_REGISTRY_LOCK = threading.RLock()
+_EMBEDDINGS: Dict[str, "HuggingFaceEmbeddings"] = {}
+_VECTORDBS: Dict[Tuple[str, str, str], "VectorBackend"] = {}
+_WARMUP_THREAD: Optional[threading.Thread] = None
+
+# Retrieval results keyed by (index version, query, k, filter)
+RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", "256"))
+_RETRIEVAL_CACHE: "OrderedDict[Tuple, List[Document]]" = OrderedDict()
+_RETRIEVAL_CACHE_LOCK = threading.Lock()
+
+# (query, k, filter) -- one entry per search in a batch
+RetrievalRequest = Tuple[str, int, Optional[Dict]]
 
 def _load_markdown_docs(folder: Path, doc_type: str) -> List[Document]:
+    from langchain_community.document_loaders import TextLoader
+
     docs = []
     for p in sorted(folder.glob("*.md")):
         loader = TextLoader(str(p), encoding="utf-8")
@@ -38,33 +73,380 @@ def _attach_skill_metadata(doc: Document) -> Document:
         doc.metadata["skills"] = skills
     return doc
 
-def get_or_build_vectordb():
+def embedding_model_name() -> str:
     #sentence embedding model. Used for semantic similarity search
-    embed_model = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
-    embeddings = HuggingFaceEmbeddings(model_name=embed_model)
+    return os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL).strip() or DEFAULT_EMBEDDING_MODEL
+
+
+def vector_backend_name() -> str:
+    # "chroma" (default) or "numpy" (in-process exact search, see src/vector_backends.py)
+    backend = os.getenv("VECTOR_BACKEND", "chroma").strip().lower() or "chroma"
+    if backend not in BACKEND_DIRS:
+        raise ValueError(f"Unknown VECTOR_BACKEND '{backend}'. Use one of: {', '.join(BACKEND_DIRS)}")
+    return backend
+
+
+def get_embeddings(model_name: Optional[str] = None) -> "HuggingFaceEmbeddings":
+    model_name = model_name or embedding_model_name()
+    embeddings = _EMBEDDINGS.get(model_name)
+    if embeddings is not None:
+        return embeddings
+    with _REGISTRY_LOCK:
+        embeddings = _EMBEDDINGS.get(model_name)
+        if embeddings is None:
+            from langchain_community.embeddings import HuggingFaceEmbeddings
+
+            embeddings = HuggingFaceEmbeddings(model_name=model_name)
+            _EMBEDDINGS[model_name] = embeddings
+    return embeddings
 
-    if CHROMA_DIR.exists():
-        return Chroma(persist_directory=str(CHROMA_DIR), embedding_function=embeddings)
 
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _load_manifest(persist_dir: Path) -> Optional[Dict]:
+    path = persist_dir / MANIFEST_NAME
+    if not path.exists():
+        return None
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def _save_manifest(persist_dir: Path, manifest: Dict) -> None:
+    path = persist_dir / MANIFEST_NAME
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    tmp.replace(path)
+
+
+def _load_source_docs() -> Dict[str, Document]:
+    # One document per markdown file, keyed by "<type>/<file name>"
     role_docs = _load_markdown_docs(DATA_DIR / "roles", "role")
     playbook_docs = _load_markdown_docs(DATA_DIR / "playbooks", "playbook")
+    roadmap_docs = _load_markdown_docs(DATA_DIR / "roadmaps", "roadmap")  # optional folder
+    docs = role_docs + playbook_docs + roadmap_docs
+    return {f"{d.metadata['type']}/{d.metadata['source']}": _attach_skill_metadata(d) for d in docs}
+
+
+def _splitter() -> "RecursiveCharacterTextSplitter":
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    return RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+
+
+def _chunk_with_ids(doc: Document, splitter: "RecursiveCharacterTextSplitter") -> Tuple[List[Document], List[str]]:
+    chunks = splitter.split_documents([doc])
+    ids = []
+    seen: Dict[str, int] = {}
+    for c in chunks:
+        # metadata is part of the hash: a changed "Skills:" line touches every chunk of the file
+        h = _sha256(json.dumps(c.metadata, sort_keys=True) + "\n" + c.page_content)
+        n = seen.get(h, 0)
+        seen[h] = n + 1
+        ids.append(f"{h}-{n}")
+    return chunks, ids
+
+
+def sync_index(vectordb: "VectorBackend", persist_dir: Path, model_name: str, manifest: Optional[Dict] = None) -> Dict[str, int]:
+    # Diff data/ against the manifest and embed/delete only the chunks that changed
+    manifest = manifest or {"version": MANIFEST_VERSION, "embedding_model": model_name, "files": {}}
+    old_files: Dict[str, Dict] = manifest.get("files", {})
+    new_files: Dict[str, Dict] = {}
+    splitter = _splitter()
+
+    to_add: List[Document] = []
+    to_add_ids: List[str] = []
+    to_delete: List[str] = []
+
+    for key, doc in _load_source_docs().items():
+        file_hash = _sha256(doc.page_content)
+        previous = old_files.get(key)
+        if previous and previous.get("hash") == file_hash:
+            new_files[key] = previous
+            continue
+
+        chunks, ids = _chunk_with_ids(doc, splitter)
+        old_ids = set(previous.get("chunks", [])) if previous else set()
+        for c, cid in zip(chunks, ids):
+            if cid not in old_ids:
+                to_add.append(c)
+                to_add_ids.append(cid)
+        to_delete.extend(sorted(old_ids - set(ids)))
+        new_files[key] = {"hash": file_hash, "chunks": ids}
+
+    for key, previous in old_files.items():
+        if key not in new_files:
+            to_delete.extend(previous.get("chunks", []))
+
+    if to_delete:
+        vectordb.delete(ids=to_delete)
+    if to_add:
+        vectordb.add_documents(to_add, ids=to_add_ids)
+    if to_add or to_delete:
+        if hasattr(vectordb, "persist"):
+            vectordb.persist()
+
+    if to_add or to_delete or new_files != old_files or not (persist_dir / MANIFEST_NAME).exists():
+        _save_manifest(persist_dir, {"version": MANIFEST_VERSION, "embedding_model": model_name, "files": new_files})
+
+    version = _sha256(model_name + json.dumps(new_files, sort_keys=True))[:16]
+    types = sorted({key.split("/", 1)[0] for key in new_files})
+    return {"added": len(to_add), "deleted": len(to_delete), "files": len(new_files), "version": version, "types": types}
+
+
+class PlaybookSkillIndex:
+    """Canonical skill -> playbook chunks, built from the "Skills:" lines at index time.
+
+    Lookups are dictionary hits and need neither the embedding model nor the vector store.
+    """
+
+    def __init__(self, version: str, chunks: List[Dict], postings: Dict[str, List[int]]):
+        self.version = version
+        self.chunks = chunks
+        self.postings = postings
+
+    @classmethod
+    def build(cls, docs: Dict[str, Document], version: str) -> "PlaybookSkillIndex":
+        splitter = _splitter()
+        chunks: List[Dict] = []
+        postings: Dict[str, List[int]] = {}
+        taxonomy = get_taxonomy()
+        for key in sorted(docs):
+            doc = docs[key]
+            if doc.metadata.get("type") != "playbook" or not doc.metadata.get("skills"):
+                continue
+            split, ids = _chunk_with_ids(doc, splitter)
+            for position, (c, cid) in enumerate(zip(split, ids)):
+                idx = len(chunks)
+                chunks.append({"id": cid, "text": c.page_content, "metadata": c.metadata, "position": position})
+                for skill in {taxonomy.canonical_key(s) for s in c.metadata["skills"].split("|")} - {""}:
+                    postings.setdefault(skill, []).append(idx)
+        return cls(version, chunks, postings)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["PlaybookSkillIndex"]:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return cls(data["version"], data["chunks"], data["postings"])
+
+    def save(self, path: Path) -> None:
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"version": self.version, "chunks": self.chunks, "postings": self.postings}), encoding="utf-8")
+        tmp.replace(path)
+
+    def lookup(self, skills: List[str]) -> Tuple[Dict[str, List[Document]], List[str]]:
+        # ({skill: playbook chunks in file order}, skills with no playbook entry)
+        found: Dict[str, List[Document]] = {}
+        unresolved = []
+        taxonomy = get_taxonomy()
+        for skill in skills:
+            hits = self.postings.get(taxonomy.canonical_key(skill))
+            if not hits:
+                unresolved.append(skill)
+                continue
+            found[skill] = [
+                Document(page_content=self.chunks[i]["text"], metadata=dict(self.chunks[i]["metadata"]))
+                for i in sorted(hits, key=lambda i: self.chunks[i]["position"])
+            ]
+        return found, unresolved
 
-    all_docs = []
-    for d in role_docs + playbook_docs:
-        all_docs.append(_attach_skill_metadata(d))
 
-    splitter = RecursiveCharacterTextSplitter(chunk_size=900, chunk_overlap=120)
-    chunks = splitter.split_documents(all_docs)
+def load_skill_index(persist_dir: Path, version: str) -> PlaybookSkillIndex:
+    # Rebuilt (chunking only, no embedding) whenever the indexed content changes
+    path = persist_dir / SKILL_INDEX_NAME
+    version = f"{version}-{get_taxonomy().version}"  # postings are keyed by canonical skill
+    index = PlaybookSkillIndex.load(path)
+    if index is None or index.version != version:
+        index = PlaybookSkillIndex.build(_load_source_docs(), version)
+        index.save(path)
+    return index
 
-    vectordb = Chroma.from_documents(
-        documents=chunks,
-        embedding=embeddings,
-        persist_directory=str(CHROMA_DIR),
-    )
-    vectordb.persist()
+
+def _open_store(backend: str, embeddings: "HuggingFaceEmbeddings", persist_dir: Path) -> "VectorBackend":
+    if backend == "numpy":
+        from src.vector_backends import NumpyVectorStore
+
+        return NumpyVectorStore(persist_directory=str(persist_dir), embedding_function=embeddings)
+    from langchain_community.vectorstores import Chroma
+
+    return Chroma(persist_directory=str(persist_dir), embedding_function=embeddings)
+
+
+def _build_vectordb(embeddings: "HuggingFaceEmbeddings", persist_dir: Path, model_name: str,
+                    backend: str = "chroma") -> "VectorBackend":
+    manifest = _load_manifest(persist_dir)
+    if persist_dir.exists() and (manifest is None or manifest.get("embedding_model") != model_name):
+        # index from before manifests existed, or built with another model: start over
+        shutil.rmtree(persist_dir)
+        manifest = None
+    persist_dir.mkdir(parents=True, exist_ok=True)
+
+    vectordb = _open_store(backend, embeddings, persist_dir)
+    stats = sync_index(vectordb, persist_dir, model_name, manifest)
+    annotate(added=stats["added"], deleted=stats["deleted"], files=stats["files"])
+    # identifies the indexed content; part of the retrieval cache key
+    vectordb.index_version = stats["version"]
+    vectordb.skill_index = load_skill_index(persist_dir, stats["version"])
+    vectordb.doc_types = frozenset(stats["types"])
     return vectordb
 
-def rag_retrieve(vectordb, query: str, k: int = 4, filters: Optional[Dict] = None):
+
+def has_doc_type(vectordb, doc_type: str) -> bool:
+    # False only when the index is known not to hold any document of this type
+    types = getattr(vectordb, "doc_types", None)
+    return types is None or doc_type in types
+
+
+def get_or_build_vectordb(persist_dir: Optional[Path] = None, backend: Optional[str] = None) -> "VectorBackend":
+    model_name = embedding_model_name()
+    backend = backend or vector_backend_name()
+    persist_dir = Path(persist_dir or BACKEND_DIRS[backend])
+    key = (model_name, backend, str(persist_dir.resolve()))
+
+    with span("vectordb_load", backend=backend, cache="hit") as s:
+        vectordb = _VECTORDBS.get(key)
+        if vectordb is not None:
+            return vectordb
+        with _REGISTRY_LOCK:
+            vectordb = _VECTORDBS.get(key)
+            if vectordb is None:
+                s.set(cache="miss")
+                vectordb = _build_vectordb(get_embeddings(model_name), persist_dir, model_name, backend)
+                _VECTORDBS[key] = vectordb
+        return vectordb
+
+
+def warm_up(background: bool = True) -> None:
+    # Eagerly load the embedding model and vector store; safe to call on every rerun
+    global _WARMUP_THREAD
+    with _REGISTRY_LOCK:
+        thread = _WARMUP_THREAD
+        if thread is None and background:
+            _WARMUP_THREAD = threading.Thread(target=get_or_build_vectordb, name="rag-warmup", daemon=True)
+            _WARMUP_THREAD.start()
+            return
+    # Outside the lock: the warm-up thread needs it to register the store
+    if background:
+        return
+    if thread is not None:
+        thread.join()
+    else:
+        get_or_build_vectordb()
+
+
+def invalidate_vectordb_cache(model_name: Optional[str] = None, persist_dir: Optional[Path] = None) -> None:
+    # Drop cached handles (all of them by default) so the next call reloads from disk
+    global _WARMUP_THREAD
+    with _REGISTRY_LOCK:
+        persist_key = str(Path(persist_dir).resolve()) if persist_dir else None
+        for key in list(_VECTORDBS):
+            if (model_name is None or key[0] == model_name) and (persist_key is None or key[2] == persist_key):
+                del _VECTORDBS[key]
+        if persist_dir is None:
+            for name in list(_EMBEDDINGS):
+                if model_name is None or name == model_name:
+                    del _EMBEDDINGS[name]
+        _WARMUP_THREAD = None
+
+
+def _retrieval_cache_key(vectordb, query: str, k: int, filters: Optional[Dict]) -> Optional[Tuple]:
+    version = getattr(vectordb, "index_version", None)
+    if version is None or RETRIEVAL_CACHE_SIZE <= 0:
+        return None
+    return (version, query, k, json.dumps(filters, sort_keys=True) if filters else "")
+
+
+def _cache_get(key: Optional[Tuple]) -> Optional[List[Document]]:
+    if key is None:
+        return None
+    with _RETRIEVAL_CACHE_LOCK:
+        docs = _RETRIEVAL_CACHE.get(key)
+        if docs is not None:
+            _RETRIEVAL_CACHE.move_to_end(key)
+        return docs
+
+
+def _cache_put(key: Optional[Tuple], docs: List[Document]) -> None:
+    if key is None:
+        return
+    with _RETRIEVAL_CACHE_LOCK:
+        _RETRIEVAL_CACHE[key] = docs
+        _RETRIEVAL_CACHE.move_to_end(key)
+        while len(_RETRIEVAL_CACHE) > RETRIEVAL_CACHE_SIZE:
+            _RETRIEVAL_CACHE.popitem(last=False)
+
+
+def _search_group(vectordb, vectors: List[List[float]], k: int, filters: Optional[Dict]) -> List[List[Document]]:
+    # One backend query for every vector sharing the same filter
+    if hasattr(vectordb, "search_by_vectors"):
+        return vectordb.search_by_vectors(vectors, k=k, filter=filters)
+    collection = getattr(vectordb, "_collection", None)
+    if collection is None:
+        return [vectordb.similarity_search_by_vector(v, k=k, filter=filters) for v in vectors]
+
+    kwargs = {"query_embeddings": vectors, "n_results": k}
     if filters:
-        return vectordb.similarity_search(query, k=k, filter=filters)
-    return vectordb.similarity_search(query, k=k)
+        kwargs["where"] = filters
+    res = collection.query(**kwargs)
+    grouped = []
+    for texts, metas in zip(res["documents"], res["metadatas"]):
+        grouped.append([Document(page_content=t, metadata=m or {}) for t, m in zip(texts, metas)])
+    return grouped
+
+
+def rag_retrieve_many(vectordb, requests: List[RetrievalRequest], use_cache: bool = True) -> List[List[Document]]:
+    """Run several searches with one embedding forward pass.
+
+    Results come back in request order. Cache hits skip both the embedding and the search.
+    """
+    with span("retrieve", requests=len(requests)) as s:
+        results = _retrieve_many(vectordb, requests, use_cache)
+        s.set(docs=sum(len(r) for r in results))
+    return results
+
+
+def _retrieve_many(vectordb, requests: List[RetrievalRequest], use_cache: bool) -> List[List[Document]]:
+    results: List[Optional[List[Document]]] = [None] * len(requests)
+    keys = [_retrieval_cache_key(vectordb, q, k, f) if use_cache else None for q, k, f in requests]
+
+    pending = []
+    for i, key in enumerate(keys):
+        cached = _cache_get(key)
+        if cached is not None:
+            results[i] = list(cached)
+        else:
+            pending.append(i)
+    annotate(cache_hits=len(requests) - len(pending), cache_misses=len(pending))
+
+    if pending:
+        queries = [requests[i][0] for i in pending]
+        with span("embed_queries", requests=len(queries), chars=sum(len(q) for q in queries)):
+            vectors = vectordb.embeddings.embed_documents(queries)
+
+        # group by (filter, k) so each group is a single collection query
+        groups: Dict[Tuple[str, int], List[int]] = {}
+        for pos, i in enumerate(pending):
+            _, k, f = requests[i]
+            groups.setdefault((json.dumps(f, sort_keys=True) if f else "", k), []).append(pos)
+
+        for (_, k), positions in groups.items():
+            filters = requests[pending[positions[0]]][2]
+            docs_per_query = _search_group(vectordb, [vectors[p] for p in positions], k, filters)
+            for p, docs in zip(positions, docs_per_query):
+                i = pending[p]
+                results[i] = docs
+                _cache_put(keys[i], docs)
+
+    return [r or [] for r in results]
+
+
+def rag_retrieve(vectordb, query: str, k: int = 4, filters: Optional[Dict] = None):
+    return rag_retrieve_many(vectordb, [(query, k, filters)])[0]
@@ -1,6 +1,10 @@
 from typing import List
 
+from src.tracing import annotate, traced
+
+@traced("build_roadmap")
 def build_roadmap(missing_skills: List[str], playbook_docs) -> List[dict]:
+    annotate(skills=len(missing_skills), docs=len(playbook_docs or []))
     # Collect a few helpful lines from playbooks (lightweight "RAG grounded" resources)
     playbook_snippets = []
     for d in playbook_docs:
@@ -42,3 +46,15 @@ def build_roadmap(missing_skills: List[str], playbook_docs) -> List[dict]:
         })
 
     return weeks
+
+
+def roadmap_markdown(weeks: List[dict]) -> str:
+    # build_roadmap() output as markdown, one section per week
+    parts = []
+    for w in weeks:
+        lines = [f"**Week {w['week']}: {w['title']}** ({', '.join(w['focus'])})"]
+        lines += [f"- {t}" for t in w["tasks"]]
+        if w["resources"]:
+            lines.append("- Resources: " + "; ".join(w["resources"]))
+        parts.append("\n".join(lines))
+    return "\n\n".join(parts)
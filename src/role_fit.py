@@ -0,0 +1,90 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.roles import RoleDefinition, get_role_registry
+from src.taxonomy import get_taxonomy
+
+# "Rank all roles": one CV profile scored against every role file at once.
+# Fit is weighted coverage of the role's required skills (core 1.0, optional 0.5).
+CORE_WEIGHT = 1.0
+OPTIONAL_WEIGHT = 0.5
+
+
+class RoleSkillMatrix:
+    """Roles x skills weight matrix built from the role files (excluded skills never count).
+
+    Rebuilt when the role registry reloads a file.
+    """
+
+    def __init__(self, roles: List[RoleDefinition]):
+        self.roles = [r.name for r in roles]
+        self.sources = [r.source for r in roles]
+        # columns are canonical skill IDs, named by their canonical names
+        taxonomy = self._taxonomy = get_taxonomy()
+        required = [taxonomy.ids(r.core | r.optional) - taxonomy.ids(r.exclude) for r in roles]
+        ids = sorted({i for req in required for i in req}, key=taxonomy.name)
+        self.skills = [taxonomy.name(i) for i in ids]
+        self._col = {i: j for j, i in enumerate(ids)}
+
+        self.weights = np.zeros((len(roles), len(self.skills)), dtype=np.float64)
+        self.core = np.zeros((len(roles), len(self.skills)), dtype=bool)
+        for i, (role, req) in enumerate(zip(roles, required)):
+            core = taxonomy.ids(role.core)
+            for skill_id in req:
+                j = self._col[skill_id]
+                self.core[i, j] = skill_id in core
+                self.weights[i, j] = CORE_WEIGHT if skill_id in core else OPTIONAL_WEIGHT
+        self.required = self.weights > 0
+        self._totals = self.weights.sum(axis=1)
+        self._core_f = self.core.astype(np.float64)
+        self._core_totals = self.core.sum(axis=1)
+
+    def cv_vector(self, cv_skills: Iterable[str]) -> np.ndarray:
+        has = np.zeros(len(self.skills), dtype=bool)
+        has[[self._col[i] for i in self._taxonomy.ids(cv_skills) if i in self._col]] = True
+        return has
+
+    def rank(self, cv_skills: Iterable[str], top: Optional[int] = None) -> List[Dict]:
+        has = self.cv_vector(cv_skills)
+        x = has.astype(np.float64)
+        # every role in one product: (roles x skills) @ (skills,)
+        fit = np.divide(self.weights @ x, self._totals, out=np.zeros(len(self.roles)), where=self._totals > 0)
+        core_cov = np.divide(self._core_f @ x, self._core_totals, out=np.zeros(len(self.roles)), where=self._core_totals > 0)
+        matched = self.required & has
+        missing = self.required & ~has
+
+        order = sorted(range(len(self.roles)), key=lambda i: (-fit[i], -core_cov[i], self.roles[i]))
+        names = np.array(self.skills, dtype=object)
+        return [
+            {
+                "role": self.roles[i],
+                "role_file": self.sources[i],
+                "fit": round(float(fit[i]), 3),
+                "core_coverage": round(float(core_cov[i]), 3),
+                "matched": names[matched[i]].tolist(),
+                "missing": names[missing[i]].tolist(),
+                "missing_core": names[missing[i] & self.core[i]].tolist(),
+            }
+            for i in order[:top]
+        ]
+
+
+_MATRIX: Optional[Tuple[int, RoleSkillMatrix]] = None
+_MATRIX_LOCK = threading.Lock()
+
+
+def get_role_matrix() -> RoleSkillMatrix:
+    global _MATRIX
+    registry = get_role_registry()
+    roles = registry.roles()  # refreshes the registry, so .version is current
+    with _MATRIX_LOCK:
+        if _MATRIX is None or _MATRIX[0] != registry.version:
+            _MATRIX = (registry.version, RoleSkillMatrix(roles))
+        return _MATRIX[1]
+
+
+def rank_roles(cv_skills: Iterable[str], top: Optional[int] = None) -> List[Dict]:
+    """Every role ranked by fit, best first, with the same matched/missing lists a single-role analysis gives."""
+    return get_role_matrix().rank(cv_skills, top)
@@ -0,0 +1,360 @@
+import os
+import re
+import math
+import time
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from src.taxonomy import get_taxonomy
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+ROLES_DIR = BASE_DIR / "data" / "roles"
+
+ROLE_FILE_MAP: Dict[str, str] = {
+    "Data/BI Analyst": "data_bi_analyst.md",
+    "Data Scientist": "data_scientist.md",
+    "Data Engineer": "data_engineer.md",
+    "ML Engineer": "ml_engineer.md",
+    "AI Engineer": "ai_engineer.md",
+    "GenAI/NLP Engineer": "genai_nlp_engineer.md",
+    "Software Engineer ML AI": "software_engineer_ml_ai.md",
+}
+
+ROLE_ALIASES: Dict[str, List[str]] = {
+    "Data/BI Analyst": ["data analyst", "bi analyst", "business intelligence", "reporting analyst"],
+    "Data Scientist": ["data scientist", "applied scientist"],
+    "Data Engineer": ["data engineer", "analytics engineer", "etl developer"],
+    "ML Engineer": ["ml engineer", "machine learning engineer"],
+    "AI Engineer": ["ai engineer"],
+    "GenAI/NLP Engineer": ["genai engineer", "generative ai engineer", "llm engineer", "rag engineer", "nlp engineer"],
+    "Software Engineer ML AI": ["software engineer ml", "software engineer ai", "ml software engineer"],
+}
+
+EMPTY: FrozenSet[str] = frozenset()
+
+# Title normalisation for fuzzy role matching
+ROLE_PHRASES: Dict[str, str] = {
+    "machine learning": "ml",
+    "artificial intelligence": "ai",
+    "natural language processing": "nlp",
+    "business intelligence": "bi",
+    "generative ai": "genai",
+    "gen ai": "genai",
+    "large language models": "llm",
+    "large language model": "llm",
+}
+ROLE_TOKEN_MAP: Dict[str, Tuple[str, ...]] = {
+    "mle": ("ml", "engineer"),
+    "swe": ("software", "engineer"),
+    "sde": ("software", "engineer"),
+    "ds": ("data", "scientist"),
+    "llms": ("llm",),
+    "eng": ("engineer",),
+    "engineering": ("engineer",),
+    "developer": ("engineer",),
+    "dev": ("engineer",),
+    "science": ("scientist",),
+    "analysis": ("analyst",),
+    "analytic": ("analytics",),
+}
+ROLE_STOPWORDS = frozenset(
+    "sr senior jr junior lead principal staff head chief mid level entry intern graduate trainee associate "
+    "i ii iii iv v 1 2 3 4 5 of the and a an for in at with remote hybrid contract fulltime full time".split()
+)
+ROLE_MATCH_THRESHOLD = float(os.getenv("ROLE_MATCH_THRESHOLD", "0.6"))
+
+
+def _parse_list(text: str, key: str) -> FrozenSet[str]:
+    lines = text.splitlines()
+    key_re = re.compile(rf"^\s*{re.escape(key)}\s*:\s*(.*)\s*$", re.IGNORECASE)
+
+    items = []
+    capture = False
+
+    for line in lines:
+        m = key_re.match(line)
+        if m:
+            capture = True
+            inline = m.group(1).strip()
+            if inline:
+                items.append(inline)
+            continue
+
+        if capture:
+            s = line.strip()
+            if not s:
+                break
+            if s.endswith(":"):  # next section header
+                break
+            items.append(s)
+
+    joined = ", ".join(items)
+    # Canonical taxonomy names, so "Tensorflow" in a role file is the TensorFlow the matcher finds
+    taxonomy = get_taxonomy()
+    return frozenset(taxonomy.canonical(x) for x in joined.split(",") if x.strip())
+
+
+@dataclass(frozen=True)
+class RoleDefinition:
+    name: str
+    source: str
+    core: FrozenSet[str]
+    optional: FrozenSet[str]
+    exclude: FrozenSet[str]
+    aliases: Tuple[str, ...]
+
+    def scope(self) -> Dict:
+        return {
+            "core": self.core,
+            "optional": self.optional,
+            "exclude": self.exclude,
+            "source": self.source,
+            "role_label": self.name,
+        }
+
+
+def empty_scope(role_label: str = "") -> Dict:
+    return {"core": EMPTY, "optional": EMPTY, "exclude": EMPTY, "source": None, "role_label": role_label}
+
+
+def _role_name_from_file(path: Path, text: str) -> str:
+    for label, file_name in ROLE_FILE_MAP.items():
+        if file_name == path.name:
+            return label
+    for line in text.splitlines():
+        if line.startswith("# "):
+            title = line[2:].strip()
+            return title[:-5].strip() if title.lower().endswith(" role") else title
+    return path.stem.replace("_", " ").title()
+
+
+def _trigrams(token: str) -> FrozenSet[str]:
+    padded = f"  {token} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def role_title_tokens(title: str) -> Tuple[str, ...]:
+    t = " " + re.sub(r"[^a-z0-9]+", " ", (title or "").lower()) + " "
+    for phrase, repl in ROLE_PHRASES.items():
+        t = t.replace(f" {phrase} ", f" {repl} ")
+    tokens = []
+    for tok in t.split():
+        if tok in ROLE_STOPWORDS:
+            continue
+        for mapped in ROLE_TOKEN_MAP.get(tok, (tok,)):
+            if mapped not in tokens:
+                tokens.append(mapped)
+    return tuple(tokens)
+
+
+class RoleTitleIndex:
+    """Token index over canonical role names and aliases for fuzzy title matching.
+
+    Titles are normalised to tokens (phrases such as "machine learning" -> "ml",
+    seniority words dropped) and scored against every entry sharing a token with
+    IDF-weighted Jaccard similarity, scaled by the share of the entry's tokens the
+    query covers, so generic titles ("Data") do not resolve to a longer role. Unknown
+    query tokens are snapped to the closest vocabulary token by character-trigram
+    similarity, which absorbs typos.
+    """
+
+    def __init__(self, entries: Dict[str, List[str]]):
+        self._entries: List[Tuple[str, FrozenSet[str]]] = []
+        self._postings: Dict[str, List[int]] = {}
+        for canonical, titles in entries.items():
+            for title in [canonical] + list(titles):
+                tokens = frozenset(role_title_tokens(title))
+                if not tokens:
+                    continue
+                idx = len(self._entries)
+                self._entries.append((canonical, tokens))
+                for tok in tokens:
+                    self._postings.setdefault(tok, []).append(idx)
+
+        n = max(1, len(self._entries))
+        self._idf = {tok: math.log(1 + n / len(ids)) for tok, ids in self._postings.items()}
+        self._trigram_index: Dict[str, List[str]] = {}
+        for tok in self._postings:
+            for g in _trigrams(tok):
+                self._trigram_index.setdefault(g, []).append(tok)
+        self._cache: Dict[str, Tuple[Optional[str], float]] = {}
+
+    def _snap(self, token: str) -> Optional[str]:
+        if token in self._postings:
+            return token
+        if len(token) < 4:
+            return None
+        grams = _trigrams(token)
+        counts: Dict[str, int] = {}
+        for g in grams:
+            for cand in self._trigram_index.get(g, []):
+                counts[cand] = counts.get(cand, 0) + 1
+        best, best_sim = None, 0.0
+        for cand, shared in counts.items():
+            sim = shared / len(grams | _trigrams(cand))
+            if sim > best_sim:
+                best, best_sim = cand, sim
+        return best if best_sim >= 0.5 else None
+
+    def match(self, title: str) -> Tuple[Optional[str], float]:
+        # (canonical role, confidence in [0, 1]); role is None when nothing shares a token
+        key = (title or "").strip().lower()
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        query = set()
+        unknown = 0
+        for tok in role_title_tokens(key):
+            snapped = self._snap(tok)
+            if snapped:
+                query.add(snapped)
+            else:
+                unknown += 1
+
+        best: Tuple[Optional[str], float] = (None, 0.0)
+        candidates = {idx for tok in query for idx in self._postings.get(tok, [])}
+        for idx in sorted(candidates):
+            canonical, tokens = self._entries[idx]
+            shared = sum(self._idf[t] for t in tokens & query)
+            union = sum(self._idf[t] for t in tokens | query) + unknown
+            coverage = len(tokens & query) / len(tokens)
+            score = shared / union * coverage if union else 0.0
+            if score > best[1]:
+                best = (canonical, score)
+
+        if len(self._cache) < 4096:
+            self._cache[key] = best
+        return best
+
+
+class RoleRegistry:
+    """All role definitions from data/roles, parsed once and kept as immutable sets.
+
+    Lookups are dictionary hits. Files are re-stat'ed at most every `check_interval`
+    seconds and only changed files are re-parsed.
+    """
+
+    def __init__(self, roles_dir: Path = ROLES_DIR, check_interval: float = 2.0):
+        self.roles_dir = Path(roles_dir)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtimes: Dict[Path, float] = {}
+        self._by_file: Dict[Path, RoleDefinition] = {}
+        self._by_name: Dict[str, RoleDefinition] = {}
+        self._by_alias: Dict[str, str] = {}
+        self._last_check = 0.0
+        self._title_index: Optional[RoleTitleIndex] = None
+        self.version = 0
+        self._refresh(force=True)
+
+    def _refresh(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return
+        with self._lock:
+            if not force and now - self._last_check < self.check_interval:
+                return
+            self._last_check = now
+
+            current = {}
+            for p in sorted(self.roles_dir.glob("*.md")):
+                try:
+                    current[p] = p.stat().st_mtime
+                except OSError:
+                    continue
+            if current == self._mtimes:
+                return
+
+            by_file = {p: d for p, d in self._by_file.items() if p in current and self._mtimes.get(p) == current[p]}
+            for p in current:
+                if p not in by_file:
+                    by_file[p] = self._load_file(p)
+
+            by_name = {d.name: d for d in by_file.values()}
+            by_alias: Dict[str, str] = {}
+            for d in by_name.values():
+                by_alias[d.name.lower()] = d.name
+                for a in d.aliases:
+                    by_alias.setdefault(a, d.name)
+
+            self._by_file, self._by_name, self._by_alias, self._mtimes = by_file, by_name, by_alias, current
+            self._title_index = RoleTitleIndex({d.name: list(d.aliases) for d in by_name.values()})
+            self.version += 1
+
+    def _load_file(self, path: Path) -> RoleDefinition:
+        text = path.read_text(encoding="utf-8", errors="ignore")
+        name = _role_name_from_file(path, text)
+        return RoleDefinition(
+            name=name,
+            source=path.name,
+            core=_parse_list(text, "CORE_SKILLS"),
+            optional=_parse_list(text, "OPTIONAL_SKILLS"),
+            exclude=_parse_list(text, "EXCLUDE_SKILLS"),
+            aliases=tuple(a.lower() for a in ROLE_ALIASES.get(name, [])),
+        )
+
+    def names(self) -> List[str]:
+        self._refresh()
+        return list(self._by_name)
+
+    def roles(self) -> List[RoleDefinition]:
+        self._refresh()
+        return list(self._by_name.values())
+
+    def canonical(self, name: str) -> Optional[str]:
+        # exact (case-insensitive) canonical name or alias -> canonical name
+        self._refresh()
+        return self._by_alias.get((name or "").strip().lower())
+
+    def match_title(self, title: str) -> Tuple[Optional[str], float]:
+        self._refresh()
+        return self._title_index.match(title) if self._title_index else (None, 0.0)
+
+    def get(self, role_name: str) -> Optional[RoleDefinition]:
+        self._refresh()
+        role = self._by_name.get(role_name)
+        if role is None:
+            canonical = self.canonical(role_name)
+            role = self._by_name.get(canonical) if canonical else None
+        return role
+
+    def scope(self, role_name: str) -> Dict:
+        role = self.get(role_name)
+        return role.scope() if role else empty_scope(role_name)
+
+
+_REGISTRY: Optional[RoleRegistry] = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_role_registry() -> RoleRegistry:
+    global _REGISTRY
+    if _REGISTRY is None:
+        with _REGISTRY_LOCK:
+            if _REGISTRY is None:
+                _REGISTRY = RoleRegistry()
+    return _REGISTRY
+
+
+def normalize_role_name(role: str) -> str:
+    r = (role or "").strip().lower()
+    if not r:
+        return ""
+    registry = get_role_registry()
+    canonical = registry.canonical(r)
+    if canonical:
+        return canonical
+    for canonical, role_aliases in ROLE_ALIASES.items():
+        if any(a in r for a in role_aliases):
+            return canonical
+    canonical, score = registry.match_title(r)
+    if canonical and score >= ROLE_MATCH_THRESHOLD:
+        return canonical
+    return role.strip()
+
+
+def load_role_scope(role_name: str) -> Dict:
+    return get_role_registry().scope(role_name)
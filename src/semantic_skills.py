@@ -0,0 +1,205 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from src.roles import get_role_registry
+from src.taxonomy import get_taxonomy
+from src.tracing import span
+
+# Optional embedding-based skill matching on top of the regex matcher (off by default).
+# Regex hits stay the evidence of record; this only adds skills the patterns missed,
+# e.g. "vector search with Milvus" -> Vector Database.
+if TYPE_CHECKING:
+    import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SKILL_MATRIX_DIR = BASE_DIR / ".cache" / "skill_embeddings"
+
+SEMANTIC_SKILLS = os.getenv("SEMANTIC_SKILLS", "0").strip() == "1"
+SEMANTIC_THRESHOLD = float(os.getenv("SEMANTIC_THRESHOLD", "0.6"))
+SEMANTIC_BUDGET_MS = float(os.getenv("SEMANTIC_BUDGET_MS", "1000"))
+SEMANTIC_BATCH_SIZE = int(os.getenv("SEMANTIC_BATCH_SIZE", "64"))
+SEMANTIC_MAX_SENTENCES = int(os.getenv("SEMANTIC_MAX_SENTENCES", "400"))
+
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?;])\s+|\s+[|•▪●]\s+")
+_LABELS: Dict[int, Dict[str, str]] = {}  # role registry version -> canonical_skill_labels()
+_MATRICES: Dict[str, Tuple[List[str], "np.ndarray"]] = {}
+_MATRIX_LOCK = threading.Lock()
+
+
+def semantic_enabled() -> bool:
+    return SEMANTIC_SKILLS
+
+
+def semantic_signature() -> str:
+    # Folded into the CV cache key: profiles differ with the model / threshold
+    if not SEMANTIC_SKILLS:
+        return "regex"
+    from src.rag import embedding_model_name
+
+    return f"semantic:{embedding_model_name()}:{SEMANTIC_THRESHOLD:g}"
+
+
+def _pattern_terms(pattern: str) -> str:
+    # r"\bvector\s?db\b" -> "vector db"; good enough to give the embedding model some synonyms
+    term = re.sub(r"\\b|\\s\?|\(\?:|\)|\?", " ", pattern)
+    term = re.sub(r"\[([^\]]*)\]", lambda m: " " if " " in m.group(1) or "-" in m.group(1) else m.group(1)[:1], term)
+    return " ".join(term.replace("\\", "").split())
+
+
+def canonical_skill_labels() -> Dict[str, str]:
+    """Every skill the matcher can credit -> the text that gets embedded for it.
+
+    Taxonomy skills come with their synonyms and pattern terms. Role-file skills are
+    already canonical (see src/roles.py); the ones outside the taxonomy are added as they are.
+    """
+    taxonomy = get_taxonomy()
+    labels: Dict[str, str] = {}
+    for skill, synonyms, patterns in zip(taxonomy.names, taxonomy.synonyms, taxonomy.patterns().values()):
+        terms = [t for t in dict.fromkeys(synonyms + [_pattern_terms(p) for p in patterns])
+                 if t and t.lower() != skill.lower()]
+        labels[skill] = f"{skill}: {', '.join(terms)}" if terms else skill
+    for role in get_role_registry().roles():
+        for skill in sorted(role.core | role.optional):
+            labels.setdefault(skill, skill)
+    return labels
+
+
+def _normalize_rows(m: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    return m / np.where(norms == 0, 1.0, norms)
+
+
+def get_skill_matrix() -> Tuple[List[str], "np.ndarray"]:
+    """(skill names, L2-normalised embeddings), computed once per model and skill list.
+
+    Kept in memory and in .cache/skill_embeddings/, keyed by model name and the labels' hash.
+    """
+    import numpy as np
+
+    from src.rag import embedding_model_name, get_embeddings
+
+    registry_version = get_role_registry().version
+    labels = _LABELS.get(registry_version)
+    if labels is None:
+        labels = _LABELS[registry_version] = canonical_skill_labels()
+    model = embedding_model_name()
+    key = hashlib.sha256(json.dumps([model, labels], sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    cached = _MATRICES.get(key)
+    if cached is not None:
+        return cached
+
+    with _MATRIX_LOCK:
+        cached = _MATRICES.get(key)
+        if cached is not None:
+            return cached
+        names = list(labels)
+        path = SKILL_MATRIX_DIR / f"{key}.npy"
+        matrix = None
+        if path.exists():
+            try:
+                matrix = np.load(path)
+            except (OSError, ValueError):
+                matrix = None
+        if matrix is None or matrix.shape[0] != len(names):
+            with span("embed_skills", skills=len(names)):
+                matrix = _normalize_rows(np.asarray(get_embeddings().embed_documents([labels[n] for n in names]), dtype=np.float32))
+            try:
+                SKILL_MATRIX_DIR.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(".tmp")
+                with tmp.open("wb") as f:
+                    np.save(f, matrix)
+                tmp.replace(path)
+            except OSError:
+                pass  # the in-memory copy is enough
+        _MATRICES[key] = (names, matrix)
+        # only the current skill list is worth keeping
+        for old in [k for k in _MATRICES if k != key]:
+            del _MATRICES[old]
+    return _MATRICES[key]
+
+
+def cv_sentences(text: str, max_sentences: int = SEMANTIC_MAX_SENTENCES) -> List[str]:
+    # Lines split further at sentence ends / inline bullets; short fragments and repeats dropped
+    out: Dict[str, None] = {}
+    for line in (text or "").splitlines():
+        for part in _SENTENCE_SPLIT_RE.split(line):
+            part = " ".join(part.split())
+            if len(part) >= 12 and len(part.split()) >= 2:
+                out.setdefault(part[:300])
+                if len(out) >= max_sentences:
+                    return list(out)
+    return list(out)
+
+
+def semantic_skill_matches(text: str, exclude=(), threshold: Optional[float] = None,
+                           budget_ms: Optional[float] = None) -> Dict[str, Dict]:
+    """Skills whose embedding is close to some CV sentence: {skill: {"similarity", "evidence", "mentions"}}.
+
+    Sentences are embedded in batches and scored against the whole skill matrix with one
+    matrix product per batch. Embedding stops before a batch that would overrun the
+    per-CV budget; whatever was scored by then is used.
+    """
+    import numpy as np
+
+    from src.rag import get_embeddings
+
+    threshold = SEMANTIC_THRESHOLD if threshold is None else threshold
+    budget = (SEMANTIC_BUDGET_MS if budget_ms is None else budget_ms) / 1000
+    with span("semantic_skills") as s:
+        names, skill_matrix = get_skill_matrix()
+        sentences = cv_sentences(text)
+        embeddings = get_embeddings()
+        start = time.perf_counter()
+
+        best = np.full(len(names), -1.0, dtype=np.float32)
+        best_row = np.zeros(len(names), dtype=np.int64)
+        hits = np.zeros(len(names), dtype=np.int64)
+        scored = batches = 0
+        batch = max(1, SEMANTIC_BATCH_SIZE)
+        for i in range(0, len(sentences), batch):
+            elapsed = time.perf_counter() - start
+            if batches and elapsed + elapsed / batches > budget:
+                break  # the next batch would likely overrun the budget
+            chunk = sentences[i:i + batch]
+            vecs = _normalize_rows(np.asarray(embeddings.embed_documents(chunk), dtype=np.float32))
+            sims = vecs @ skill_matrix.T  # (sentences, skills)
+            top = sims.argmax(axis=0)
+            top_sim = sims[top, np.arange(len(names))]
+            better = top_sim > best
+            best[better] = top_sim[better]
+            best_row[better] = top[better] + i
+            hits += (sims >= threshold).sum(axis=0)
+            scored += len(chunk)
+            batches += 1
+
+        taxonomy = get_taxonomy()
+        skipped = taxonomy.ids(exclude)
+        matches = {
+            names[j]: {
+                "mentions": int(hits[j]),
+                "similarity": round(float(best[j]), 3),
+                "evidence": [sentences[best_row[j]]],
+            }
+            for j in np.flatnonzero(best >= threshold)
+            if taxonomy.skill_id(names[j]) not in skipped
+        }
+        s.set(sentences=scored, truncated=scored < len(sentences), skills=len(matches))
+    return matches
+
+
+def add_semantic_matches(text: str, profile: Dict) -> Dict:
+    # Regex results win; semantic-only skills are added with the lowest score
+    found = semantic_skill_matches(text, exclude=profile["skills"].keys())
+    skills = dict(profile["skills"])
+    for skill, info in found.items():
+        skills[skill] = {"mentions": info["mentions"], "score": 1, "evidence": info["evidence"],
+                         "match": "semantic", "similarity": info["similarity"]}
+    return {"skills": skills}
@@ -0,0 +1,221 @@
+import re
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Set
+
+
+_LINE_BREAK_RE = re.compile(r"\r\n|[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
+
+
+def _literal_prefix(pattern: str) -> str:
+    # Longest plain-literal prefix of a pattern (after any leading \b); "" when there is none
+    p = pattern
+    while p.startswith(r"\b"):
+        p = p[2:]
+    prefix = []
+    for ch in p:
+        if ch.isalnum() or ch in " -":
+            prefix.append(ch)
+            continue
+        if ch in "?*{" and prefix:
+            prefix.pop()  # last literal is optional
+        break
+    return "".join(prefix).lower()
+
+
+def _trie_regex(words: List[str]) -> str:
+    # Factor literal alternatives into a trie so the regex engine branches on one char at a time
+    trie: Dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def render(node: Dict) -> str:
+        if "" in node:
+            return ""  # a shorter prefix already covers every longer one
+        branches = [re.escape(ch) + render(child) for ch, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    return render(trie)
+
+
+def _mention_score(mentions: int) -> int:
+    score = 1
+    if mentions >= 2:
+        score = 2
+    if mentions >= 4:
+        score = 3
+    return score
+
+
+class SkillMatcher:
+    """Precompiled matcher that scans a CV once for every skill in the taxonomy.
+
+    A single trie-shaped regex over the patterns' literal prefixes finds every
+    position where some pattern could start. Only the patterns whose prefix starts
+    with that character are tested there, which keeps per-pattern `re.findall`
+    counts (non-overlapping, leftmost) and per-line evidence identical to scanning
+    each skill separately.
+    """
+
+    def __init__(self, skill_patterns: Dict[str, List[str]]):
+        skills = list(skill_patterns.keys())
+        pattern_skill: List[int] = []
+        patterns: List[str] = []
+        first_chars: List[str] = []
+        prefixes: Dict[str, List[str]] = {}
+        always_terms: List[str] = []
+
+        for skill_idx, skill in enumerate(skills):
+            for p in skill_patterns[skill]:
+                pattern_skill.append(skill_idx)
+                patterns.append(p)
+                prefix = _literal_prefix(p)
+                first_chars.append(prefix[:1])
+                if prefix:
+                    prefixes.setdefault(prefix[0], []).append(prefix[1:])
+                else:
+                    always_terms.append(f"(?=(?:{p}))")
+
+        # Candidate positions: any place a pattern's literal prefix starts (a superset of real matches).
+        # Each branch consumes only its first char, so overlapping candidates are still visited.
+        branches = []
+        for first, rests in sorted(prefixes.items()):
+            rest = _trie_regex(rests)
+            branches.append(re.escape(first) + (f"(?={rest})" if rest else ""))
+        self._setup(skills, pattern_skill, patterns, first_chars, "|".join(branches + always_terms))
+
+    def _setup(self, skills: List[str], pattern_skill: List[int], patterns: List[str],
+               first_chars: List[str], scanner: str) -> None:
+        self.skills = skills
+        self._pattern_skill = pattern_skill
+        self._patterns = patterns
+        self._first_chars = first_chars
+        self._scanner_source = scanner
+        self._compiled: List[re.Pattern] = [re.compile(p, re.IGNORECASE) for p in patterns]
+        self._by_first: Dict[str, List[int]] = {}
+        self._always: List[int] = []
+        for idx, first in enumerate(first_chars):
+            if first:
+                self._by_first.setdefault(first, []).append(idx)
+            else:
+                self._always.append(idx)
+        self._scanner = re.compile(scanner, re.IGNORECASE)
+        self._skill_patterns = [
+            [self._compiled[i] for i, s in enumerate(self._pattern_skill) if s == skill_idx]
+            for skill_idx in range(len(self.skills))
+        ]
+
+    def state(self) -> Dict:
+        # Everything derived from the patterns, as JSON; see src/taxonomy.py
+        return {
+            "skills": self.skills,
+            "pattern_skill": self._pattern_skill,
+            "patterns": self._patterns,
+            "first_chars": self._first_chars,
+            "scanner": self._scanner_source,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "SkillMatcher":
+        # Skips prefix analysis and trie building; only the regexes are compiled
+        matcher = cls.__new__(cls)
+        matcher._setup(list(state["skills"]), list(state["pattern_skill"]), list(state["patterns"]),
+                       list(state["first_chars"]), state["scanner"])
+        return matcher
+
+    def _candidates(self, ch: str) -> List[int]:
+        bucket = self._by_first.get(ch)
+        if bucket is None:
+            # case-folding oddities (e.g. "\u017f" matches "s"): test every pattern
+            return list(range(len(self._compiled)))
+        if not self._always:
+            return bucket
+        return sorted(bucket + self._always)
+
+    def extract(self, text: str) -> Dict:
+        if not text:
+            return {"skills": {}}
+
+        t = text.lower()
+        raw_lines = text.splitlines()
+        line_starts = [0] + [m.end() for m in _LINE_BREAK_RE.finditer(t)]
+
+        n_patterns = len(self._compiled)
+        counts = [0] * n_patterns
+        last_end = [0] * n_patterns
+        evidence_lines: List[Set[int]] = [set() for _ in self.skills]
+        recheck_lines: List[Set[int]] = [set() for _ in self.skills]
+
+        for hit in self._scanner.finditer(t):
+            pos = hit.start()
+            line_idx = bisect_right(line_starts, pos) - 1
+            line_end = line_starts[line_idx + 1] if line_idx + 1 < len(line_starts) else len(t)
+            for idx in self._candidates(t[pos]):
+                m = self._compiled[idx].match(t, pos)
+                if not m:
+                    continue
+                skill_idx = self._pattern_skill[idx]
+                if pos >= last_end[idx]:
+                    counts[idx] += 1
+                    last_end[idx] = m.end()
+                if m.end() <= line_end:
+                    evidence_lines[skill_idx].add(line_idx)
+                else:
+                    # match runs across a line break; check the line on its own
+                    recheck_lines[skill_idx].add(line_idx)
+
+        mentions_by_skill = [0] * len(self.skills)
+        for idx, c in enumerate(counts):
+            mentions_by_skill[self._pattern_skill[idx]] += c
+
+        # Lowercasing non-ASCII text can shift word boundaries, so those lines are checked as written
+        non_ascii_lines: Set[int] = set()
+        if not text.isascii():
+            non_ascii_lines = {i for i, ln in enumerate(raw_lines) if not ln.isascii()}
+
+        skills: Dict[str, Dict] = {}
+        for skill_idx, skill in enumerate(self.skills):
+            mentions = mentions_by_skill[skill_idx]
+            if mentions <= 0:
+                continue
+
+            found = evidence_lines[skill_idx] - non_ascii_lines
+            for line_idx in (recheck_lines[skill_idx] | non_ascii_lines) - found:
+                ln = raw_lines[line_idx].strip()
+                if any(p.search(ln) for p in self._skill_patterns[skill_idx]):
+                    found.add(line_idx)
+
+            matched_lines = []
+            for line_idx in sorted(found):
+                ln = raw_lines[line_idx].strip()
+                if ln:
+                    matched_lines.append(ln)
+                if len(matched_lines) >= 5:
+                    break
+
+            skills[skill] = {"mentions": mentions, "score": _mention_score(mentions), "evidence": matched_lines}
+
+        return {"skills": skills}
+
+
+    def extract_chunks(self, chunks: Iterable[str]) -> Dict:
+        """Extract from text arriving in pieces (e.g. PDF pages) without joining it first.
+
+        Each chunk is scanned as it arrives and the results are merged. The only
+        difference from extract("\\n".join(chunks)) is that a match can't span two chunks.
+        """
+        merged: Dict[str, Dict] = {}
+        for chunk in chunks:
+            for skill, info in self.extract(chunk)["skills"].items():
+                acc = merged.setdefault(skill, {"mentions": 0, "evidence": []})
+                acc["mentions"] += info["mentions"]
+                acc["evidence"].extend(info["evidence"][: 5 - len(acc["evidence"])])
+
+        skills: Dict[str, Dict] = {}
+        for skill in self.skills:
+            if skill in merged:
+                mentions = merged[skill]["mentions"]
+                skills[skill] = {"mentions": mentions, "score": _mention_score(mentions), "evidence": merged[skill]["evidence"]}
+        return {"skills": skills}
@@ -0,0 +1,198 @@
+import re
+import sys
+import json
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+TAXONOMY_SOURCE = BASE_DIR / "data" / "skills.json"
+TAXONOMY_ARTIFACT = BASE_DIR / "data" / "skills.compiled.json"
+
+# Skill taxonomy: data/skills.json (canonical names, synonyms, regex patterns) is compiled by
+# `python -m src.taxonomy build` into data/skills.compiled.json, which carries the matcher's
+# prepared state and the canonicalisation map. Bump when the compiled format changes.
+COMPILER_VERSION = "1"
+
+
+def skill_key(skill: str) -> str:
+    # "Vector Databases" / "vector-database" -> "vector database"
+    words = re.sub(r"[^a-z0-9+#]+", " ", (skill or "").lower()).split()
+    if words and len(words[-1]) > 3 and words[-1].endswith("s") and not words[-1].endswith("ss"):
+        words[-1] = words[-1][:-1]
+    return " ".join(words)
+
+
+def match_key(skill: str) -> str:
+    # Spacing doesn't tell skills apart: "Power BI" / "PowerBI", "CI/CD" / "CI CD", "Fast API" / "FastAPI"
+    return skill_key(skill).replace(" ", "")
+
+
+def _source_digest(raw: bytes) -> str:
+    return hashlib.sha256(COMPILER_VERSION.encode("utf-8") + b"|" + raw).hexdigest()
+
+
+def compile_taxonomy(source: Dict) -> Dict:
+    """Validated artifact for a parsed skills.json. Raises ValueError on duplicate names or bad patterns."""
+    # not src.skills: this runs under get_taxonomy()'s lock and must not call back into it
+    from src.skill_matcher import SkillMatcher
+
+    names: List[str] = []
+    synonyms: List[List[str]] = []
+    patterns: Dict[str, List[str]] = {}
+    keys: Dict[str, int] = {}
+    for entry in source.get("skills", []):
+        name = (entry.get("name") or "").strip()
+        if not name:
+            raise ValueError(f"skill without a name: {entry!r}")
+        skill_id = len(names)
+        for term in [name] + list(entry.get("synonyms", [])):
+            key = match_key(term)
+            if not key:
+                continue
+            owner = keys.setdefault(key, skill_id)
+            if owner != skill_id:
+                raise ValueError(f"{term!r} ({name}) is already a name or synonym of {names[owner]!r}")
+        for p in entry.get("patterns", []):
+            try:
+                re.compile(p)
+            except re.error as e:
+                raise ValueError(f"bad pattern for {name!r}: {p!r} ({e})") from None
+        names.append(name)
+        synonyms.append([s.strip() for s in entry.get("synonyms", []) if s.strip()])
+        patterns[name] = list(entry.get("patterns", []))
+
+    return {
+        "compiler": COMPILER_VERSION,
+        "names": names,
+        "synonyms": synonyms,
+        "keys": keys,
+        "matcher": SkillMatcher(patterns).state(),
+    }
+
+
+class SkillTaxonomy:
+    """Canonical skills with dense integer IDs (their position in data/skills.json).
+
+    Any spelling of a skill -- canonical name, synonym, different case, plural or spacing --
+    maps to the same ID, so set operations on IDs see "Tensorflow" and "TensorFlow" as one
+    skill. Names outside the taxonomy (role-file or playbook only) get IDs after the known
+    ones, assigned on first use and stable for the life of the process.
+    """
+
+    def __init__(self, version: str, compiled: Dict):
+        self.version = version
+        self.names: List[str] = compiled["names"]
+        self.synonyms: List[List[str]] = compiled["synonyms"]
+        self.matcher_state: Dict = compiled["matcher"]
+        self._keys: Dict[str, int] = dict(compiled["keys"])
+        self._known = len(self.names)
+        self._extra: List[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._known
+
+    def patterns(self) -> Dict[str, List[str]]:
+        by_skill: Dict[str, List[str]] = {name: [] for name in self.names}
+        for skill_idx, p in zip(self.matcher_state["pattern_skill"], self.matcher_state["patterns"]):
+            by_skill[self.names[skill_idx]].append(p)
+        return by_skill
+
+    def find(self, name: str) -> Optional[int]:
+        return self._keys.get(match_key(name))
+
+    def skill_id(self, name: str) -> int:
+        key = match_key(name)
+        skill_id = self._keys.get(key)
+        if skill_id is None:
+            with self._lock:
+                skill_id = self._keys.get(key)
+                if skill_id is None:
+                    skill_id = self._keys[key] = self._known + len(self._extra)
+                    self._extra.append(name.strip())
+        return skill_id
+
+    def name(self, skill_id: int) -> str:
+        return self.names[skill_id] if skill_id < self._known else self._extra[skill_id - self._known]
+
+    def canonical(self, name: str) -> str:
+        return self.name(self.skill_id(name)) if match_key(name) else name.strip()
+
+    def canonical_key(self, name: str) -> str:
+        # Stable string key for persisted indexes (IDs of unknown skills are per process)
+        return skill_key(self.canonical(name))
+
+    def ids(self, names: Iterable[str]) -> Set[int]:
+        return {self.skill_id(n) for n in names if match_key(n)}
+
+    def names_of(self, ids: Iterable[int]) -> List[str]:
+        return sorted(self.name(i) for i in ids)
+
+
+def _read_source() -> bytes:
+    return TAXONOMY_SOURCE.read_bytes()
+
+
+def load_taxonomy() -> SkillTaxonomy:
+    # The artifact is used only when it was built from the current skills.json; otherwise
+    # the source is compiled in memory (a few ms) so an edit never runs against stale data
+    raw = _read_source()
+    digest = _source_digest(raw)
+    try:
+        artifact = json.loads(TAXONOMY_ARTIFACT.read_text(encoding="utf-8"))
+        if artifact.get("source_sha256") == digest:
+            return SkillTaxonomy(artifact["version"], artifact)
+    except (OSError, ValueError, KeyError):
+        pass
+    return SkillTaxonomy(digest[:12], compile_taxonomy(json.loads(raw)))
+
+
+def build_artifact(path: Path = TAXONOMY_ARTIFACT) -> Dict:
+    raw = _read_source()
+    digest = _source_digest(raw)
+    artifact = {"version": digest[:12], "source_sha256": digest, **compile_taxonomy(json.loads(raw))}
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(artifact, indent=1, ensure_ascii=False) + "\n", encoding="utf-8")
+    tmp.replace(path)
+    return artifact
+
+
+_TAXONOMY: Optional[SkillTaxonomy] = None
+_TAXONOMY_LOCK = threading.Lock()
+
+
+def get_taxonomy() -> SkillTaxonomy:
+    global _TAXONOMY
+    if _TAXONOMY is None:
+        with _TAXONOMY_LOCK:
+            if _TAXONOMY is None:
+                _TAXONOMY = load_taxonomy()
+    return _TAXONOMY
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Compile data/skills.json into data/skills.compiled.json.")
+    ap.add_argument("command", choices=["build", "check"], help="build: write the artifact; check: fail if it is stale")
+    args = ap.parse_args(argv)
+
+    if args.command == "build":
+        artifact = build_artifact()
+        print(f"Wrote {TAXONOMY_ARTIFACT.relative_to(BASE_DIR)}: {len(artifact['names'])} skills, "
+              f"{len(artifact['matcher']['patterns'])} patterns, version {artifact['version']}")
+        return 0
+
+    try:
+        artifact = json.loads(TAXONOMY_ARTIFACT.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        artifact = {}
+    if artifact.get("source_sha256") != _source_digest(_read_source()):
+        print("data/skills.compiled.json is stale; run: python -m src.taxonomy build", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+import os
+import json
+import time
+import uuid
+import inspect
+import logging
+import threading
+import functools
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Stage timings for the analysis pipeline.
+#   TRACE_LOG     "1"/"stderr" or a file path: one JSON line per finished span (off by default)
+#   METRICS_PATH  Prometheus text file, rewritten after every top-level span (node_exporter textfile style)
+#   METRICS_PORT  serve the same text on http://0.0.0.0:<port>/metrics
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# numeric span attributes that are summed per stage as skill_gap_stage_size_total{unit=...}
+SIZE_ATTRS = ("bytes", "pages", "chars", "skills", "requests", "docs", "prompt_tokens", "completion_tokens", "output_chars")
+
+_CURRENT: ContextVar[Optional["Span"]] = ContextVar("skill_gap_span", default=None)
+
+_METRICS_LOCK = threading.Lock()
+_DURATIONS: Dict[str, List] = {}  # stage -> [bucket counts, sum, count]
+_ERRORS: Dict[str, int] = {}
+_CACHE: Dict[Tuple[str, str], int] = {}
+_SIZES: Dict[Tuple[str, str], float] = {}
+
+_LOGGER = logging.getLogger("skill_gap.trace")
+_LOG_CONFIGURED = False
+_SERVER = None  # http.server.ThreadingHTTPServer, imported only when METRICS_PORT is set
+
+
+class Span:
+    """One timed stage. Finished spans are collected on the root span of their trace."""
+
+    def __init__(self, name: str, attrs: Dict[str, Any], parent: Optional["Span"] = None):
+        self.name = name
+        self.attrs = dict(attrs)
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:8]
+        # shared with every span of the trace, in finish order
+        self.collected: List[Dict] = parent.collected if parent else []
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._t0) * 1000
+
+    def set(self, **attrs) -> "Span":
+        self.attrs.update(attrs)
+        return self
+
+    def end(self, error: Optional[str] = None) -> None:
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self._t0
+        self.error = error
+        record = self.to_dict()
+        self.collected.append(record)
+        _record_metrics(self)
+        _log(record)
+        if self.parent_id is None:
+            _export_metrics_file()
+
+    def to_dict(self) -> Dict:
+        return {
+            "span": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": round(self.start, 6),
+            "duration_ms": round((self.duration or 0.0) * 1000, 3),
+            "error": self.error,
+            **self.attrs,
+        }
+
+
+def start_span(name: str, **attrs) -> Span:
+    # Not made current; for spans that outlive a block (e.g. a streamed response). Call .end().
+    return Span(name, attrs, _CURRENT.get())
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Span]:
+    s = start_span(name, **attrs)
+    token = _CURRENT.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.end(error=type(e).__name__)
+        raise
+    else:
+        s.end()
+    finally:
+        _CURRENT.reset(token)
+
+
+def traced(name: Optional[str] = None):
+    # Decorator form of span(); works on plain and async functions
+    def wrap(fn):
+        stage = name or fn.__name__
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return wrap
+
+
+def current_span() -> Optional[Span]:
+    return _CURRENT.get()
+
+
+def annotate(**attrs) -> None:
+    # Attach sizes / cache results to the innermost active span, if any
+    s = _CURRENT.get()
+    if s is not None:
+        s.set(**attrs)
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose; good enough for sizing dashboards
+    return (len(text) + 3) // 4
+
+
+# ---- memory ------------------------------------------------------------
+# Peak RSS per upload: Linux's VmHWM, reset through /proc/self/clear_refs when a measurement
+# starts. Overlapping measurements in one process share the peak since the first of them
+# began (an upper bound); one upload per process (batch workers, API_CPU_POOL=process) is exact.
+_RSS_LOCK = threading.Lock()
+_RSS_ACTIVE = 0
+
+
+def _proc_status_kb(field: str) -> Optional[int]:
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def rss_mb() -> Optional[float]:
+    kb = _proc_status_kb("VmRSS")
+    return None if kb is None else kb / 1024
+
+
+def peak_rss_mb() -> Optional[float]:
+    kb = _proc_status_kb("VmHWM")
+    return None if kb is None else kb / 1024
+
+
+def _reset_peak_rss() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+@contextmanager
+def track_peak_rss(s: Span) -> Iterator[Span]:
+    # Sets rss_start_mb / rss_peak_mb / rss_growth_mb on the span (nothing where the peak can't be reset)
+    global _RSS_ACTIVE
+    with _RSS_LOCK:
+        reset = _reset_peak_rss() if _RSS_ACTIVE == 0 else True
+        _RSS_ACTIVE += 1
+    start = rss_mb()
+    try:
+        yield s
+    finally:
+        with _RSS_LOCK:
+            _RSS_ACTIVE -= 1
+        peak = peak_rss_mb()
+        if reset and start is not None and peak is not None:
+            s.set(rss_start_mb=round(start, 1), rss_peak_mb=round(peak, 1), rss_growth_mb=round(max(0.0, peak - start), 1))
+
+
+# ---- metrics -----------------------------------------------------------
+def _record_metrics(s: Span) -> None:
+    with _METRICS_LOCK:
+        hist = _DURATIONS.get(s.name)
+        if hist is None:
+            hist = _DURATIONS[s.name] = [[0] * len(DURATION_BUCKETS), 0.0, 0]
+        i = bisect_left(DURATION_BUCKETS, s.duration)
+        if i < len(DURATION_BUCKETS):
+            hist[0][i] += 1
+        hist[1] += s.duration
+        hist[2] += 1
+        if s.error:
+            _ERRORS[s.name] = _ERRORS.get(s.name, 0) + 1
+
+        cache = s.attrs.get("cache")
+        if isinstance(cache, str):
+            _CACHE[(s.name, cache)] = _CACHE.get((s.name, cache), 0) + 1
+        for attr, result in (("cache_hits", "hit"), ("cache_misses", "miss")):
+            n = s.attrs.get(attr)
+            if n:
+                _CACHE[(s.name, result)] = _CACHE.get((s.name, result), 0) + int(n)
+        for unit in SIZE_ATTRS:
+            v = s.attrs.get(unit)
+            if isinstance(v, (int, float)) and not isinstance(v, bool):
+                _SIZES[(s.name, unit)] = _SIZES.get((s.name, unit), 0) + v
+
+
+def render_prometheus() -> str:
+    lines = [
+        "# HELP skill_gap_stage_duration_seconds Time spent per pipeline stage.",
+        "# TYPE skill_gap_stage_duration_seconds histogram",
+    ]
+    with _METRICS_LOCK:
+        for stage in sorted(_DURATIONS):
+            buckets, total, count = _DURATIONS[stage]
+            cumulative = 0
+            for le, n in zip(DURATION_BUCKETS, buckets):
+                cumulative += n
+                lines.append(f'skill_gap_stage_duration_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'skill_gap_stage_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'skill_gap_stage_duration_seconds_sum{{stage="{stage}"}} {total:.6f}')
+            lines.append(f'skill_gap_stage_duration_seconds_count{{stage="{stage}"}} {count}')
+
+        lines += ["# HELP skill_gap_stage_errors_total Stages that raised.", "# TYPE skill_gap_stage_errors_total counter"]
+        lines += [f'skill_gap_stage_errors_total{{stage="{k}"}} {v}' for k, v in sorted(_ERRORS.items())]
+
+        lines += ["# HELP skill_gap_cache_total Cache lookups per stage and result.", "# TYPE skill_gap_cache_total counter"]
+        lines += [f'skill_gap_cache_total{{stage="{k[0]}",result="{k[1]}"}} {v}' for k, v in sorted(_CACHE.items())]
+
+        lines += ["# HELP skill_gap_stage_size_total Input/output sizes per stage.", "# TYPE skill_gap_stage_size_total counter"]
+        lines += [f'skill_gap_stage_size_total{{stage="{k[0]}",unit="{k[1]}"}} {v:g}' for k, v in sorted(_SIZES.items())]
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics() -> None:
+    with _METRICS_LOCK:
+        _DURATIONS.clear()
+        _ERRORS.clear()
+        _CACHE.clear()
+        _SIZES.clear()
+
+
+def _export_metrics_file() -> None:
+    path = os.getenv("METRICS_PATH", "").strip()
+    if not path:
+        return
+    try:
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(target.name + f".{os.getpid()}.tmp")
+        tmp.write_text(render_prometheus(), encoding="utf-8")
+        tmp.replace(target)
+    except OSError:
+        pass  # metrics must never break an analysis
+
+
+def _metrics_handler():
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+
+def start_metrics_server(port: Optional[int] = None):
+    # Idempotent; returns None when no port is configured
+    global _SERVER
+    if port is None:
+        raw = os.getenv("METRICS_PORT", "").strip()
+        if not raw:
+            return None
+        port = int(raw)
+    with _METRICS_LOCK:
+        if _SERVER is None:
+            from http.server import ThreadingHTTPServer
+
+            _SERVER = ThreadingHTTPServer(("0.0.0.0", port), _metrics_handler())
+            threading.Thread(target=_SERVER.serve_forever, name="metrics-server", daemon=True).start()
+    return _SERVER
+
+
+# ---- logs --------------------------------------------------------------
+def _log(record: Dict) -> None:
+    global _LOG_CONFIGURED
+    if not _LOG_CONFIGURED:
+        _LOG_CONFIGURED = True
+        target = os.getenv("TRACE_LOG", "").strip()
+        if target:
+            handler = logging.StreamHandler() if target in ("1", "stderr") else logging.FileHandler(target, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            _LOGGER.addHandler(handler)
+            _LOGGER.setLevel(logging.INFO)
+            _LOGGER.propagate = False
+    if _LOGGER.isEnabledFor(logging.INFO):
+        _LOGGER.info(json.dumps(record, default=str, ensure_ascii=False))
@@ -0,0 +1,197 @@
+import json
+import uuid
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Protocol, Sequence
+
+import numpy as np
+from langchain_core.documents import Document
+
+
+class VectorBackend(Protocol):
+    """What src/rag.py needs from a vector store (langchain's Chroma already fits)."""
+
+    embeddings: Any
+
+    def add_documents(self, documents: List[Document], ids: Optional[List[str]] = None) -> List[str]: ...
+
+    def delete(self, ids: Optional[List[str]] = None) -> Any: ...
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[Dict] = None) -> List[Document]: ...
+
+
+class NumpyVectorStore:
+    """Exact cosine search over an in-process matrix, for small corpora.
+
+    Layout in persist_dir:
+      vectors.npy    float32 (n, dim), L2-normalised, opened memory-mapped
+      records.jsonl  one {"id", "text", "metadata"} per row, same order
+
+    Metadata filters use Chroma's `where` shape and semantics: {"key": value},
+    {"key": {"$eq"|"$ne"|"$in"|"$nin": ...}}, {"$and": [...]}, {"$or": [...]}, each comparing
+    the whole stored value. The pipe-joined "skills" field is a plain string here as in Chroma,
+    so {"skills": "RAG"} only matches chunks tagged with RAG alone; filter by skill after retrieval.
+    """
+
+    VECTORS_NAME = "vectors.npy"
+    RECORDS_NAME = "records.jsonl"
+
+    def __init__(self, persist_directory: str, embedding_function=None):
+        self.persist_dir = Path(persist_directory)
+        self.embeddings = embedding_function
+        self._lock = threading.RLock()
+        self._load()
+
+    # ---- storage -------------------------------------------------------
+    def _load(self) -> None:
+        vec_path = self.persist_dir / self.VECTORS_NAME
+        rec_path = self.persist_dir / self.RECORDS_NAME
+        self._records: List[Dict] = []
+        if rec_path.exists():
+            with rec_path.open(encoding="utf-8") as f:
+                self._records = [json.loads(line) for line in f if line.strip()]
+        if vec_path.exists() and self._records:
+            self._vectors = np.load(vec_path, mmap_mode="r")
+        else:
+            self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._index()
+
+    def _index(self) -> None:
+        self._row_of = {r["id"]: i for i, r in enumerate(self._records)}
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def _save(self, vectors: np.ndarray, records: List[Dict]) -> None:
+        self.persist_dir.mkdir(parents=True, exist_ok=True)
+        vec_tmp = self.persist_dir / (self.VECTORS_NAME + ".tmp")
+        rec_tmp = self.persist_dir / (self.RECORDS_NAME + ".tmp")
+        with vec_tmp.open("wb") as f:
+            np.save(f, np.ascontiguousarray(vectors, dtype=np.float32))
+        with rec_tmp.open("w", encoding="utf-8") as f:
+            for r in records:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+        vec_tmp.replace(self.persist_dir / self.VECTORS_NAME)
+        rec_tmp.replace(self.persist_dir / self.RECORDS_NAME)
+        self._load()
+
+    # ---- writes --------------------------------------------------------
+    def add_vectors(self, ids: Sequence[str], vectors, texts: Sequence[str], metadatas: Sequence[Dict]) -> List[str]:
+        new = np.asarray(vectors, dtype=np.float32)
+        if new.ndim != 2 or len(new) != len(ids):
+            raise ValueError("vectors must be a (len(ids), dim) matrix")
+        norms = np.linalg.norm(new, axis=1, keepdims=True)
+        new = new / np.where(norms == 0, 1.0, norms)
+
+        with self._lock:
+            replaced = set(ids)
+            keep = [i for i, r in enumerate(self._records) if r["id"] not in replaced]
+            records = [self._records[i] for i in keep]
+            records += [{"id": i, "text": t, "metadata": m or {}} for i, t, m in zip(ids, texts, metadatas)]
+            old = np.asarray(self._vectors[keep]) if len(self._records) else np.zeros((0, new.shape[1]), np.float32)
+            self._save(np.vstack([old, new]) if len(old) else new, records)
+        return list(ids)
+
+    def add_documents(self, documents: List[Document], ids: Optional[List[str]] = None) -> List[str]:
+        if not documents:
+            return []
+        if ids is None:
+            ids = [str(uuid.uuid4()) for _ in documents]
+        texts = [d.page_content for d in documents]
+        vectors = self.embeddings.embed_documents(texts)
+        return self.add_vectors(ids, vectors, texts, [dict(d.metadata) for d in documents])
+
+    def delete(self, ids: Optional[List[str]] = None) -> None:
+        if not ids:
+            return
+        with self._lock:
+            drop = set(ids)
+            keep = [i for i, r in enumerate(self._records) if r["id"] not in drop]
+            if len(keep) == len(self._records):
+                return
+            records = [self._records[i] for i in keep]
+            dim = self._vectors.shape[1] if self._vectors.ndim == 2 else 0
+            vectors = np.asarray(self._vectors[keep]) if keep else np.zeros((0, dim), np.float32)
+            self._save(vectors, records)
+
+    def persist(self) -> None:
+        # writes are already durable
+        return None
+
+    def count(self) -> int:
+        return len(self._records)
+
+    # ---- filtering -----------------------------------------------------
+    def _column(self, key: str) -> np.ndarray:
+        col = self._columns.get(key)
+        if col is None:
+            col = np.array([str(r["metadata"].get(key, "")) for r in self._records], dtype=object)
+            self._columns[key] = col
+        return col
+
+    def _eq(self, key: str, value) -> np.ndarray:
+        return self._column(key) == str(value)
+
+    def _mask(self, where: Optional[Dict]) -> Optional[np.ndarray]:
+        if not where:
+            return None
+        masks = []
+        for key, cond in where.items():
+            if key in ("$and", "$or"):
+                parts = [self._mask(c) for c in cond]
+                parts = [p for p in parts if p is not None]
+                if not parts:
+                    continue
+                masks.append(np.logical_and.reduce(parts) if key == "$and" else np.logical_or.reduce(parts))
+            elif isinstance(cond, dict):
+                for op, value in cond.items():
+                    if op == "$eq":
+                        masks.append(self._eq(key, value))
+                    elif op == "$ne":
+                        masks.append(~self._eq(key, value))
+                    elif op in ("$in", "$nin"):
+                        m = np.zeros(len(self._records), dtype=bool)
+                        for v in value:
+                            m |= self._eq(key, v)
+                        masks.append(m if op == "$in" else ~m)
+                    else:
+                        raise ValueError(f"Unsupported filter operator: {op}")
+            else:
+                masks.append(self._eq(key, cond))
+        return np.logical_and.reduce(masks) if masks else None
+
+    # ---- search --------------------------------------------------------
+    def search_by_vectors(self, vectors: Iterable, k: int = 4, filter: Optional[Dict] = None) -> List[List[Document]]:
+        q = np.asarray(list(vectors), dtype=np.float32)
+        if q.ndim == 1:
+            q = q[None, :]
+        with self._lock:
+            if not self._records:
+                return [[] for _ in range(len(q))]
+            norms = np.linalg.norm(q, axis=1, keepdims=True)
+            q = q / np.where(norms == 0, 1.0, norms)
+            mask = self._mask(filter)
+            if mask is not None:
+                rows = np.flatnonzero(mask)
+                if not len(rows):
+                    return [[] for _ in range(len(q))]
+                scores = q @ np.asarray(self._vectors[rows]).T
+            else:
+                rows = None
+                scores = q @ np.asarray(self._vectors).T
+
+            k = min(k, scores.shape[1])
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            results = []
+            for qi in range(len(q)):
+                order = top[qi][np.argsort(-scores[qi, top[qi]], kind="stable")]
+                idx = rows[order] if rows is not None else order
+                results.append([
+                    Document(page_content=self._records[i]["text"], metadata=dict(self._records[i]["metadata"]))
+                    for i in idx
+                ])
+            return results
+
+    def similarity_search_by_vector(self, embedding, k: int = 4, filter: Optional[Dict] = None) -> List[Document]:
+        return self.search_by_vectors([embedding], k=k, filter=filter)[0]
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[Dict] = None) -> List[Document]:
+        return self.similarity_search_by_vector(self.embeddings.embed_query(query), k=k, filter=filter)
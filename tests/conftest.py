@@ -0,0 +1,19 @@
+import pytest
+
+from benchmarks.stub_embeddings import STUB_MODEL_NAME, install_stub_embeddings
+
+
+@pytest.fixture
+def stub_rag(tmp_path, monkeypatch):
+    # Hash embeddings and a NumPy index in a temp dir with an empty registry (restored afterwards):
+    # no model download, nothing written to the repo
+    from src import rag
+
+    monkeypatch.setenv("VECTOR_BACKEND", "numpy")
+    monkeypatch.setenv("EMBEDDING_MODEL", STUB_MODEL_NAME)
+    monkeypatch.setitem(rag.BACKEND_DIRS, "numpy", tmp_path / "vectors")
+    monkeypatch.setattr(rag, "_EMBEDDINGS", {})
+    monkeypatch.setattr(rag, "_VECTORDBS", {})
+    monkeypatch.setattr(rag, "_WARMUP_THREAD", None)
+    install_stub_embeddings()
+    return rag
@@ -0,0 +1,33 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.synthetic import synthetic_cv_pdf
+
+
+@pytest.fixture
+def client(stub_rag):
+    from src import api
+
+    with TestClient(api.app) as c:
+        yield c
+
+
+@pytest.mark.parametrize("name, data", [
+    ("cv.docx", b"not a zip"),
+    ("cv.pdf", b"not a pdf"),
+    ("cv.pdf", synthetic_cv_pdf(1)[:600]),  # truncated
+])
+def test_unreadable_upload_is_422(client, name, data):
+    for endpoint in ("/analyze", "/analyze/roles"):
+        r = client.post(endpoint, files={"file": (name, data)}, data={"role": "Data Engineer", "llm": "false", "llm_top": "0"})
+        assert r.status_code == 422, r.text
+        assert "Could not read" in r.json()["detail"]
+
+
+def test_batch_reports_unreadable_upload_per_file(client):
+    r = client.post("/analyze/batch", files=[("files", ("a.docx", b"x")), ("files", ("b.pdf", synthetic_cv_pdf(1)))],
+                    data={"role": "Data Engineer"})
+    assert r.status_code == 200
+    bad, good = r.json()["results"]
+    assert bad["error"].startswith("UnreadableDocument")
+    assert "error" not in good and good["matched"]
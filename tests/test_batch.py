@@ -0,0 +1,30 @@
+import json
+
+from benchmarks.synthetic import synthetic_cv_docx
+from src import batch
+
+
+def _run(tmp_path, *args):
+    out = tmp_path / "results.jsonl"
+    assert batch.main([str(tmp_path / "cvs"), "-o", str(out), "--no-retrieval", "--workers", "1", *args]) == 0
+    return [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+
+
+def test_resume_only_reuses_records_for_the_same_role(tmp_path, capsys):
+    (tmp_path / "cvs").mkdir()
+    (tmp_path / "cvs" / "a.docx").write_bytes(synthetic_cv_docx(1, seed=1))
+
+    first = _run(tmp_path, "--role", "Data Engineer")
+    assert _run(tmp_path, "--role", "Data Engineer") == first
+    assert "1 already done, 0 to process" in capsys.readouterr().err
+
+    other = _run(tmp_path, "--role", "Data Scientist")
+    assert "0 already done, 1 to process" in capsys.readouterr().err
+    assert other[0]["role"] == "Data Scientist"
+    assert other[0]["checkpoint_key"] != first[0]["checkpoint_key"]
+
+    jd = tmp_path / "jd.txt"
+    jd.write_text("Requirements:\n- Kafka and Spark\n- Airflow", encoding="utf-8")
+    with_jd = _run(tmp_path, "--role", "Data Scientist", "--job-description", str(jd))
+    assert "0 already done, 1 to process" in capsys.readouterr().err
+    assert set(with_jd[0]["matched"]) | set(with_jd[0]["missing"]) == {"Kafka", "Spark", "Airflow"}
@@ -0,0 +1,46 @@
+from src.jd import diff_against_jd, extract_jd_requirements, required_skill_weights
+
+POSTING = """About the role:
+We build data pipelines with Airflow.
+Requirements:
+- Python and SQL
+- Kafka
+Nice to have:
+- Docker
+"""
+
+
+def test_weights_follow_sections():
+    skills = extract_jd_requirements(POSTING)["skills"]
+    weights = {s: info["weight"] for s, info in skills.items()}
+    assert weights == {"Kafka": 1.0, "Python": 1.0, "SQL": 1.0, "Airflow": 0.8, "Docker": 0.5}
+    assert list(weights.values()) == sorted(weights.values(), reverse=True)
+
+
+def test_diff_orders_missing_by_weight_and_weighs_coverage():
+    jd = extract_jd_requirements(POSTING)
+    gap, = diff_against_jd(jd, [["Python", "Docker"]])
+    assert gap["matched"] == ["Python", "Docker"]
+    assert gap["missing"] == ["Kafka", "SQL", "Airflow"]
+    assert gap["coverage"] == round(1.5 / 4.3, 3)
+
+
+def test_role_exclusions_drop_required_skills():
+    jd = extract_jd_requirements(POSTING)
+    assert "SQL" not in required_skill_weights(jd, ["sql"])
+    gap, = diff_against_jd(jd, [[]], ["SQL"])
+    assert "SQL" not in gap["missing"]
+
+
+def test_short_inline_cues_keep_their_skills():
+    skills = extract_jd_requirements("Must have: Docker, Kafka\nNice to have: Airflow\n")["skills"]
+    assert {s: info["section"] for s, info in skills.items()} == {
+        "Docker": "required", "Kafka": "required", "Airflow": "preferred"
+    }
+
+
+def test_long_inline_cue_is_not_scanned_as_a_skill():
+    skills = extract_jd_requirements("Requirements: Python, SQL, Airflow, Kafka, Spark, dbt\n")["skills"]
+    assert "Business Analysis" not in skills
+    assert {"Python", "SQL", "Airflow", "Kafka"} <= set(skills)
+    assert all(info["section"] == "required" for info in skills.values())
@@ -0,0 +1,91 @@
+import multiprocessing as mp
+import zipfile
+from io import BytesIO
+
+import pytest
+
+from benchmarks.synthetic import synthetic_cv_docx, synthetic_cv_pdf
+from src.parsing import UploadTooLarge, extract_text_from_docx, iter_docx_text, iter_pdf_pages, read_upload_bytes
+
+_NS = (
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" '
+    'xmlns:v="urn:schemas-microsoft-com:vml"'
+)
+
+
+def _p(text: str) -> str:
+    return f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>"
+
+
+def _docx(body: str) -> bytes:
+    buf = BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("word/document.xml", f"<w:document {_NS}><w:body>{body}</w:body></w:document>")
+    return buf.getvalue()
+
+
+def _text_box(choice: str, fallback: str) -> str:
+    return (
+        "<w:p><w:r><mc:AlternateContent>"
+        f"<mc:Choice Requires=\"wps\"><w:drawing><w:txbxContent>{choice}</w:txbxContent></w:drawing></mc:Choice>"
+        f"<mc:Fallback><w:pict><v:textbox><w:txbxContent>{fallback}</w:txbxContent></v:textbox></w:pict></mc:Fallback>"
+        "</mc:AlternateContent></w:r></w:p>"
+    )
+
+
+def _table(*rows) -> str:
+    trs = ("<w:tr>" + "".join(f"<w:tc>{_p(c)}</w:tc>" for c in row) + "</w:tr>" for row in rows)
+    return "<w:tbl>" + "".join(trs) + "</w:tbl>"
+
+
+def test_paragraphs_match_python_docx():
+    from docx import Document
+
+    data = synthetic_cv_docx(2, seed=1)
+    expected = "\n".join(p.text for p in Document(BytesIO(data)).paragraphs if p.text)
+    assert extract_text_from_docx(data) == expected
+
+
+def test_table_rows_become_lines():
+    data = _docx(_p("Skills") + _table(["Languages", "Python, SQL"], ["Ops", "Docker"]))
+    assert extract_text_from_docx(data) == "Skills\nLanguages | Python, SQL\nOps | Docker"
+
+
+def test_text_box_read_once():
+    data = _docx(_p("Before") + _text_box(_p("Python in box"), _p("Python in box")) + _p("After"))
+    assert extract_text_from_docx(data) == "Before\nPython in box\nAfter"
+
+
+def test_text_after_fallback_table_is_kept():
+    # A table inside the fallback copy of a text box must not swallow the rest of the document
+    box = _text_box(_p("Python in box"), _table(["Python in box"]))
+    data = _docx(_p("Before") + box + _p("After: Docker Kubernetes SQL"))
+    assert extract_text_from_docx(data) == "Before\nPython in box\nAfter: Docker Kubernetes SQL"
+
+
+def test_max_chars_stops_early():
+    data = _docx("".join(_p(f"line {i}") for i in range(100)))
+    text = "\n".join(iter_docx_text(data, max_chars=20))
+    assert text.replace("\n", "") == "".join(f"line {i}" for i in range(100))[:20]
+
+
+def test_read_upload_bytes_cap():
+    class Upload(BytesIO):
+        name = "cv.docx"
+
+    assert read_upload_bytes(Upload(b"x" * 10), max_bytes=10) == b"x" * 10
+    with pytest.raises(UploadTooLarge):
+        read_upload_bytes(Upload(b"x" * 11), max_bytes=10)
+
+
+def test_pdf_page_timeout_interrupts_the_page():
+    pdf = synthetic_cv_pdf(3, seed=2)
+    assert all(list(iter_pdf_pages(pdf, page_timeout=10, workers=1)))
+    assert list(iter_pdf_pages(pdf, page_timeout=1e-9, workers=1)) == ["", "", ""]
+
+
+def test_pdf_page_timeout_kills_stuck_workers():
+    pdf = synthetic_cv_pdf(3, seed=2)
+    assert list(iter_pdf_pages(pdf, page_timeout=1e-9, workers=2)) == ["", "", ""]
+    assert not mp.active_children()
@@ -0,0 +1,73 @@
+import hashlib
+import shutil
+import threading
+import time
+
+from langchain_core.embeddings import Embeddings
+
+from src import rag
+
+
+class _WordHashEmbeddings(Embeddings):
+    # Deterministic and offline; similarity doesn't matter here, only which chunks get embedded
+    def _embed(self, text: str):
+        v = [0.0] * 64
+        for word in text.lower().split():
+            v[int(hashlib.md5(word.encode("utf-8")).hexdigest(), 16) % 64] += 1.0
+        return v
+
+    def embed_documents(self, texts):
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+def test_sync_index_only_touches_changed_files(tmp_path, monkeypatch):
+    from langchain_community.vectorstores import Chroma
+
+    data = tmp_path / "data"
+    shutil.copytree(rag.DATA_DIR / "playbooks", data / "playbooks")
+    (data / "roles").mkdir()
+    monkeypatch.setattr(rag, "DATA_DIR", data)
+    persist_dir = tmp_path / "index"
+    persist_dir.mkdir()
+    store = Chroma(persist_directory=str(persist_dir), embedding_function=_WordHashEmbeddings())
+
+    def sync():
+        stats = rag.sync_index(store, persist_dir, "test-model", rag._load_manifest(persist_dir))
+        return stats, store._collection.count()
+
+    first, total = sync()
+    assert first["added"] == total > 0 and first["deleted"] == 0
+    unchanged, _ = sync()
+    assert (unchanged["added"], unchanged["deleted"]) == (0, 0)
+
+    playbooks = sorted((data / "playbooks").glob("*.md"))
+    with playbooks[0].open("a", encoding="utf-8") as f:
+        f.write("\n\nOne more practice exercise.\n")
+    edited, count = sync()
+    assert 0 < edited["added"] < total and edited["added"] == edited["deleted"]
+    assert count == total
+
+    manifest = rag._load_manifest(persist_dir)
+    removed_chunks = len(manifest["files"][f"playbook/{playbooks[1].name}"]["chunks"])
+    playbooks[1].unlink()
+    removed, count = sync()
+    assert (removed["added"], removed["deleted"]) == (0, removed_chunks)
+    assert count == total - removed_chunks
+
+
+def test_blocking_warm_up_waits_for_background_one(stub_rag, monkeypatch):
+    model_name = stub_rag.embedding_model_name
+
+    def slow_model_name():
+        time.sleep(0.3)  # keeps the background thread away from the registry lock for a while
+        return model_name()
+
+    monkeypatch.setattr(stub_rag, "embedding_model_name", slow_model_name)
+    stub_rag.warm_up()
+    done = threading.Event()
+    threading.Thread(target=lambda: (stub_rag.warm_up(background=False), done.set()), daemon=True).start()
+    assert done.wait(10), "warm_up(background=False) deadlocked on the background warm-up"
+    assert stub_rag.get_or_build_vectordb() is not None
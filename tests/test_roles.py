@@ -0,0 +1,25 @@
+import pytest
+
+from src.roles import normalize_role_name
+
+
+@pytest.mark.parametrize("title, role", [
+    ("Data Engineer", "Data Engineer"),
+    ("Senior Data Engineer", "Data Engineer"),
+    ("Data Enginer", "Data Engineer"),
+    ("data scientist II", "Data Scientist"),
+    ("Sr. MLE", "ML Engineer"),
+    ("Machine Learning Engineer", "ML Engineer"),
+    ("BI analyst", "Data/BI Analyst"),
+])
+def test_custom_titles_resolve_to_known_roles(title, role):
+    assert normalize_role_name(title) == role
+
+
+def test_unrelated_title_is_kept():
+    assert normalize_role_name("Pastry Chef") == "Pastry Chef"
+
+
+@pytest.mark.parametrize("title", ["Software Engineer", "Senior Software Engineer", "Data", "Analyst", "Engineer"])
+def test_generic_and_partial_titles_are_kept(title):
+    assert normalize_role_name(title) == title
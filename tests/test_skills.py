@@ -0,0 +1,39 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from benchmarks.bench_skills import legacy_extract_skills_with_evidence
+from benchmarks.synthetic import synthetic_cv_text
+from src.skills import extract_skills_with_evidence
+from src.taxonomy import get_taxonomy
+
+
+@pytest.mark.parametrize("pages, density, seed", [(1, 0.08, 0), (5, 0.08, 5), (10, 0.3, 7), (3, 0.0, 1)])
+def test_matcher_matches_per_skill_scan(pages, density, seed):
+    text = synthetic_cv_text(pages, skill_density=density, seed=seed)
+    assert extract_skills_with_evidence(text) == legacy_extract_skills_with_evidence(text)
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "Python\r\nSQL, sql and PostgreSQL\r\n",
+    "Built CI/CD with GitHub Actions; Power BI and PowerBI dashboards",
+    "Déploiement Docker et Kubernetes, \u00admachine learning\u2028NLP",
+    "scikit-learn\nScikit Learn\nsklearn pipelines",
+])
+def test_matcher_matches_per_skill_scan_on_edge_cases(text):
+    assert extract_skills_with_evidence(text) == legacy_extract_skills_with_evidence(text)
+
+
+def test_spellings_share_a_skill_id():
+    taxonomy = get_taxonomy()
+    assert taxonomy.skill_id("Tensorflow") == taxonomy.skill_id("TensorFlow")
+    assert taxonomy.skill_id("Vector Databases") == taxonomy.skill_id("vector-database")
+    assert taxonomy.canonical("power bi") == taxonomy.canonical("PowerBI")
+
+
+def test_importing_extractors_leaves_the_taxonomy_unloaded():
+    code = "import src.cv_cache, src.jd, src.taxonomy as t; assert t._TAXONOMY is None"
+    subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).resolve().parents[1], check=True)
@@ -0,0 +1,11 @@
+from benchmarks.bench_startup import HEAVY_MODULES, app_startup_imports, profile_imports
+
+STARTUP_BUDGET_MS = 500
+
+
+def test_app_startup_imports_stay_light():
+    top, loaded = profile_imports(app_startup_imports())
+    heavy = sorted({m.split(".")[0] for m in loaded} & set(HEAVY_MODULES))
+    assert not heavy, f"imported before the first render: {heavy}"
+    total_ms = sum(us for _, us in top) / 1000
+    assert total_ms < STARTUP_BUDGET_MS, f"startup imports took {total_ms:.0f} ms"
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from src.vector_backends import NumpyVectorStore
+
+IDS = ["a", "b", "c"]
+METAS = [
+    {"type": "playbook", "skills": "RAG"},
+    {"type": "playbook", "skills": "RAG|Docker"},
+    {"type": "role", "skills": "Docker"},
+]
+
+
+@pytest.mark.parametrize("where", [
+    {"skills": "RAG"},
+    {"skills": {"$ne": "RAG"}},
+    {"skills": {"$in": ["Docker", "RAG|Docker"]}},
+    {"$and": [{"type": "playbook"}, {"skills": {"$nin": ["RAG"]}}]},
+])
+def test_numpy_filters_match_chroma(tmp_path, where):
+    import chromadb
+
+    vectors = np.eye(3, dtype=np.float32)
+    store = NumpyVectorStore(str(tmp_path / "numpy"))
+    store.add_vectors(IDS, vectors, IDS, METAS)
+    got = {d.page_content for d in store.search_by_vectors([vectors[0]], k=3, filter=where)[0]}
+
+    collection = chromadb.PersistentClient(path=str(tmp_path / "chroma")).get_or_create_collection("test")
+    collection.add(ids=IDS, embeddings=vectors.tolist(), documents=IDS, metadatas=METAS)
+    expected = set(collection.query(query_embeddings=[vectors[0].tolist()], n_results=3, where=where)["documents"][0])
+    assert got == expected